@@ -0,0 +1,64 @@
+import yfinance as yf
+import pandas as pd
+
+import fundamentals_store
+import http_cache
+import rate_limit
+import ratio_engine
+import statements_store
+
+# --- Variable Description ---
+# symbol: NSE/BSE stock symbol
+# years: number of years for EPS growth (for PEG calculation)
+
+symbol = "INFY.NS"  # Example: Infosys Ltd
+years = 3
+
+# --- Fetch company data ---
+stock = yf.Ticker(symbol)
+info = http_cache.cached_json("yahoo_info", symbol, lambda: stock.info, rate_limit.YAHOO_HOST)
+
+# --- Extract basic data ---
+# Info-based ratios come from the shared ratio engine (same formulas as the universe scripts)
+info_ratios = ratio_engine.compute_ratios(pd.DataFrame([ratio_engine.raw_fields(info)])).iloc[0]
+pe = info.get("trailingPE")
+
+# --- Historical financials ---
+# Annual statements come from the local store, refreshed only when a new filing is due
+with statements_store.StatementsStore() as statements:
+    statements.update([symbol])
+    panels = statements.panels([symbol])
+
+# --- Compute derived ratios ---
+# Current ratio, asset turnover and PEG on the multi-year EPS CAGR
+statement_ratios = ratio_engine.statement_ratios(panels, pd.Series({symbol: pe}), years).reindex([symbol]).iloc[0]
+current_ratio = statement_ratios["Current Ratio"]
+asset_turnover = statement_ratios["Asset Turnover"]
+peg = statement_ratios["PEG (CAGR)"]
+
+# --- Build DataFrame for display ---
+ratios = {
+    "P/E Ratio": info_ratios["P/E"],
+    "P/B Ratio": info_ratios["P/B"],
+    "PEG Ratio": peg,
+    f"EPS CAGR ({years}Y, %)": statement_ratios["EPS CAGR (%)"],
+    "EPS (TTM)": info_ratios["EPS (TTM)"],
+    "ROE (%)": info_ratios["ROE (%)"],
+    "ROA (%)": info_ratios["ROA (%)"],
+    "Debt to Equity": info_ratios["Debt/Equity"],
+    "Dividend Yield (%)": info_ratios["Dividend Yield (%)"],
+    "Price to Sales": info_ratios["Price/Sales"],
+    "Market Cap": info_ratios["Market Cap"],
+    "Net Profit Margin (%)": info_ratios["Net Margin (%)"],
+    "Graham Value": info_ratios["Graham Value"],
+    "Current Ratio": current_ratio,
+    "Asset Turnover": asset_turnover
+}
+
+df = pd.DataFrame(ratios.items(), columns=["Ratio", "Value"])
+print(f"\n📊 Fundamental Ratios for {symbol}\n")
+print(df.to_string(index=False))
+
+# Keep a dated version of every ratio
+with fundamentals_store.FundamentalsStore() as store:
+    store.record(symbol.replace(".NS", ""), ratios, source="yahoo_ratios")
@@ -1,156 +1,114 @@
-
 import datetime as dt
 import pandas as pd
-from pandas_datareader import data as pdr
-import yfinance as yf
-from tkinter import Tk
-from tkinter.filedialog import askopenfilename
 import os
-from pandas import ExcelWriter
-import traceback
 
-#yf.pdr_override() 
+import bhavcopy
+import indicator_state
+import parallel_screen
+import price_store
+import results
+import rs_rating
+import trend_template
+import vcp
+
+#yf.pdr_override()
 start =dt.datetime(2017,12,1)
 now = dt.datetime.now()
 
-root = Tk()
+# Worker processes for the per-symbol indicator work (1 = run serially)
+workers = os.cpu_count() or 1
+# Output formats: any of "parquet", "arrow", "xlsx"
+exportFormats = ("parquet", "xlsx")
+# Folder of downloaded NSE bhavcopy zips (None = Yahoo only) and the suffix that
+# turns a bhavcopy symbol into the sheet's ticker
+bhavcopyDir = None
+bhavcopySuffix = ".NS"
+
 ftypes = [(".xlsm","*.xlsx",".xls")]
 ttl  = "Title"
 dir1 = 'C:\\'
-#filePath = askopenfilename(filetypes = ftypes, initialdir = dir1, title = ttl)
 filePath=r"./RichardStocks.xlsx"
 
-stocklist = pd.read_excel(filePath)
-stocklist=stocklist.head()
-
-#exportList= pd.DataFrame(columns=['Stock', "RS_Rating", "50 Day MA", "150 Day Ma", "200 Day MA", "52 Week Low", "52 week High"])
-exportList = pd.DataFrame(columns=[
-    'Stock',
-    'Current Price',
-    'RS_Rating',
-    '50 Day MA',
-    '150 Day Ma',
-    '200 Day MA',
-    '52 Week Low',
-    '52 week High'
-])
-
-for i in stocklist.index:
-	stock=str(stocklist["Symbol"][i])
-	RS_Rating=stocklist["RS Rating"][i]
-
-	try:
-		#df = pdr.get_data_yahoo(stock, start, now)
-		df = yf.download(stock, start, now)
-		#print(stock, df.columns)
-		if isinstance(df.columns, pd.MultiIndex):
-			df.columns = df.columns.get_level_values(0)
-
-		smaUsed=[50,150,200]
-		for x in smaUsed:
-			sma=x
-			#df["SMA_"+str(sma)]=round(df.iloc[:,4].rolling(window=sma).mean(),2)
-			df["SMA_"+str(sma)]=round(df["Close"].rolling(window=sma).mean(),2)
-
-
-		#currentClose=df["Adj Close"][-1]
-		currentClose=df["Close"].iloc[-1].item()
-		
-		moving_average_50=df["SMA_50"].iloc[-1].item()
-		moving_average_150=df["SMA_150"].iloc[-1].item()
-		moving_average_200=df["SMA_200"].iloc[-1].item()
-		#low_of_52week=min(df["Adj Close"][-260:])
-		#high_of_52week=max(df["Adj Close"][-260:])
-		low_of_52week=float(min(df["Close"].iloc[-260:]))
-		high_of_52week=float(max(df["Close"].iloc[-260:]))
-		try:
-			moving_average_200_20 = df["SMA_200"].iloc[-20].item()
-
-		except Exception:
-			moving_average_200_20=0
-			traceback.print_exc()
-		score = 0
-		#Condition 1: Current Price > 150 SMA and > 200 SMA
-		if(currentClose>moving_average_150 and currentClose > moving_average_200):
-			cond_1=True
-			score+=1
-		else:
-			cond_1=False
-		#Condition 2: 150 SMA and > 200 SMA
-		if(moving_average_150>moving_average_200):
-			cond_2=True
-			score+=1
-		else:
-			cond_2=False
-		#Condition 3: 200 SMA trending up for at least 1 month (ideally 4-5 months)
-		if(moving_average_200>moving_average_200_20):
-			cond_3=True
-			score+=1
-		else:
-			cond_3=False
-		#Condition 4: 50 SMA> 150 SMA and 50 SMA> 200 SMA
-		if(moving_average_50>moving_average_150 and moving_average_50>moving_average_200):
-			#print("Condition 4 met")
-			cond_4=True
-			score+=1
-		else:
-			#print("Condition 4 not met")
-			cond_4=False
-		#Condition 5: Current Price > 50 SMA
-		if(currentClose>moving_average_50):
-			cond_5=True
-			score+=1
-		else:
-			cond_5=False
-		#Condition 6: Current Price is at least 30% above 52 week low (Many of the best are up 100-300% before coming out of consolidation)
-		
-		if(currentClose>=(1.3*low_of_52week)):
-			cond_6=True
-			score+=1
-		else:
-			cond_6=False
-		#Condition 7: Current Price is within 25% of 52 week high
-		if(currentClose>=(.75*high_of_52week)):
-			cond_7=True
-			score+=1
-		else:
-			cond_7=False
-		#Condition 8: IBD RS rating >70 and the higher the better
-		if(RS_Rating>70):
-			cond_8=True
-			score+=1
-		else:
-			cond_8=False
-		
-		#if(cond_1 and cond_2 and cond_3 and cond_4 and cond_5 and cond_6 and cond_7 and cond_8 ):
-		if(score > 0):
-			#exportList = exportList.append({'Stock': stock, "RS_Rating": RS_Rating, "50 Day MA": moving_average_50, "150 Day Ma": moving_average_150, "200 Day MA": moving_average_200, "52 Week Low": low_of_52week, "52 week High": high_of_52week}, ignore_index=True)
-			exportList.loc[len(exportList)] = {
-				'Stock': stock,
-				'Current Price':currentClose,
-				'RS_Rating': RS_Rating,
-				'50 Day MA': moving_average_50,
-				'150 Day Ma': moving_average_150,
-				'200 Day MA': moving_average_200,
-				'52 Week Low': low_of_52week,
-				'52 week High': high_of_52week
-			}
-
-			print('Stock', stock, ' satified')
-		else:
-			print('Stock', stock, ' not satified')
-	except Exception as e:
-		print("No data on "+stock)
-		print("Exception occurred: ", type(e).__name__, ":",e)
-		traceback.print_exc()
-
-print(exportList)
-
-newFile=os.path.dirname(filePath)+"/ScreenOutput.xlsx"
-
-#writer= ExcelWriter(newFile)
-#exportList.to_excel(writer,"Sheet1")
-#writer.save()
-
-with pd.ExcelWriter(newFile, engine="openpyxl") as writer:
-    exportList.to_excel(writer, sheet_name="Sheet1", index=False)
+
+def main():
+	#filePath = askopenfilename(filetypes = ftypes, initialdir = dir1, title = ttl)
+
+	stocklist = pd.read_excel(filePath)
+
+	#exportList= pd.DataFrame(columns=['Stock', "RS_Rating", "50 Day MA", "150 Day Ma", "200 Day MA", "52 Week Low", "52 week High"])
+	symbols = list(dict.fromkeys(stocklist["Symbol"].astype(str)))
+	errors = results.ResultBuilder(results.ERROR_SCHEMA)
+
+	# Bring the local price store up to date: only bars after the last stored date are downloaded
+	store = price_store.PriceStore(os.path.join(os.path.dirname(filePath), "price_store"))
+	if bhavcopyDir:
+		# New trading days come from the bhavcopy files in one parse each; symbols
+		# without stored history still get their backfill from Yahoo below
+		bhav = bhavcopy.BhavcopyStore(os.path.join(os.path.dirname(filePath), "bhavcopy_store"))
+		newDays = bhav.ingest(bhavcopyDir)
+		if newDays:
+			known = [s for s in symbols if store.last_date(s) is not None]
+			bhav.append_to(store, start=newDays[0], suffix=bhavcopySuffix, symbols=known)
+	# Bars up to yesterday only: today's session is still forming during market hours
+	appended, failed, rewritten = store.update(symbols, start, pd.Timestamp(now).normalize())
+	for stock in failed:
+		errors.add({"Stock": stock, "Stage": "download", "Error": "NoData", "Message": "No data on "+stock})
+
+	# Update the per-symbol indicator state with the new bars only, sharded across
+	# worker processes. The whole stored universe is refreshed so the RS Rating
+	# ranks against all of it.
+	stateFile = os.path.join(os.path.dirname(filePath), "indicator_state.json")
+	universe = list(dict.fromkeys(store.symbols() + symbols))
+	states = indicator_state.load_states(stateFile)
+	for stock in rewritten:
+		states.pop(stock, None)  # history was re-adjusted, seed the state again
+	latest, refresh_errors = parallel_screen.refresh_parallel(store, states, universe, workers)
+	errors.extend(refresh_errors)
+	indicator_state.save_states(states, stateFile)
+
+	# RS Rating computed in-house, once per trading day; the sheet's column is only
+	# a fallback for symbols without a year of history
+	rsCacheDir = os.path.join(os.path.dirname(filePath), "rs_cache")
+	asof = max((states[s].last_date for s in latest.index), default=now)
+	rs_ratings = rs_rating.cached_rs_rating(
+		asof,
+		lambda: rs_rating.rs_rating_from_states({s: states[s] for s in latest.index}),
+		rsCacheDir, symbols=list(latest.index))
+	if "RS Rating" in stocklist.columns:
+		sheet_ratings = pd.Series(stocklist["RS Rating"].values, index=stocklist["Symbol"].astype(str))
+		rs_ratings = rs_ratings.combine_first(sheet_ratings[~sheet_ratings.index.duplicated()])
+
+	latest = latest[latest.index.isin(symbols)]
+	result = trend_template.trend_template(latest, rs_ratings)
+	exportList = trend_template.to_export_frame(result)
+
+	# Volatility contraction pattern on the latest base of every screened symbol
+	vcpParams = vcp.DEFAULT_VCP_PARAMS
+	panels = store.tail_panels(list(latest.index), ["High", "Low", "Volume"], vcpParams.base_bars)
+	patterns = vcp.detect_vcp(panels, vcpParams)
+	exportList = exportList.join(patterns, on="Stock")
+
+	print(f"{len(exportList)} of {len(latest)} stocks satisfied at least one condition")
+	print(exportList)
+
+	errorList = errors.to_frame()
+	if not errorList.empty:
+		print(f"⚠️ {len(errorList)} symbols failed:")
+		print(errorList.groupby(["Stage", "Error"]).size().to_string())
+
+	newFile=os.path.dirname(filePath)+"/ScreenOutput"
+
+	#writer= ExcelWriter(newFile)
+	#exportList.to_excel(writer,"Sheet1")
+	#writer.save()
+
+	# Parquet/Arrow files are written straight away, the Excel workbook last
+	with results.ResultExporter(newFile, exportFormats) as exporter:
+		exporter.write("Sheet1", exportList)
+		exporter.write("Errors", errorList)
+	print("💾 Saved to " + ", ".join(exporter.paths))
+
+
+# The guard keeps worker processes (spawned on Windows) from re-running the screen
+if __name__ == "__main__":
+	main()
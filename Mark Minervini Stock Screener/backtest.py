@@ -0,0 +1,114 @@
+"""
+Historical signal matrix for the trend template.
+
+Evaluates every condition for every date and symbol of a price panel in
+one vectorized pass and measures the forward returns of the stocks that
+passed, so the template can be tuned on history.
+"""
+import os
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import rs_rating
+from trend_template import CONDITIONS, DEFAULT_PARAMS, TemplateParams, evaluate_conditions, rolling_indicators
+
+FORWARD_HORIZONS = (20, 60, 120)  # trading days
+
+
+class SignalCube(NamedTuple):
+    """Boolean condition flags for every date x symbol x condition."""
+    signals: np.ndarray        # shape (dates, symbols, conditions), dtype bool
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    conditions: Sequence[str]
+
+    def score(self) -> pd.DataFrame:
+        """Number of conditions met, date x symbol."""
+        return pd.DataFrame(self.signals.sum(axis=-1), index=self.dates, columns=self.symbols)
+
+    def condition(self, name: str) -> pd.DataFrame:
+        """Flags of a single condition, date x symbol."""
+        return pd.DataFrame(self.signals[:, :, self.conditions.index(name)],
+                            index=self.dates, columns=self.symbols)
+
+
+def signal_cube_from_indicators(ind: Dict[str, pd.DataFrame], params: TemplateParams = DEFAULT_PARAMS) -> SignalCube:
+    """Builds the cube from precomputed indicator panels (see rolling_indicators) plus "rs"."""
+    conditions = evaluate_conditions(ind, params)
+    price = ind["price"]
+    signals = np.stack([np.asarray(conditions[name], dtype=bool) for name in CONDITIONS], axis=-1)
+    return SignalCube(signals, price.index, price.columns, list(CONDITIONS))
+
+
+def signal_cube(close: pd.DataFrame, rs: Optional[pd.DataFrame] = None,
+                params: TemplateParams = DEFAULT_PARAMS) -> SignalCube:
+    """
+    Evaluates the trend template on every bar of a close panel.
+
+    Args:
+        close: Close prices, index = dates, columns = symbols.
+        rs: RS Rating panel of the same shape; computed in-house when omitted.
+        params: Template thresholds.
+
+    Returns:
+        A SignalCube with one flag per date, symbol and condition.
+    """
+    ind = rolling_indicators(close, params)
+    ind["rs"] = rs_rating.rs_rating_history(close) if rs is None else rs.reindex_like(ind["price"])
+    return signal_cube_from_indicators(ind, params)
+
+
+def forward_returns(close: pd.DataFrame, horizons: Sequence[int] = FORWARD_HORIZONS) -> Dict[int, pd.DataFrame]:
+    """Return from each bar's close to the close `h` bars later, for every horizon."""
+    close = close.ffill()
+    return {h: close.shift(-h) / close - 1 for h in horizons}
+
+
+def forward_stats(score: pd.DataFrame, fwd: Dict[int, pd.DataFrame], min_score: int = len(CONDITIONS)) -> pd.DataFrame:
+    """
+    Forward-return statistics of every (date, symbol) with score >= min_score.
+
+    `score` and the forward returns may be DataFrames or plain NumPy arrays
+    of the same shape.
+
+    Returns:
+        One row per horizon with the number of signals, mean and median
+        forward return, hit rate (share of positive returns) and the mean
+        return of all bars for comparison.
+    """
+    passed = np.asarray(score) >= min_score
+    rows = []
+    for h, returns in fwd.items():
+        values = np.asarray(returns, dtype=float)
+        valid = ~np.isnan(values)
+        hits = values[passed & valid]
+        rows.append({
+            "Horizon": h,
+            "Signals": hits.size,
+            "Mean Return": hits.mean() if hits.size else np.nan,
+            "Median Return": np.median(hits) if hits.size else np.nan,
+            "Hit Rate": (hits > 0).mean() if hits.size else np.nan,
+            "Baseline Mean": values[valid].mean() if valid.any() else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+def run_backtest(close: pd.DataFrame, params: TemplateParams = DEFAULT_PARAMS, min_score: int = len(CONDITIONS),
+                 horizons: Sequence[int] = FORWARD_HORIZONS):
+    """Signal cube plus forward-return statistics for a close panel."""
+    cube = signal_cube(close, params=params)
+    return cube, forward_stats(cube.score(), forward_returns(close, horizons), min_score)
+
+
+if __name__ == "__main__":
+    import price_store
+
+    store = price_store.PriceStore(os.path.join(".", "price_store"))
+    close = store.close_panel(store.symbols())
+    print(f"Backtesting {close.shape[1]} symbols over {close.shape[0]} bars...")
+    cube, stats = run_backtest(close)
+    print(stats.to_string(index=False))
+    stats.to_csv("BacktestStats.csv", index=False)
+    print("💾 Saved to BacktestStats.csv")
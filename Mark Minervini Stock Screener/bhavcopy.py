@@ -0,0 +1,190 @@
+"""
+End-of-day prices from NSE's daily bhavcopy files.
+
+One bhavcopy holds the OHLCV of every traded symbol for a day, so the daily
+update of the whole universe is one file parse instead of a download per
+symbol. Zipped bhavcopies are read from a local directory in chunks with
+fixed dtypes, filtered to the wanted series, and each trading day is
+written to <root>/bhav-YYYYMMDD.parquet. Both layouts NSE has published
+are understood:
+
+    cmDDMONYYYYbhav.csv.zip                        (old format)
+    BhavCopy_NSE_CM_0_0_0_YYYYMMDD_F_0000.csv.zip  (UDiFF, from July 2024)
+
+Prices are as traded, i.e. not adjusted for splits and dividends.
+"""
+import os
+import re
+import zipfile
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BHAV_DIR = "./bhavcopy_store"
+SERIES = ("EQ", "BE")
+CHUNK_ROWS = 50_000
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# source column -> our column, per layout
+OLD_COLUMNS = {
+    "SYMBOL": "Symbol", "SERIES": "Series", "OPEN": "Open", "HIGH": "High", "LOW": "Low",
+    "CLOSE": "Close", "TOTTRDQTY": "Volume", "TIMESTAMP": "Date",
+}
+UDIFF_COLUMNS = {
+    "TckrSymb": "Symbol", "SctySrs": "Series", "OpnPric": "Open", "HghPric": "High", "LwPric": "Low",
+    "ClsPric": "Close", "TtlTradgVol": "Volume", "TradDt": "Date",
+}
+DTYPES = {"Symbol": "string", "Series": "string", "Open": "float64", "High": "float64",
+          "Low": "float64", "Close": "float64", "Volume": "float64", "Date": "string"}
+
+_OLD_NAME = re.compile(r"cm(\d{2}[A-Z]{3}\d{4})bhav", re.IGNORECASE)
+_UDIFF_NAME = re.compile(r"BhavCopy_NSE_CM_\d+_\d+_\d+_(\d{8})_F", re.IGNORECASE)
+
+
+def file_date(path: str) -> Optional[pd.Timestamp]:
+    """Trading day of a bhavcopy, from its file name."""
+    name = os.path.basename(path)
+    match = _UDIFF_NAME.search(name)
+    if match:
+        return pd.Timestamp(match.group(1))
+    match = _OLD_NAME.search(name)
+    if match:
+        return pd.to_datetime(match.group(1), format="%d%b%Y")
+    return None
+
+
+def _open_csv(path: str):
+    """Opens the CSV inside a zipped bhavcopy (or a plain CSV) for reading."""
+    if path.lower().endswith(".zip"):
+        archive = zipfile.ZipFile(path)
+        member = next(n for n in archive.namelist() if n.lower().endswith(".csv"))
+        return archive.open(member)
+    return open(path, "rb")
+
+
+def read_bhavcopy(path: str, series: Iterable[str] = SERIES, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Reads one bhavcopy into long format.
+
+    Returns:
+        DataFrame with Date, Symbol and the OHLCV FIELDS, one row per symbol
+        of the wanted series.
+    """
+    with _open_csv(path) as f:
+        header = f.readline().decode("utf-8-sig").strip().split(",")
+    header = [c.strip() for c in header]
+    columns = UDIFF_COLUMNS if "TckrSymb" in header else OLD_COLUMNS
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise ValueError(f"{os.path.basename(path)}: not a bhavcopy, missing {missing}")
+
+    series = set(series)
+    chunks = []
+    with _open_csv(path) as f:
+        reader = pd.read_csv(f, usecols=list(columns), chunksize=chunk_rows, skipinitialspace=True,
+                             dtype={c: DTYPES[t] for c, t in columns.items()})
+        for chunk in reader:
+            chunk = chunk.rename(columns=columns)
+            chunks.append(chunk[chunk["Series"].str.strip().isin(series)])
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(columns.values()))
+    df["Symbol"] = df["Symbol"].str.strip()
+    df["Date"] = pd.to_datetime(df["Date"].str.strip(), format="mixed")
+    return df[["Date", "Symbol"] + FIELDS].drop_duplicates("Symbol")
+
+
+class BhavcopyStore:
+    """Day-partitioned Parquet store of bhavcopy bars."""
+
+    def __init__(self, root: str = BHAV_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, day: pd.Timestamp) -> str:
+        return os.path.join(self.root, f"bhav-{day:%Y%m%d}.parquet")
+
+    def dates(self) -> List[pd.Timestamp]:
+        """Trading days in the store, oldest first."""
+        return sorted(pd.Timestamp(f[len("bhav-"):-len(".parquet")]) for f in os.listdir(self.root)
+                      if f.startswith("bhav-") and f.endswith(".parquet"))
+
+    def ingest(self, source_dir: str, series: Iterable[str] = SERIES) -> List[pd.Timestamp]:
+        """
+        Adds every bhavcopy in `source_dir` whose day is not stored yet.
+
+        Returns:
+            The trading days written.
+        """
+        stored = set(self.dates())
+        written = []
+        for name in sorted(os.listdir(source_dir)):
+            if not name.lower().endswith((".zip", ".csv")):
+                continue
+            path = os.path.join(source_dir, name)
+            day = file_date(path)
+            if day is not None and day in stored:
+                continue
+            try:
+                df = read_bhavcopy(path, series)
+            except (ValueError, zipfile.BadZipFile, StopIteration) as e:
+                print(f"⚠️ Skipping {name}: {e}")
+                continue
+            if df.empty:
+                continue
+            day = df["Date"].iloc[0].normalize()
+            if day in stored:
+                continue
+            tmp = self._path(day) + ".tmp"
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+            os.replace(tmp, self._path(day))
+            stored.add(day)
+            written.append(day)
+        return sorted(written)
+
+    def read(self, start=None, end=None, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Long-format bars of the days in [start, end], optionally for some symbols only."""
+        days = [d for d in self.dates()
+                if (start is None or d >= pd.Timestamp(start)) and (end is None or d <= pd.Timestamp(end))]
+        symbols = None if symbols is None else list(symbols)
+        if not days or symbols == []:
+            return pd.DataFrame(columns=["Date", "Symbol"] + FIELDS)
+        filters = [("Symbol", "in", symbols)] if symbols is not None else None
+        tables = [pq.read_table(self._path(d), filters=filters, memory_map=True) for d in days]
+        return pa.concat_tables(tables).to_pandas()
+
+    def panels(self, fields: List[str] = FIELDS, start=None, end=None,
+               symbols: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Date x symbol panels of the given fields, the layout the screener works on."""
+        df = self.read(start, end, symbols)
+        return {field: df.pivot(index="Date", columns="Symbol", values=field).sort_index()
+                for field in fields}
+
+    def append_to(self, store, start=None, suffix: str = "",
+                  symbols: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Appends the stored days from `start` on to a PriceStore.
+
+        Args:
+            store: price_store.PriceStore to append to; it casts the
+                bars to its own column types (Volume as int64).
+            start: First day to copy; all stored days when None.
+            suffix: Appended to bhavcopy symbols to match the store's
+                naming, e.g. ".NS" for Yahoo tickers.
+            symbols: Store symbols to copy (with suffix); all when None.
+
+        Returns:
+            A dict of symbol -> bars appended.
+        """
+        if symbols is not None:
+            symbols = list(symbols)
+            if not symbols:
+                return {}
+        wanted = None if symbols is None else [s[:len(s) - len(suffix)] if suffix and s.endswith(suffix) else s
+                                               for s in symbols]
+        df = self.read(start=start, symbols=wanted)
+        appended = {}
+        for symbol, bars in df.groupby("Symbol", sort=False):
+            appended[symbol + suffix] = store.append(symbol + suffix, bars.set_index("Date")[FIELDS])
+        return appended
@@ -0,0 +1,209 @@
+"""
+Incremental indicator state for daily re-screens.
+
+Keeps, per symbol, exactly what the trend template needs to evaluate the
+latest bar: running sums for the SMA windows, monotonic deques for the
+52-week low/high and a short history of SMA_200 values. A new bar updates
+the state in constant (amortised) time, so a daily screen only reads the
+bars appended since the previous run.
+"""
+import json
+import math
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from trend_template import DEFAULT_PARAMS, TemplateParams
+
+STATE_FILE = "./indicator_state.json"
+# Columns of the frame refresh_states returns, one per IndicatorState.snapshot() value
+SNAPSHOT_COLUMNS = ["price", "sma_fast", "sma_mid", "sma_slow", "sma_slow_prev", "low_52", "high_52"]
+
+
+class IndicatorState:
+    """Rolling SMA, 52-week range and SMA_200 slope state of one symbol."""
+
+    def __init__(self, params: TemplateParams = DEFAULT_PARAMS):
+        self.params = params
+        self.windows = sorted({params.sma_fast, params.sma_mid, params.sma_slow})
+        self.size = max(self.windows[-1], params.week52_bars)
+        self.buffer = [math.nan] * self.size   # ring buffer of the last `size` closes
+        self.count = 0                          # bars seen so far
+        self.sums = {w: 0.0 for w in self.windows}
+        self.lows = deque()                     # (bar number, close), closes increasing
+        self.highs = deque()                    # (bar number, close), closes decreasing
+        self.sma_slow_hist = deque(maxlen=params.slope_lookback)
+        self.last_date: Optional[pd.Timestamp] = None
+
+    # ---------- updates ----------
+    def update(self, date, close: float) -> None:
+        """Adds one bar. Bars at or before the last seen date are ignored."""
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            return
+        if close is None or math.isnan(close):
+            # Carry the previous close forward, as the panel engine does
+            if self.count == 0:
+                return
+            close = self.close_ago(0)
+
+        n = self.count
+        for w in self.windows:
+            self.sums[w] += close
+            if n >= w:
+                self.sums[w] -= self.buffer[(n - w) % self.size]
+        self.buffer[n % self.size] = close
+
+        start = n - self.params.week52_bars + 1
+        while self.lows and self.lows[-1][1] >= close:
+            self.lows.pop()
+        self.lows.append((n, close))
+        while self.lows[0][0] < start:
+            self.lows.popleft()
+        while self.highs and self.highs[-1][1] <= close:
+            self.highs.pop()
+        self.highs.append((n, close))
+        while self.highs[0][0] < start:
+            self.highs.popleft()
+
+        self.count = n + 1
+        self.sma_slow_hist.append(self.sma(self.params.sma_slow))
+        self.last_date = date
+
+    def update_many(self, closes: pd.Series) -> None:
+        """Adds every bar of a date-indexed close series in order."""
+        for date, close in closes.sort_index().items():
+            self.update(date, float(close))
+
+    # ---------- reads ----------
+    def close_ago(self, bars: int) -> float:
+        """Close `bars` bars before the latest one (0 = latest)."""
+        if bars >= min(self.count, self.size):
+            return math.nan
+        return self.buffer[(self.count - 1 - bars) % self.size]
+
+    def sma(self, window: int) -> float:
+        if self.count < window:
+            return math.nan
+        return round(self.sums[window] / window, 2)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Latest indicator values, named like trend_template.rolling_indicators."""
+        p = self.params
+        full = len(self.sma_slow_hist) == self.sma_slow_hist.maxlen
+        return {
+            "price": self.close_ago(0),
+            "sma_fast": self.sma(p.sma_fast),
+            "sma_mid": self.sma(p.sma_mid),
+            "sma_slow": self.sma(p.sma_slow),
+            "sma_slow_prev": self.sma_slow_hist[0] if full else math.nan,
+            "low_52": self.lows[0][1] if self.lows else math.nan,
+            "high_52": self.highs[0][1] if self.highs else math.nan,
+        }
+
+    # ---------- persistence ----------
+    def to_dict(self) -> dict:
+        # Only the live part of the ring buffer is stored, oldest first
+        live = min(self.count, self.size)
+        return {
+            "count": self.count,
+            "closes": [self.close_ago(k) for k in range(live - 1, -1, -1)],
+            "sums": {str(w): s for w, s in self.sums.items()},
+            "lows": list(self.lows),
+            "highs": list(self.highs),
+            "sma_slow_hist": list(self.sma_slow_hist),
+            "last_date": None if self.last_date is None else self.last_date.strftime("%Y-%m-%d"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, params: TemplateParams = DEFAULT_PARAMS) -> "IndicatorState":
+        state = cls(params)
+        state.count = data["count"]
+        closes = data["closes"]
+        for k, close in enumerate(closes):
+            state.buffer[(state.count - len(closes) + k) % state.size] = close
+        state.sums = {int(w): s for w, s in data["sums"].items()}
+        state.lows = deque(tuple(x) for x in data["lows"])
+        state.highs = deque(tuple(x) for x in data["highs"])
+        state.sma_slow_hist.extend(data["sma_slow_hist"])
+        if data["last_date"]:
+            state.last_date = pd.Timestamp(data["last_date"])
+        return state
+
+    @classmethod
+    def from_history(cls, closes: pd.Series, params: TemplateParams = DEFAULT_PARAMS) -> "IndicatorState":
+        """Seeds a state from the trailing bars of a close series."""
+        state = cls(params)
+        state.update_many(closes.dropna().iloc[-params.history_bars():])
+        return state
+
+
+def load_states(path: str = STATE_FILE, params: TemplateParams = DEFAULT_PARAMS) -> Dict[str, IndicatorState]:
+    """Loads persisted states. States saved with other parameters are discarded."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("params") != params.__dict__:
+        print("⚠️ Indicator parameters changed, rebuilding state from history.")
+        return {}
+    return {symbol: IndicatorState.from_dict(s, params) for symbol, s in data["symbols"].items()}
+
+
+def save_states(states: Dict[str, IndicatorState], path: str = STATE_FILE,
+                params: TemplateParams = DEFAULT_PARAMS) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "params": params.__dict__,
+            "symbols": {symbol: s.to_dict() for symbol, s in states.items()},
+        }, f)
+    os.replace(tmp, path)
+
+
+def error_record(symbol: str, stage: str, exc: Exception) -> Dict[str, str]:
+    """Structured description of a per-symbol failure."""
+    return {"Stock": symbol, "Stage": stage, "Error": type(exc).__name__, "Message": str(exc)}
+
+
+def refresh_states(states: Dict[str, IndicatorState], store, symbols: Iterable[str],
+                   params: TemplateParams = DEFAULT_PARAMS, errors: Optional[List[dict]] = None) -> pd.DataFrame:
+    """
+    Brings the state of every symbol up to the store's last bar.
+
+    Symbols with a state only read the bars appended since their last
+    update; new symbols are seeded once from their trailing history.
+
+    Args:
+        states: Symbol -> IndicatorState, updated in place.
+        store: A price_store.PriceStore.
+        symbols: Symbols to refresh.
+        params: Template parameters.
+        errors: If given, per-symbol exceptions are appended to it as
+            error_record dicts instead of being raised.
+
+    Returns:
+        The latest indicator values, one row per symbol, in the layout of
+        trend_template.latest_indicators.
+    """
+    latest = {}
+    for symbol in dict.fromkeys(symbols):
+        try:
+            state = states.get(symbol)
+            stored_last = store.last_date(symbol)
+            if stored_last is None:
+                continue
+            if state is None or state.last_date is None:
+                state = IndicatorState.from_history(store.read(symbol, columns=["Close"])["Close"], params)
+                states[symbol] = state
+            elif stored_last > state.last_date:
+                state.update_many(store.read_since(symbol, state.last_date, columns=["Close"])["Close"])
+            latest[symbol] = state.snapshot()
+        except Exception as e:
+            if errors is None:
+                raise
+            states.pop(symbol, None)
+            errors.append(error_record(symbol, "indicators", e))
+    return pd.DataFrame.from_dict(latest, orient="index", columns=SNAPSHOT_COLUMNS)
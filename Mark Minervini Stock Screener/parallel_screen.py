@@ -0,0 +1,78 @@
+"""
+Process-pool execution of the per-symbol indicator work.
+
+The universe is split into contiguous shards, every shard refreshes its
+symbols' indicator states in a worker process, and the shard results are
+merged back into one frame. Failures come back as structured error records.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+import indicator_state
+from price_store import PriceStore
+from trend_template import DEFAULT_PARAMS, TemplateParams
+
+WORKERS = os.cpu_count() or 1
+SHARDS_PER_WORKER = 4  # smaller shards even out slow symbols across workers
+
+
+def _refresh_shard(store_root: str, symbols: List[str], states: Dict[str, indicator_state.IndicatorState],
+                   params: TemplateParams):
+    """Worker entry point: refreshes one shard and returns its results."""
+    errors: List[dict] = []
+    latest = indicator_state.refresh_states(states, PriceStore(store_root), symbols, params, errors=errors)
+    return latest, states, errors
+
+
+def refresh_parallel(store: PriceStore, states: Dict[str, indicator_state.IndicatorState], symbols: List[str],
+                     workers: int = WORKERS, params: TemplateParams = DEFAULT_PARAMS) -> Tuple[pd.DataFrame, List[dict]]:
+    """
+    Refreshes indicator states for many symbols across worker processes.
+
+    Args:
+        store: Price store the bars are read from.
+        states: Symbol -> IndicatorState, updated in place with the shard results.
+        symbols: Symbols to refresh.
+        workers: Number of worker processes; 1 runs everything in this process.
+        params: Template parameters.
+
+    Returns:
+        The latest indicator values (one row per symbol, in `symbols` order)
+        and the list of per-symbol error records.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    errors: List[dict] = []
+    if workers <= 1 or len(symbols) < 2:
+        latest = indicator_state.refresh_states(states, store, symbols, params, errors=errors)
+        return latest, errors
+
+    n_shards = min(len(symbols), workers * SHARDS_PER_WORKER)
+    size = -(-len(symbols) // n_shards)
+    shards = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+    frames = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_refresh_shard, store.root, shard,
+                        {s: states[s] for s in shard if s in states}, params): shard
+            for shard in shards
+        }
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                latest, shard_states, shard_errors = future.result()
+            except Exception as e:
+                errors.extend(indicator_state.error_record(s, "worker", e) for s in shard)
+                continue
+            for symbol in shard:
+                states.pop(symbol, None)
+            states.update(shard_states)
+            errors.extend(shard_errors)
+            frames.append(latest)
+
+    # Every shard failing still gives the columns the screen selects
+    latest = pd.concat(frames) if frames else pd.DataFrame(columns=indicator_state.SNAPSHOT_COLUMNS)
+    return latest.reindex([s for s in symbols if s in latest.index]), errors
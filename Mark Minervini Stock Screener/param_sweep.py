@@ -0,0 +1,174 @@
+"""
+Parallel parameter sweep for the trend template.
+
+Every rolling window the grid needs (SMAs, shifted SMA_200, 52-week range,
+RS Rating, forward returns) is computed once up front and shared by all
+grid points; the grid points themselves are spread across worker processes
+and only do the cheap comparisons. The arrays reach the workers as memory-
+mapped .npy files, so every worker shares one copy through the page cache
+instead of unpickling its own.
+"""
+import itertools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+import rs_rating
+from backtest import FORWARD_HORIZONS, forward_returns, forward_stats
+from trend_template import CONDITIONS, DEFAULT_PARAMS, TemplateParams, evaluate_conditions
+
+WORKERS = os.cpu_count() or 1
+
+DEFAULT_GRID = {
+    "sma_fast": [50],
+    "sma_mid": [150],
+    "sma_slow": [200],
+    "slope_lookback": [20, 60, 100],
+    "low_multiple": [1.25, 1.3, 1.5],
+    "high_multiple": [0.75, 0.85],
+    "rs_min": [70, 80, 90],
+}
+
+# Shared precomputed arrays, set in every worker by _init_worker
+_CACHE: Dict[str, object] = {}
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[TemplateParams]:
+    """All parameter combinations of the grid with fast < mid < slow SMA windows."""
+    keys = list(grid)
+    points = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = replace(DEFAULT_PARAMS, **dict(zip(keys, values)))
+        if params.sma_fast < params.sma_mid < params.sma_slow:
+            points.append(params)
+    return points
+
+
+def precompute(close: pd.DataFrame, points: List[TemplateParams],
+               horizons: Sequence[int] = FORWARD_HORIZONS) -> Dict[str, object]:
+    """
+    Computes every rolling window used by any grid point exactly once.
+
+    Returns:
+        A dict of NumPy arrays: "price", "rs", one "low_52_<n>" and
+        "high_52_<n>" per 52-week window, one "sma_<w>" per window, one
+        "sma_<w>_prev_<k>" per (slow window, slope lookback) pair and one
+        "fwd_<h>" per horizon.
+    """
+    close = close.ffill()
+    cache: Dict[str, object] = {
+        "price": close.to_numpy(),
+        "rs": rs_rating.rs_rating_history(close).to_numpy(),
+    }
+    for n in {p.week52_bars for p in points}:
+        cache[f"low_52_{n}"] = close.rolling(window=n, min_periods=1).min().to_numpy()
+        cache[f"high_52_{n}"] = close.rolling(window=n, min_periods=1).max().to_numpy()
+    windows = {w for p in points for w in (p.sma_fast, p.sma_mid, p.sma_slow)}
+    sma = {w: close.rolling(window=w).mean().round(2) for w in windows}
+    for w, panel in sma.items():
+        cache[f"sma_{w}"] = panel.to_numpy()
+    for w, k in {(p.sma_slow, p.slope_lookback) for p in points}:
+        cache[f"sma_{w}_prev_{k}"] = sma[w].shift(k - 1).to_numpy()
+    for h, returns in forward_returns(close, horizons).items():
+        cache[f"fwd_{h}"] = returns.to_numpy()
+    cache["horizons"] = list(horizons)
+    return cache
+
+
+def _save_cache(cache: Dict[str, object], directory: str) -> Dict[str, object]:
+    """Writes the cache arrays to .npy files; returns the cache with file paths in their place."""
+    saved: Dict[str, object] = {}
+    for key, value in cache.items():
+        if isinstance(value, np.ndarray):
+            path = os.path.join(directory, key + ".npy")
+            np.save(path, value, allow_pickle=False)
+            value = path
+        saved[key] = value
+    return saved
+
+
+def _init_worker(cache: Dict[str, object]) -> None:
+    """Sets the shared cache; file paths from _save_cache are opened memory-mapped."""
+    global _CACHE
+    _CACHE = {key: np.load(value, mmap_mode="r") if isinstance(value, str) else value
+              for key, value in cache.items()}
+
+
+def evaluate_point(params: TemplateParams, min_score: int = len(CONDITIONS)) -> dict:
+    """Hit statistics of one grid point, using the shared cache."""
+    c = _CACHE
+    ind = {
+        "price": c["price"],
+        "sma_fast": c[f"sma_{params.sma_fast}"],
+        "sma_mid": c[f"sma_{params.sma_mid}"],
+        "sma_slow": c[f"sma_{params.sma_slow}"],
+        "sma_slow_prev": c[f"sma_{params.sma_slow}_prev_{params.slope_lookback}"],
+        "low_52": c[f"low_52_{params.week52_bars}"],
+        "high_52": c[f"high_52_{params.week52_bars}"],
+        "rs": c["rs"],
+    }
+    conditions = evaluate_conditions(ind, params)
+    score = np.sum([conditions[name] for name in CONDITIONS], axis=0)
+    stats = forward_stats(score, {h: c[f"fwd_{h}"] for h in c["horizons"]}, min_score)
+
+    row = asdict(params)
+    for _, s in stats.iterrows():
+        h = int(s["Horizon"])
+        row[f"Signals {h}d"] = s["Signals"]
+        row[f"Hit Rate {h}d"] = s["Hit Rate"]
+        row[f"Mean Return {h}d"] = s["Mean Return"]
+    return row
+
+
+def run_sweep(close: pd.DataFrame, grid: Dict[str, Sequence] = DEFAULT_GRID, workers: int = WORKERS,
+              horizons: Sequence[int] = FORWARD_HORIZONS, rank_horizon: int = 60,
+              min_score: int = len(CONDITIONS)) -> pd.DataFrame:
+    """
+    Evaluates a grid of template parameters over a close panel.
+
+    Args:
+        close: Close prices, index = dates, columns = symbols.
+        grid: TemplateParams field -> list of values to try.
+        workers: Number of worker processes; 1 runs in this process.
+        horizons: Forward-return horizons in trading days.
+        rank_horizon: Horizon the table is ranked by.
+        min_score: Conditions a bar must meet to count as a signal.
+
+    Returns:
+        One row per parameter set, ranked by hit rate and then mean forward
+        return at `rank_horizon`.
+    """
+    points = expand_grid(grid)
+    print(f"Precomputing indicators for {len(points)} parameter sets...")
+    cache = precompute(close, points, horizons)
+
+    if workers <= 1:
+        _init_worker(cache)
+        rows = [evaluate_point(p, min_score) for p in points]
+    else:
+        # Only the file paths are pickled to the workers, not the arrays
+        with tempfile.TemporaryDirectory(prefix="param_sweep_") as directory:
+            saved = _save_cache(cache, directory)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(saved,)) as pool:
+                rows = list(pool.map(evaluate_point, points, itertools.repeat(min_score),
+                                     chunksize=max(1, len(points) // (workers * 4))))
+
+    table = pd.DataFrame(rows)
+    return table.sort_values([f"Hit Rate {rank_horizon}d", f"Mean Return {rank_horizon}d"],
+                             ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import price_store
+
+    store = price_store.PriceStore(os.path.join(".", "price_store"))
+    close = store.close_panel(store.symbols())
+    results = run_sweep(close)
+    print(results.head(20).to_string(index=False))
+    results.to_csv("SweepResults.csv", index=False)
+    print("💾 Saved to SweepResults.csv")
@@ -0,0 +1,102 @@
+"""
+Batched price downloads for the screener.
+
+Fetches many symbols per yf.download call and splits the combined frame back
+into one OHLCV frame per symbol. Symbols that come back empty are retried on
+their own, the rest are never downloaded twice. Symbols that already have
+stored history are not retried: an empty result for them usually just means
+no new bars (weekend or market holiday).
+"""
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+BATCH_SIZE = 100
+RETRIES = 2
+RETRY_PAUSE = 2.0  # seconds, multiplied by the attempt number
+
+
+def split_download(data: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Splits a multi-ticker yf.download result into per-symbol frames.
+
+    Handles both column layouts yfinance produces: (Ticker, Price) with
+    group_by="ticker" and (Price, Ticker) with the default grouping, as well as
+    the flat columns returned for a single symbol.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return frames
+
+    if isinstance(data.columns, pd.MultiIndex):
+        level = 0 if set(symbols) & set(data.columns.get_level_values(0)) else 1
+        available = set(data.columns.get_level_values(level))
+        for symbol in symbols:
+            if symbol not in available:
+                continue
+            df = data.xs(symbol, axis=1, level=level).dropna(how="all")
+            df.columns.name = None
+            if not df.empty:
+                frames[symbol] = df
+    elif len(symbols) == 1:
+        df = data.dropna(how="all")
+        if not df.empty:
+            frames[symbols[0]] = df
+    return frames
+
+
+def download_prices(symbols: Iterable[str], start, end, batch_size: int = BATCH_SIZE,
+                    retries: int = RETRIES, known: Iterable[str] = ()
+                    ) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+    """
+    Downloads daily bars for many symbols in batches.
+
+    Args:
+        symbols: Yahoo symbols to fetch.
+        start: First date to fetch.
+        end: Last date to fetch (exclusive, as in yf.download).
+        batch_size: Number of symbols per request.
+        retries: How many times symbols that failed are requested again.
+        known: Symbols that already have stored history; they are requested
+            once and never retried.
+
+    Returns:
+        A dict of symbol -> OHLCV frame and the list of symbols that still
+        had no data after all retries.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    pending = list(dict.fromkeys(str(s) for s in symbols))
+    known = set(known)
+    empty: List[str] = []
+
+    for attempt in range(retries + 1):
+        failed: List[str] = []
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            print(f"Downloading {len(batch)} symbols ({i + 1}-{i + len(batch)} of {len(pending)})...")
+            try:
+                data = yf.download(batch, start=start, end=end, group_by="ticker",
+                                   threads=True, progress=False)
+                got = split_download(data, batch)
+            except Exception as e:
+                print(f"Batch download failed: {type(e).__name__}: {e}")
+                got = {}
+            frames.update(got)
+            failed.extend(s for s in batch if s not in got)
+
+        empty.extend(s for s in failed if s in known)
+        failed = [s for s in failed if s not in known]
+        if not failed or attempt == retries:
+            return frames, empty + failed
+        print(f"Retrying {len(failed)} symbols with no data...")
+        time.sleep(RETRY_PAUSE * (attempt + 1))
+        pending = failed
+
+    return frames, empty + pending
+
+
+def close_panel(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Builds a date x symbol close-price panel from per-symbol frames."""
+    return pd.DataFrame({symbol: df["Close"] for symbol, df in frames.items()}).sort_index()
@@ -0,0 +1,334 @@
+"""
+Local OHLCV store for the screener.
+
+Daily bars are kept as Parquet files partitioned by symbol
+(<root>/symbol=<SYMBOL>/part-<first>-<last>.parquet). Every run only
+downloads the bars from the second-to-last stored date on and appends the
+new ones as a part file; parts are merged once a symbol accumulates too
+many of them. The overlapping bars are compared with the stored ones:
+
+    last bar changed      it was a partial (intraday) bar; it is replaced
+    earlier bar changed   the source re-adjusted its history (split,
+                          dividend); the symbol's history is downloaded
+                          again in full and rewritten
+"""
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import price_data
+
+STORE_DIR = "./price_store"
+COMPACT_AFTER = 30  # part files per symbol before they are merged into one
+OVERLAP_BARS = 2    # stored bars downloaded again to check the last one and the adjustment
+ADJUST_TOLERANCE = 1e-4  # relative Close change of a settled bar that means history was re-adjusted
+
+# Column types every part file is written with, whichever source the bars came
+# from, so parts of one symbol can always be concatenated
+FIELD_TYPES = {"Date": pa.timestamp("ns"), "Open": pa.float64(), "High": pa.float64(),
+               "Low": pa.float64(), "Close": pa.float64(), "Adj Close": pa.float64(),
+               "Volume": pa.int64()}
+
+
+def _conform(table: pa.Table) -> pa.Table:
+    """Casts the known columns of a table to FIELD_TYPES."""
+    for i, field in enumerate(table.schema):
+        wanted = FIELD_TYPES.get(field.name)
+        if wanted is not None and field.type != wanted:
+            table = table.set_column(i, pa.field(field.name, wanted), table.column(i).cast(wanted))
+    return table
+
+
+def _read_part(path: str, columns: Optional[List[str]] = None) -> pa.Table:
+    """Reads a part file with the store's column types, also for parts written before they were fixed."""
+    return _conform(pq.read_table(path, columns=columns, memory_map=True))
+
+
+class PriceStore:
+    """Append-only, symbol-partitioned Parquet store of daily bars."""
+
+    def __init__(self, root: str = STORE_DIR, compact_after: int = COMPACT_AFTER):
+        self.root = root
+        self.compact_after = compact_after
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---------- layout ----------
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, f"symbol={symbol}")
+
+    def _parts(self, symbol: str) -> List[str]:
+        path = self._symbol_dir(symbol)
+        if not os.path.isdir(path):
+            return []
+        # Part names start with the first date they hold, so name order is date order
+        return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".parquet")]
+
+    def symbols(self) -> List[str]:
+        """Symbols that have at least one stored bar."""
+        return sorted(
+            d[len("symbol="):] for d in os.listdir(self.root)
+            if d.startswith("symbol=") and self._parts(d[len("symbol="):])
+        )
+
+    # ---------- reads ----------
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Last stored bar date, read from the newest part's file name."""
+        parts = self._parts(symbol)
+        if not parts:
+            return None
+        last = os.path.basename(parts[-1])[:-len(".parquet")].split("-")[-1]
+        return pd.Timestamp(last)
+
+    def read(self, symbol: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads all stored bars of a symbol, indexed by date.
+
+        Part files are memory-mapped and converted without consolidating
+        column blocks, so numeric columns are not copied more than once.
+        """
+        parts = self._parts(symbol)
+        if not parts:
+            return pd.DataFrame()
+        if columns is not None and "Date" not in columns:
+            columns = ["Date"] + list(columns)
+        tables = [_read_part(p, columns) for p in parts]
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        return table.to_pandas(split_blocks=True, self_destruct=True).set_index("Date")
+
+    def read_since(self, symbol: str, after, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads only the bars dated after `after`.
+
+        Part files that end on or before `after` are skipped by name, so a
+        daily update touches just the newly appended part.
+        """
+        after = pd.Timestamp(after)
+        parts = [p for p in self._parts(symbol)
+                 if pd.Timestamp(os.path.basename(p)[:-len(".parquet")].split("-")[-1]) > after]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        if columns is not None and "Date" not in columns:
+            columns = ["Date"] + list(columns)
+        tables = [_read_part(p, columns) for p in parts]
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        df = table.to_pandas(split_blocks=True, self_destruct=True).set_index("Date")
+        return df[df.index > after]
+
+    def tail(self, symbol: str, bars: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """The last `bars` stored bars of a symbol, reading the newest parts only."""
+        if columns is not None and "Date" not in columns:
+            columns = ["Date"] + list(columns)
+        tables, rows = [], 0
+        for part in reversed(self._parts(symbol)):
+            table = _read_part(part, columns)
+            tables.append(table)
+            rows += table.num_rows
+            if rows >= bars:
+                break
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        return pa.concat_tables(tables[::-1]).to_pandas().set_index("Date").iloc[-bars:]
+
+    def close_panel(self, symbols: Iterable[str], field: str = "Close") -> pd.DataFrame:
+        """Builds a date x symbol panel of one field for the given symbols."""
+        series = {}
+        for symbol in symbols:
+            df = self.read(symbol, columns=[field])
+            if not df.empty:
+                series[symbol] = df[field]
+        return pd.DataFrame(series).sort_index()
+
+    def tail_panels(self, symbols: Iterable[str], fields: List[str], bars: int) -> Dict[str, pd.DataFrame]:
+        """
+        Builds date x symbol panels of the last `bars` bars for several fields.
+
+        Part files are read newest first and only until enough bars are
+        collected, so recent daily parts are usually all that is touched.
+        """
+        series: Dict[str, Dict[str, pd.Series]] = {field: {} for field in fields}
+        for symbol in symbols:
+            tables, rows = [], 0
+            for part in reversed(self._parts(symbol)):
+                table = _read_part(part, ["Date"] + list(fields))
+                tables.append(table)
+                rows += table.num_rows
+                if rows >= bars:
+                    break
+            if not tables:
+                continue
+            df = pa.concat_tables(tables[::-1]).to_pandas().set_index("Date").iloc[-bars:]
+            for field in fields:
+                series[field][symbol] = df[field]
+        return {field: pd.DataFrame(s).sort_index() for field, s in series.items()}
+
+    # ---------- writes ----------
+    def append(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Appends bars newer than the last stored date as a new part file.
+
+        Returns:
+            The number of bars written.
+        """
+        if df is None or df.empty:
+            return 0
+        df = df.sort_index()
+        df.index = pd.to_datetime(df.index).tz_localize(None).as_unit("ns")
+        df.index.name = "Date"
+        if "Volume" in df.columns:
+            # Volume is int64 in every part; sources that deliver it as float (bhavcopy) are rounded
+            df = df.assign(Volume=df["Volume"].fillna(0).round())
+        last = self.last_date(symbol)
+        if last is not None:
+            df = df[df.index > last]
+        if df.empty:
+            return 0
+
+        path = self._symbol_dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        name = f"part-{df.index[0]:%Y%m%d}-{df.index[-1]:%Y%m%d}.parquet"
+        table = _conform(pa.Table.from_pandas(df.reset_index(), preserve_index=False))
+        pq.write_table(table, os.path.join(path, name))
+
+        if len(self._parts(symbol)) > self.compact_after:
+            self.compact(symbol)
+        return len(df)
+
+    def truncate(self, symbol: str, from_date) -> None:
+        """Drops the stored bars dated on or after `from_date`; only parts reaching it are rewritten."""
+        from_date = pd.Timestamp(from_date)
+        for part in self._parts(symbol):
+            last = pd.Timestamp(os.path.basename(part)[:-len(".parquet")].split("-")[-1])
+            if last < from_date:
+                continue
+            df = _read_part(part).to_pandas()
+            kept = df[df["Date"] < from_date]
+            tmp = None
+            if not kept.empty:
+                name = f"part-{kept['Date'].iloc[0]:%Y%m%d}-{kept['Date'].iloc[-1]:%Y%m%d}.parquet"
+                tmp = os.path.join(self._symbol_dir(symbol), name + ".tmp")
+                pq.write_table(_conform(pa.Table.from_pandas(kept, preserve_index=False)), tmp)
+            os.remove(part)
+            if tmp is not None:
+                os.replace(tmp, tmp[:-len(".tmp")])
+
+    def rewrite(self, symbol: str, df: pd.DataFrame) -> int:
+        """Replaces the whole stored history of a symbol."""
+        for part in self._parts(symbol):
+            os.remove(part)
+        return self.append(symbol, df)
+
+    def compact(self, symbol: str) -> None:
+        """Merges all part files of a symbol into a single file."""
+        parts = self._parts(symbol)
+        if len(parts) < 2:
+            return
+        table = pa.concat_tables([_read_part(p) for p in parts])
+        first = os.path.basename(parts[0]).split("-")[1]
+        last = os.path.basename(parts[-1])[:-len(".parquet")].split("-")[-1]
+        target = os.path.join(self._symbol_dir(symbol), f"part-{first}-{last}.parquet")
+        tmp = target + ".tmp"
+        pq.write_table(table, tmp)
+        for p in parts:
+            os.remove(p)
+        os.replace(tmp, target)
+
+    def _merge_tail(self, symbol: str, stored: pd.DataFrame, df: pd.DataFrame) -> Tuple[int, str]:
+        """
+        Appends a downloaded tail that overlaps the stored bars `stored`.
+
+        Returns:
+            The number of bars written and what happened: "appended",
+            "replaced" (the stored last bar changed) or "readjusted" (a
+            settled bar's Close changed, nothing written; the symbol has to
+            be downloaded again in full).
+        """
+        df = df.sort_index()
+        df.index = pd.to_datetime(df.index).tz_localize(None)
+        last = stored.index[-1]
+        settled = stored.index[:-1].intersection(df.index)
+        if len(settled):
+            old = stored.loc[settled, "Close"].to_numpy(dtype="float64")
+            new = df.loc[settled, "Close"].to_numpy(dtype="float64")
+            if not np.allclose(old, new, rtol=ADJUST_TOLERANCE, equal_nan=True):
+                return 0, "readjusted"
+        if last in df.index:
+            fields = [c for c in stored.columns if c in df.columns]
+            old = stored.loc[last, fields].to_numpy(dtype="float64")
+            new = df.loc[last, fields].to_numpy(dtype="float64")
+            if not np.allclose(old, new, rtol=0, atol=1e-9, equal_nan=True):
+                # The stored last bar was still forming when it was downloaded
+                self.truncate(symbol, last)
+                return self.append(symbol, df[df.index >= last]), "replaced"
+        return self.append(symbol, df), "appended"
+
+    def update(self, symbols: Iterable[str], start, end,
+               downloader: Callable = price_data.download_prices
+               ) -> Tuple[Dict[str, int], List[str], List[str]]:
+        """
+        Fetches the missing tail of every symbol and appends it.
+
+        The last OVERLAP_BARS stored bars are downloaded again: a changed
+        last bar is replaced, a changed earlier bar means the source
+        re-adjusted the history, which is then downloaded and rewritten in
+        full. Symbols are grouped by the date their tail starts at, so a
+        daily update of an up-to-date universe is a single batched download.
+
+        Args:
+            symbols: Symbols to bring up to date.
+            start: History start for symbols not in the store yet.
+            end: End passed to the downloader (exclusive). Passing the start
+                of today keeps the current session's bar out of the store.
+            downloader: Function with the signature of price_data.download_prices.
+
+        Returns:
+            A dict of symbol -> bars written, the list of symbols whose
+            download failed and the list of symbols whose stored bars
+            changed (derived state of those must be rebuilt).
+        """
+        end = pd.Timestamp(end)
+        groups: Dict[pd.Timestamp, List[str]] = {}
+        stored: Dict[str, pd.DataFrame] = {}
+        for symbol in dict.fromkeys(symbols):
+            tail = self.tail(symbol, OVERLAP_BARS)
+            if tail.empty:
+                tail_start = pd.Timestamp(start)
+            else:
+                stored[symbol] = tail
+                tail_start = tail.index[0]
+                if tail.index[-1] >= end:
+                    continue
+            groups.setdefault(tail_start, []).append(symbol)
+
+        appended: Dict[str, int] = {}
+        failed: List[str] = []
+        readjusted: List[str] = []
+        rewritten: List[str] = []
+        for tail_start, group in sorted(groups.items()):
+            print(f"Updating {len(group)} symbols from {tail_start:%Y-%m-%d}...")
+            frames, missing = downloader(group, tail_start, end, known=[s for s in group if s in stored])
+            for symbol, df in frames.items():
+                if symbol not in stored:
+                    appended[symbol] = self.append(symbol, df)
+                    continue
+                written, outcome = self._merge_tail(symbol, stored[symbol], df)
+                if outcome == "readjusted":
+                    readjusted.append(symbol)
+                    continue
+                appended[symbol] = written
+                if outcome == "replaced":
+                    rewritten.append(symbol)
+            # An up-to-date symbol with no new bar is not a failure
+            failed.extend(s for s in missing if s not in stored)
+
+        if readjusted:
+            print(f"Re-downloading {len(readjusted)} symbols whose history was re-adjusted...")
+            frames, missing = downloader(readjusted, start, end)
+            for symbol, df in frames.items():
+                appended[symbol] = self.rewrite(symbol, df)
+                rewritten.append(symbol)
+            failed.extend(missing)
+        return appended, failed, rewritten
@@ -0,0 +1,103 @@
+"""
+Result accumulation and export for the screener.
+
+ResultBuilder collects rows into typed columns and builds the DataFrame
+once, instead of growing a frame row by row. ResultExporter writes each
+result table to Parquet and/or Arrow IPC as soon as it is produced and
+writes the (slow) Excel workbook last, so downstream tools do not wait on
+openpyxl.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = ("parquet", "xlsx")
+
+ERROR_SCHEMA = {"Stock": "string", "Stage": "string", "Error": "string", "Message": "string"}
+
+
+class ResultBuilder:
+    """Column-wise row accumulator with a fixed schema."""
+
+    def __init__(self, schema: Dict[str, str]):
+        self.schema = schema
+        self.columns: Dict[str, List] = {name: [] for name in schema}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def add(self, row: dict) -> None:
+        """Adds one row; missing columns are stored as nulls."""
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+
+    def extend(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.add(row)
+
+    def add_frame(self, df: pd.DataFrame) -> None:
+        """Adds all rows of a DataFrame that has (a subset of) the schema's columns."""
+        n = len(df)
+        for name, values in self.columns.items():
+            values.extend(df[name].tolist() if name in df.columns else [None] * n)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Builds the DataFrame in one go, with the schema's dtypes."""
+        return pd.DataFrame({
+            name: pd.Series(values, dtype=self.schema[name]) for name, values in self.columns.items()
+        })
+
+
+class ResultExporter:
+    """
+    Writes result tables next to each other as <stem>.<ext> files.
+
+    The first table passed to `write` is the main output (<stem>.parquet);
+    further tables get their name appended (<stem>_<name>.parquet). Parquet
+    and Arrow files are written immediately; Excel sheets are buffered and
+    written in one workbook by `close`.
+    """
+
+    def __init__(self, stem: str, formats: Iterable[str] = EXPORT_FORMATS):
+        self.stem = stem
+        self.formats = tuple(formats)
+        self.sheets: Dict[str, pd.DataFrame] = {}
+        self.paths: List[str] = []
+
+    def _path(self, name: str, ext: str) -> str:
+        suffix = "" if not self.sheets else f"_{name}"
+        return f"{self.stem}{suffix}.{ext}"
+
+    def write(self, name: str, df: pd.DataFrame) -> None:
+        table: Optional[pa.Table] = None
+        if "parquet" in self.formats or "arrow" in self.formats:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        if "parquet" in self.formats:
+            path = self._path(name, "parquet")
+            pq.write_table(table, path)
+            self.paths.append(path)
+        if "arrow" in self.formats:
+            path = self._path(name, "arrow")
+            feather.write_feather(table, path)
+            self.paths.append(path)
+        self.sheets[name] = df
+
+    def close(self) -> List[str]:
+        """Writes the Excel workbook (if requested) and returns all files written."""
+        if "xlsx" in self.formats and self.sheets:
+            path = f"{self.stem}.xlsx"
+            with pd.ExcelWriter(path, engine="openpyxl") as writer:
+                for name, df in self.sheets.items():
+                    df.to_excel(writer, sheet_name=name, index=False)
+            self.paths.append(path)
+        return self.paths
+
+    def __enter__(self) -> "ResultExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,101 @@
+"""
+In-house IBD-style RS Rating.
+
+The relative-strength score is a weighted 3/6/9/12-month return
+(40/20/20/20, the last quarter counted twice), ranked against every symbol
+of the universe and scaled to a 1-99 percentile. Ratings are cached per
+trading day so repeated screens on the same bar cost nothing.
+"""
+import math
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# (lookback in trading days, weight) for 3, 6, 9 and 12 months
+RS_WEIGHTS = ((63, 0.4), (126, 0.2), (189, 0.2), (252, 0.2))
+RS_BARS = max(lag for lag, _ in RS_WEIGHTS) + 1
+RS_CACHE_DIR = "./rs_cache"
+
+
+def rs_score(close: pd.DataFrame) -> pd.DataFrame:
+    """Weighted 3/6/9/12-month return for every date and symbol of a close panel."""
+    close = close.ffill()
+    return sum(weight * (close / close.shift(lag) - 1) for lag, weight in RS_WEIGHTS)
+
+
+def rank_scores(score):
+    """
+    Converts raw RS scores to 1-99 ratings.
+
+    Works on a per-symbol Series (one date) or on a date x symbol panel, where
+    every date is ranked across its symbols. Missing scores stay missing.
+    """
+    if isinstance(score, pd.DataFrame):
+        pct = score.rank(axis=1, pct=True)
+    else:
+        pct = score.rank(pct=True)
+    return np.ceil(pct * 99).clip(1, 99)
+
+
+def rs_rating_history(close: pd.DataFrame) -> pd.DataFrame:
+    """RS Rating of every symbol on every date of the panel."""
+    return rank_scores(rs_score(close))
+
+
+def rs_rating(close: pd.DataFrame) -> pd.Series:
+    """RS Rating of every symbol on the last bar. Only the trailing year is read."""
+    tail = close.ffill().iloc[-RS_BARS:]
+    last = tail.iloc[-1]
+    score = pd.Series(0.0, index=tail.columns)
+    for lag, weight in RS_WEIGHTS:
+        past = tail.iloc[-1 - lag] if len(tail) > lag else pd.Series(np.nan, index=tail.columns)
+        score += weight * (last / past - 1)
+    return rank_scores(score)
+
+
+def rs_rating_from_states(states: Dict[str, object]) -> pd.Series:
+    """
+    RS Rating on the last bar from indicator_state.IndicatorState objects.
+
+    The states keep the last year of closes, so the daily screen can rank
+    the universe without reading any price history.
+    """
+    scores = {}
+    for symbol, state in states.items():
+        last = state.close_ago(0)
+        score = 0.0
+        for lag, weight in RS_WEIGHTS:
+            past = state.close_ago(lag)
+            score += weight * (last / past - 1) if past and not math.isnan(past) else math.nan
+        scores[symbol] = score
+    return rank_scores(pd.Series(scores, dtype=float))
+
+
+def cached_rs_rating(asof, compute, cache_dir: str = RS_CACHE_DIR,
+                     symbols: Optional[list] = None) -> pd.Series:
+    """
+    Returns the RS Rating for trading day `asof`, computing it at most once.
+
+    Args:
+        asof: Date of the last bar the ratings are for.
+        compute: Zero-argument function returning the ratings as a Series.
+        cache_dir: Directory holding one CSV per trading day.
+        symbols: Symbols that must be in the cached ratings; the cache is
+            rebuilt when any of them is missing.
+
+    Returns:
+        A Series of ratings indexed by symbol.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"RS_Rating_{pd.Timestamp(asof):%Y%m%d}.csv")
+    if os.path.exists(path):
+        cached = pd.read_csv(path, index_col=0)["RS_Rating"]
+        if symbols is None or set(symbols) <= set(cached.index):
+            return cached
+
+    ratings = compute().rename("RS_Rating")
+    ratings.index.name = "Symbol"
+    ratings.to_csv(path)
+    return ratings
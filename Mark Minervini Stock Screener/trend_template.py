@@ -0,0 +1,157 @@
+"""
+Vectorized Minervini trend template.
+
+Evaluates the eight trend-template conditions for a whole price panel
+(index = dates, columns = symbols) with pandas/NumPy array operations
+instead of looping over one stock at a time.
+"""
+from dataclasses import dataclass
+from typing import Dict
+
+import pandas as pd
+
+EXPORT_COLUMNS = [
+    'Stock',
+    'Current Price',
+    'RS_Rating',
+    '50 Day MA',
+    '150 Day Ma',
+    '200 Day MA',
+    '52 Week Low',
+    '52 week High'
+]
+
+CONDITIONS = [f"cond_{i}" for i in range(1, 9)]
+
+
+@dataclass(frozen=True)
+class TemplateParams:
+    """Thresholds and windows used by the trend template."""
+    sma_fast: int = 50
+    sma_mid: int = 150
+    sma_slow: int = 200
+    slope_lookback: int = 20      # SMA_200 is compared with SMA_200.iloc[-slope_lookback]
+    week52_bars: int = 260
+    low_multiple: float = 1.3     # price >= 1.3 * 52 week low
+    high_multiple: float = 0.75   # price >= 0.75 * 52 week high
+    rs_min: float = 70
+
+    def history_bars(self) -> int:
+        """Number of trailing bars needed to evaluate the latest bar."""
+        return max(self.week52_bars, self.sma_slow + self.slope_lookback - 1)
+
+
+DEFAULT_PARAMS = TemplateParams()
+
+
+def rolling_indicators(close: pd.DataFrame, params: TemplateParams = DEFAULT_PARAMS) -> Dict[str, pd.DataFrame]:
+    """
+    Computes every indicator the template needs as full-history panels.
+
+    Gaps in a symbol's series are forward-filled so a missing print does not
+    blank out the moving averages of that symbol.
+    """
+    close = close.ffill()
+    sma = {
+        window: close.rolling(window=window).mean().round(2)
+        for window in {params.sma_fast, params.sma_mid, params.sma_slow}
+    }
+    return {
+        "price": close,
+        "sma_fast": sma[params.sma_fast],
+        "sma_mid": sma[params.sma_mid],
+        "sma_slow": sma[params.sma_slow],
+        "sma_slow_prev": sma[params.sma_slow].shift(params.slope_lookback - 1),
+        "low_52": close.rolling(window=params.week52_bars, min_periods=1).min(),
+        "high_52": close.rolling(window=params.week52_bars, min_periods=1).max(),
+    }
+
+
+def latest_indicators(close: pd.DataFrame, params: TemplateParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """
+    Indicator values on the last bar, one row per symbol.
+
+    Only the trailing `params.history_bars()` rows are used, so the cost does
+    not grow with the length of the stored history.
+    """
+    tail = close.iloc[-params.history_bars():]
+    indicators = rolling_indicators(tail, params)
+    return pd.DataFrame({name: panel.iloc[-1] for name, panel in indicators.items()})
+
+
+def evaluate_conditions(ind, params: TemplateParams = DEFAULT_PARAMS) -> Dict[str, object]:
+    """
+    Evaluates the eight conditions on aligned indicator values.
+
+    `ind` maps the names returned by `rolling_indicators` plus "rs" to either
+    per-symbol Series (latest bar) or date x symbol panels (full history).
+    Comparisons against missing values are False, as in the scalar version.
+    """
+    price = ind["price"]
+    fast, mid, slow = ind["sma_fast"], ind["sma_mid"], ind["sma_slow"]
+    return {
+        # Condition 1: Current Price > 150 SMA and > 200 SMA
+        "cond_1": (price > mid) & (price > slow),
+        # Condition 2: 150 SMA > 200 SMA
+        "cond_2": mid > slow,
+        # Condition 3: 200 SMA trending up for at least 1 month
+        "cond_3": slow > ind["sma_slow_prev"],
+        # Condition 4: 50 SMA > 150 SMA and 50 SMA > 200 SMA
+        "cond_4": (fast > mid) & (fast > slow),
+        # Condition 5: Current Price > 50 SMA
+        "cond_5": price > fast,
+        # Condition 6: Current Price is at least 30% above 52 week low
+        "cond_6": price >= params.low_multiple * ind["low_52"],
+        # Condition 7: Current Price is within 25% of 52 week high
+        "cond_7": price >= params.high_multiple * ind["high_52"],
+        # Condition 8: IBD RS rating > 70
+        "cond_8": ind["rs"] > params.rs_min,
+    }
+
+
+def trend_template(latest: pd.DataFrame, rs_rating: pd.Series, params: TemplateParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """
+    Conditions and score for the latest bar of every symbol.
+
+    Returns `latest` with the "rs" column, the eight condition flags and
+    "score" added.
+    """
+    result = latest.copy()
+    result["rs"] = pd.to_numeric(rs_rating.reindex(result.index), errors="coerce")
+    conditions = evaluate_conditions(result, params)
+    for name in CONDITIONS:
+        result[name] = conditions[name]
+    result["score"] = result[CONDITIONS].sum(axis=1)
+    return result
+
+
+def to_export_frame(result: pd.DataFrame, min_score: int = 1) -> pd.DataFrame:
+    """Shapes a `trend_template` result like the screener's exportList."""
+    passed = result[result["score"] >= min_score]
+    return pd.DataFrame({
+        'Stock': passed.index,
+        'Current Price': passed["price"].values,
+        'RS_Rating': passed["rs"].values,
+        '50 Day MA': passed["sma_fast"].values,
+        '150 Day Ma': passed["sma_mid"].values,
+        '200 Day MA': passed["sma_slow"].values,
+        '52 Week Low': passed["low_52"].values,
+        '52 week High': passed["high_52"].values,
+    }, columns=EXPORT_COLUMNS)
+
+
+def screen(close: pd.DataFrame, rs_rating: pd.Series, params: TemplateParams = DEFAULT_PARAMS, min_score: int = 1) -> pd.DataFrame:
+    """
+    Runs the trend template over a close-price panel.
+
+    Args:
+        close: Close prices, index = dates, columns = symbols.
+        rs_rating: RS rating per symbol.
+        params: Template thresholds.
+        min_score: Minimum number of conditions a symbol must meet.
+
+    Returns:
+        A DataFrame with the exportList columns for every symbol that passed.
+    """
+    result = trend_template(latest_indicators(close, params), rs_rating, params)
+    return to_export_frame(result, min_score)
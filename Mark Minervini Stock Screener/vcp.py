@@ -0,0 +1,103 @@
+"""
+Vectorized volatility contraction pattern (VCP) detector.
+
+The trailing base of every symbol is cut into equal segments with a single
+reshape of the price panel. Each segment's pullback depth is
+(highest high - lowest low) / highest high; a VCP is a run of successively
+shallower pullbacks that ends tight, on drying-up volume. All symbols are
+scanned at once, so the cost is of the same order as the trend template.
+
+The equal segments approximate the pullbacks: a real VCP's contractions are
+delimited by swing highs and lows and get shorter as well as shallower, so
+a contraction that straddles a segment boundary is split between two
+segments. Tune `segment_bars` to the typical pullback length of the
+universe rather than reading the result as a swing-point analysis.
+"""
+import warnings
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+VCP_COLUMNS = ['VCP', 'Contractions', 'Pivot']
+
+
+@dataclass(frozen=True)
+class VCPParams:
+    """Shape of the base and thresholds for a valid VCP."""
+    segments: int = 4             # pullbacks looked at
+    segment_bars: int = 20        # bars per pullback
+    min_contractions: int = 2     # successive narrowing pullbacks required
+    max_final_depth: float = 0.10  # last pullback at most 10% deep
+    volume_dry_up: float = 0.75   # last segment's volume below 75% of the base average
+
+    @property
+    def base_bars(self) -> int:
+        return self.segments * self.segment_bars
+
+
+DEFAULT_VCP_PARAMS = VCPParams()
+
+
+def _segments(values: np.ndarray, missing: np.ndarray, params: VCPParams) -> np.ndarray:
+    """
+    Trailing base as an array of shape (segments, segment_bars, symbols).
+
+    Rows in `missing` are pushed to the top of each column first, so every
+    symbol's base is made of its own last bars even when its history ends
+    earlier than the panel's or has suspended days. Passing the same mask
+    for every field keeps High, Low and Volume on the same dates.
+    """
+    values = np.where(missing, np.nan, values)
+    order = np.argsort(~missing, axis=0, kind="stable")
+    values = np.take_along_axis(values, order, axis=0)[-params.base_bars:]
+    if values.shape[0] < params.base_bars:
+        pad = np.full((params.base_bars - values.shape[0], values.shape[1]), np.nan)
+        values = np.vstack([pad, values])
+    return values.reshape(params.segments, params.segment_bars, values.shape[1])
+
+
+def detect_vcp(panels: Dict[str, pd.DataFrame], params: VCPParams = DEFAULT_VCP_PARAMS) -> pd.DataFrame:
+    """
+    Scans the latest base of every symbol for a VCP.
+
+    Args:
+        panels: "High", "Low" and "Volume" panels (index = dates,
+            columns = symbols) covering at least `params.base_bars` bars.
+        params: Base shape and thresholds.
+
+    Returns:
+        One row per symbol with the VCP flag, the number of successive
+        contractions ending at the latest pullback and the pivot price (the
+        highest high of the latest pullback).
+    """
+    symbols = panels["High"].columns
+    dates = panels["High"].index
+    fields = [panels[name].reindex(index=dates, columns=symbols).to_numpy(dtype=float)
+              for name in ("High", "Low", "Volume")]
+    # A bar missing any field is dropped from all three
+    missing = np.isnan(fields[0]) | np.isnan(fields[1]) | np.isnan(fields[2])
+    high, low, volume = (_segments(values, missing, params) for values in fields)
+
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices of short histories
+        seg_high = np.nanmax(high, axis=1)              # (segments, symbols)
+        seg_low = np.nanmin(low, axis=1)
+        depth = (seg_high - seg_low) / seg_high
+
+        # Count successive narrowing pullbacks backwards from the latest one
+        narrowing = depth[1:] < depth[:-1]              # (segments - 1, symbols)
+        run = np.cumprod(narrowing[::-1], axis=0).sum(axis=0)
+        contractions = np.where(np.isnan(depth).any(axis=0), 0, run + 1)
+
+        last_volume = np.nanmean(volume[-1], axis=0)
+        base_volume = np.nanmean(volume.reshape(params.base_bars, volume.shape[-1]), axis=0)
+        dry_up = last_volume < params.volume_dry_up * base_volume
+
+    flag = (contractions >= params.min_contractions) & (depth[-1] <= params.max_final_depth) & dry_up
+    return pd.DataFrame({
+        'VCP': flag,
+        'Contractions': contractions.astype(int),
+        'Pivot': np.round(seg_high[-1], 2),
+    }, index=symbols)
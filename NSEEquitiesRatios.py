@@ -0,0 +1,160 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import pandas as pd
+import yfinance as yf
+from datetime import datetime
+
+import checkpoint
+import circuit_breaker
+import fundamentals_store
+import http_cache
+import rate_limit
+import ratio_engine
+import symbol_master
+
+# -------------------------------------------------------
+# Step 1 — Get all NSE equity symbols (exclude indices/ETFs)
+# -------------------------------------------------------
+def get_nse_equity_symbols():
+    # Shared local symbol master, refreshed from EQUITY_L.csv at most once a day
+    master = symbol_master.load_symbol_master()
+
+    # EQ series only (equity shares)
+    symbols = master.symbols(series="EQ", suffix=".NS")
+    print(f"✅ Found {len(symbols)} NSE equity shares (from EQUITY_L.csv)")
+    return symbols
+
+
+# -------------------------------------------------------
+# Step 2 — Fetch all available ratios for each company
+# -------------------------------------------------------
+def fetch_ratios(symbol):
+    """Raw Yahoo fields of one company; the ratios are computed for all at once in main()."""
+    try:
+        stock = yf.Ticker(symbol)
+        info = http_cache.cached_json("yahoo_info", symbol, lambda: stock.info, rate_limit.YAHOO_HOST)
+
+        return {
+            "Symbol": symbol.replace(".NS", ""),
+            **ratio_engine.company_fields(info),
+            **ratio_engine.raw_fields(info),
+        }
+
+    except circuit_breaker.CircuitOpenError:
+        raise  # not a failure of this symbol; main() leaves it for --resume
+    except Exception as e:
+        print(f"⚠️ Error fetching {symbol}: {e}")
+        return None
+
+
+def fetch_or_skip(symbol):
+    """(symbol, raw fields or None, skipped) — skipped while Yahoo's circuit is open."""
+    try:
+        return symbol, fetch_ratios(symbol), False
+    except circuit_breaker.CircuitOpenError:
+        return symbol, None, True
+
+
+# Times a symbol skipped by Yahoo's open circuit is queued again before it is left for --resume
+MAX_REQUEUES = 5
+
+# Source name the raw fields are recorded under in the fundamentals store
+SOURCE = "yahoo_info"
+
+# Output columns, in order
+RATIO_COLUMNS = [
+    "Symbol", "Company", "Sector", "Industry", "P/E", "P/B", "ROE (%)", "Debt/Equity",
+    "Dividend Yield (%)", "Price/Sales", "PEG", "Market Cap", "52W High", "52W Low", "Beta",
+]
+
+
+# -------------------------------------------------------
+# Step 3 — Main driver with append-only checkpoints
+# -------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch Yahoo Finance ratios for every NSE equity.")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip symbols already in today's checkpoint log")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="with --resume, fetch symbols that failed earlier again")
+    parser.add_argument("--max-age", type=int, default=0, metavar="DAYS",
+                        help="reuse fundamentals stored in the last DAYS days instead of fetching them again")
+    args = parser.parse_args(argv)
+
+    symbols = get_nse_equity_symbols()
+
+    batch_size = 50
+    run_date = datetime.now().strftime('%Y%m%d')
+    log_name = f"NSE_Equity_Ratios_{run_date}.checkpoint.jsonl"
+    file_name = f"NSE_Equity_Ratios_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+    if not args.resume and os.path.exists(log_name):
+        os.remove(log_name)  # fresh run for today
+    log = checkpoint.CheckpointLog(log_name)
+    done = log.done(include_failed=not args.retry_failed)
+    todo = [s for s in symbols if s not in done]
+    if args.resume:
+        print(f"⏩ Resuming: {len(symbols) - len(todo)} symbols already done, {len(todo)} to go")
+
+    store = fundamentals_store.FundamentalsStore()
+    reused = []
+    if args.max_age > 0:
+        # Symbols fetched recently enough are read back from the fundamentals store
+        fresh = store.fresh_symbols(SOURCE, args.max_age)
+        reused = [s for s in todo if s.replace(".NS", "") in fresh]
+        todo = [s for s in todo if s.replace(".NS", "") not in fresh]
+        print(f"♻️ Reusing stored fundamentals of {len(reused)} symbols from the last {args.max_age} days")
+
+    # Symbols are fetched in parallel; Yahoo's circuit breaker adapts how many
+    # requests are actually in flight and stops them while Yahoo is throttling
+    yahoo = circuit_breaker.get_source(rate_limit.YAHOO_HOST)
+    queue, requeued, batch_no = list(todo), {}, 0
+    with ThreadPoolExecutor(max_workers=yahoo.maximum) as pool:
+        while queue:
+            batch, queue = queue[:batch_size], queue[batch_size:]
+            wait = yahoo.retry_in()
+            if wait:
+                print(f"⏸️ Yahoo circuit open, waiting {wait:.0f}s before the next batch")
+                time.sleep(wait)
+            batch_no += 1
+            print(f"\n📦 Processing batch {batch_no} ({len(queue)} symbols queued after it) ...")
+
+            # Append this batch only; the log never gets rewritten
+            results = list(pool.map(fetch_or_skip, batch))
+            log.append_batch((s, r) for s, r, skipped in results if not skipped)
+            # Symbols skipped by an open circuit go back in the queue and are fetched
+            # once it closes; after MAX_REQUEUES they stay out of the log for --resume
+            skipped = [s for s, _, k in results if k]
+            for symbol in skipped:
+                requeued[symbol] = requeued.get(symbol, 0) + 1
+            retry = [s for s in skipped if requeued[s] <= MAX_REQUEUES]
+            queue.extend(retry)
+            if skipped:
+                print(f"⏸️ {len(skipped)} symbols skipped while Yahoo's circuit was open, {len(retry)} queued again")
+            print(f"💾 Checkpointed {len(log)} / {len(symbols)} symbols → {log_name}")
+
+    # Build the output once, from the log; the ratios are computed for all symbols together
+    all_data = log.records()
+    raw = pd.DataFrame(all_data)
+    stored = store.as_of(source=SOURCE, symbols=[s.replace(".NS", "") for s in reused])
+    stored = stored.rename_axis(columns=None).reset_index().rename(columns={"symbol": "Symbol"})
+    ratios = ratio_engine.with_ratios(pd.concat([raw, stored], ignore_index=True)).reindex(columns=RATIO_COLUMNS)
+    ratios.to_excel(file_name, index=False)
+    # Only fetched rows are recorded, so reused ones still age out after --max-age days
+    with store:
+        store.record_frame(raw, source=SOURCE)
+
+    print(f"\n✅ Completed. Total companies processed: {len(all_data) + len(stored)}")
+    left = [s for s, n in requeued.items() if n > MAX_REQUEUES]
+    if left:
+        print(f"⏸️ {len(left)} symbols never got past Yahoo's open circuit (rerun with --resume)")
+    if log.failed():
+        print(f"⚠️ {len(log.failed())} symbols failed (rerun with --resume --retry-failed)")
+    print(f"📁 Final file saved as: {file_name}")
+
+
+if __name__ == "__main__":
+    main()
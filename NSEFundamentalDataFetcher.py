@@ -1,8 +1,11 @@
 import yfinance as yf
 import pandas as pd
-import time
 from typing import List, Dict, Any, Optional
 
+import fundamentals_store
+import http_cache
+import rate_limit
+
 # --- Configuration ---
 # NOTE: PEG Ratio and FII Holding are usually NOT available directly via yfinance.
 # In a real-world application, you would need to use a dedicated paid API (like Finnhub, Alpha Vantage)
@@ -60,8 +63,10 @@ def fetch_nse_fundamentals(tickers: List[str]) -> pd.DataFrame:
             # Fetch Ticker object
             ticker = yf.Ticker(ticker_symbol)
 
-            # Get general info (P/E is often found here)
-            info = ticker.info
+            # Get general info (P/E is often found here).
+            # Served from the local cache when fresh; otherwise the shared Yahoo
+            # rate limiter paces the request instead of a fixed sleep.
+            info = http_cache.cached_json("yahoo_info", ticker_symbol, lambda: ticker.info, rate_limit.YAHOO_HOST)
 
             # Extract P/E Ratio (Trailing P/E)
             # Use get() for safe access as keys might be missing
@@ -79,9 +84,6 @@ def fetch_nse_fundamentals(tickers: List[str]) -> pd.DataFrame:
                 'FII Holding % (Simulated)': fii_holding
             })
 
-            # Be a good citizen: Wait slightly between requests to avoid rate-limiting
-            time.sleep(0.5)
-
         except Exception as e:
             print(f"Error fetching data for {ticker_symbol}: {e}")
             results.append({
@@ -91,7 +93,6 @@ def fetch_nse_fundamentals(tickers: List[str]) -> pd.DataFrame:
                 'PEG Ratio (Simulated)': None,
                 'FII Holding % (Simulated)': None
             })
-            time.sleep(0.5) # Still wait on error
 
     # Convert the list of results into a DataFrame
     df = pd.DataFrame(results)
@@ -117,6 +118,10 @@ if __name__ == "__main__":
     fundamental_data.to_csv(output_filename, index=False)
     print(f"\nData successfully saved to {output_filename}")
 
+    # Keep a dated version of the fetched (non-simulated) fields
+    with fundamentals_store.FundamentalsStore() as store:
+        store.record_frame(fundamental_data[['Symbol', 'Company Name', 'P/E Ratio']], source="yahoo_summary")
+
     # Example of analysis: filter for low P/E stocks
     low_pe_stocks = fundamental_data[
         (fundamental_data['P/E Ratio'] > 0) &
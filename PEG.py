@@ -1,39 +1,40 @@
-
+import pandas as pd
 import yfinance as yf
 
+import http_cache
+import rate_limit
+import ratio_engine
+import statements_store
+
 # --- Variable Descriptions ---
-# symbol: NSE/BSE stock symbol (use .NS for NSE stocks in Yahoo Finance)
-# years: number of years used for EPS growth comparison
+# symbols: NSE/BSE stock symbols (use .NS for NSE stocks in Yahoo Finance)
+# years: number of years used for the EPS growth (CAGR)
 
-symbol = "RELIANCE.NS"  # Example: Reliance Industries
-years = 3               # 3-year EPS growth
+symbols = ["RELIANCE.NS"]  # Example: Reliance Industries
+years = 3                  # 3-year EPS CAGR
 
 # --- Fetch data ---
-stock = yf.Ticker(symbol)
-info = stock.info
-
-# --- Extract data ---
-pe_ratio = info.get("trailingPE")
-eps_ttm = info.get("trailingEps")
+# P/E from the (cached) quote info
+pe = {}
+for symbol in symbols:
+    stock = yf.Ticker(symbol)
+    info = http_cache.cached_json("yahoo_info", symbol, lambda: stock.info, rate_limit.YAHOO_HOST)
+    pe[symbol] = info.get("trailingPE")
+pe = pd.to_numeric(pd.Series(pe), errors="coerce")
 
 # --- Historical EPS for growth ---
-# Fetch annual income statements for EPS comparison
-financials = stock.financials
-eps_history = financials.loc["Diluted EPS"] if "Diluted EPS" in financials.index else None
-
-if eps_history is not None and eps_history.size >= 2:
-    latest_eps = eps_history.iloc[0]
-    old_eps = eps_history.iloc[min(years - 1, len(eps_history) - 1)]
-    eps_growth = ((latest_eps - old_eps) / old_eps) * 100
-else:
-    eps_growth = None
-
-# --- Compute PEG ---
-if pe_ratio and eps_growth and eps_growth != 0:
-    peg_ratio = pe_ratio / eps_growth
-    print(f"Company: {symbol}")
-    print(f"P/E Ratio: {pe_ratio:.2f}")
-    print(f"EPS Growth ({years}Y): {eps_growth:.2f}%")
-    print(f"PEG Ratio: {peg_ratio:.2f}")
-else:
-    print("⚠️ Unable to compute PEG ratio (missing data)")
+# Annual statements come from the local store, refreshed only when a new filing is due
+with statements_store.StatementsStore() as store:
+    store.update(symbols)
+    panels = store.panels(symbols)
+
+# --- Compute PEG for all symbols at once ---
+ratios = ratio_engine.statement_ratios(panels, pe, years).reindex(symbols)
+for symbol, row in ratios.iterrows():
+    if pd.notna(row["PEG (CAGR)"]):
+        print(f"Company: {symbol}")
+        print(f"P/E Ratio: {pe[symbol]:.2f}")
+        print(f"EPS CAGR ({row['CAGR Years']:.1f}Y): {row['EPS CAGR (%)']:.2f}%")
+        print(f"PEG Ratio: {row['PEG (CAGR)']:.2f}")
+    else:
+        print(f"⚠️ Unable to compute PEG ratio for {symbol} (missing data)")
@@ -6,6 +6,11 @@
 import yfinance as yf
 import pandas as pd
 
+import fundamentals_store
+import http_cache
+import rate_limit
+import ratio_engine
+
 # List of NSE symbols (append .NS for Yahoo)
 symbols = ["INFY.NS", "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS"]
 
@@ -13,31 +18,37 @@ fundamentals = []
 
 for sym in symbols:
     stock = yf.Ticker(sym)
-    info = stock.info
+    info = http_cache.cached_json("yahoo_info", sym, lambda: stock.info, rate_limit.YAHOO_HOST)
     print(info)
 
     fundamentals.append({
         "Symbol": sym.replace(".NS", ""),
-        "Company": info.get("longName"),
-        "Sector": info.get("sector"),
-        "Market Cap (₹ Cr)": round(info.get("marketCap", 0) / 1e7, 2) if info.get("marketCap") else None,
-        "P/E Ratio": info.get("trailingPE"),
-        "P/B Ratio": info.get("priceToBook"),
-        "EPS (₹)": info.get("trailingEps"),
-        "ROE (%)": info.get("returnOnEquity"),
-        "ROA (%)": info.get("returnOnAssets"),
-        "Dividend Yield (%)": info.get("dividendYield", 0) * 100 if info.get("dividendYield") else 0,
-        "Debt to Equity": info.get("debtToEquity"),
-        "52W High": info.get("fiftyTwoWeekHigh"),
-        "52W Low": info.get("fiftyTwoWeekLow"),
-        "Current Price": info.get("currentPrice"),
-        "Book Value": info.get("bookValue"),
-        "Profit Margin (%)": info.get("profitMargins", 0) * 100 if info.get("profitMargins") else None,
-        "Revenue (₹ Cr)": round(info.get("totalRevenue", 0) / 1e7, 2) if info.get("totalRevenue") else None
+        **ratio_engine.company_fields(info),
+        **ratio_engine.raw_fields(info),
     })
 
-# Convert to DataFrame
-df = pd.DataFrame(fundamentals)
+# Ratios for all symbols at once, with the shared formulas
+raw = pd.DataFrame(fundamentals)
+ratios = ratio_engine.compute_ratios(raw)
+df = pd.DataFrame({
+    "Symbol": raw["Symbol"],
+    "Company": raw["Company"],
+    "Sector": raw["Sector"],
+    "Market Cap (₹ Cr)": (ratios["Market Cap"] / 1e7).round(2),
+    "P/E Ratio": ratios["P/E"],
+    "P/B Ratio": ratios["P/B"],
+    "EPS (₹)": ratios["EPS (TTM)"],
+    "ROE (%)": ratios["ROE (%)"],
+    "ROA (%)": ratios["ROA (%)"],
+    "Dividend Yield (%)": ratios["Dividend Yield (%)"],
+    "Debt to Equity": ratios["Debt/Equity"],
+    "52W High": ratios["52W High"],
+    "52W Low": ratios["52W Low"],
+    "Current Price": ratios["Current Price"],
+    "Book Value": ratios["Book Value"],
+    "Profit Margin (%)": ratios["Net Margin (%)"],
+    "Revenue (₹ Cr)": (pd.to_numeric(raw["totalRevenue"], errors="coerce") / 1e7).round(2),
+})
 
 # Display summary
 print("\n📊 Fundamental Analysis Summary (NSE Stocks)\n")
@@ -46,3 +57,7 @@ print(df.to_string(index=False))
 # Save results
 df.to_csv("nse_fundamentals.csv", index=False)
 print("\n💾 Saved to nse_fundamentals.csv")
+
+# Keep a dated version of every field
+with fundamentals_store.FundamentalsStore() as store:
+    store.record_frame(raw, source="yahoo_info")
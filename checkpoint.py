@@ -0,0 +1,70 @@
+"""
+Append-only JSONL checkpoint log for long crawls.
+
+Every processed batch is appended (and fsynced) as one line per key, so
+saving progress costs the size of the batch rather than of everything
+fetched so far, and a crashed run can resume by skipping the keys already
+in the log. A torn last line from a crash mid-write is ignored on load.
+
+    log = CheckpointLog("NSE_Equity_Ratios_20250101.checkpoint.jsonl")
+    todo = [s for s in symbols if s not in log.done()]
+    log.append_batch([("INFY.NS", {...}), ("TCS.NS", None)])   # None = failed
+    rows = log.records()
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+OK, FAILED = "ok", "failed"
+
+
+class CheckpointLog:
+    """Keyed, append-only record log stored as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._torn = False  # the file does not end with a newline
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._torn = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn write at the end of a crashed run
+                self._entries[entry["key"]] = entry  # later lines win
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def done(self, include_failed: bool = True) -> Set[str]:
+        """Keys already processed; failed ones only when `include_failed`."""
+        return {k for k, e in self._entries.items() if include_failed or e["status"] == OK}
+
+    def append_batch(self, results: Iterable[Tuple[str, Optional[dict]]]) -> None:
+        """Appends (key, record) pairs; a None record marks the key as failed."""
+        lines = []
+        for key, record in results:
+            entry = {"key": key, "status": OK if record is not None else FAILED, "record": record}
+            self._entries[key] = entry
+            lines.append(json.dumps(entry, default=str))
+        if not lines:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            # Start on a fresh line after a torn write
+            f.write(("\n" if self._torn else "") + "\n".join(lines) + "\n")
+            self._torn = False
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self) -> List[dict]:
+        """The successful records, in the order their keys were first logged."""
+        return [e["record"] for e in self._entries.values() if e["status"] == OK]
+
+    def failed(self) -> List[str]:
+        return [k for k, e in self._entries.items() if e["status"] == FAILED]
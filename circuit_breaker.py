@@ -0,0 +1,200 @@
+"""
+Per-source circuit breaker and adaptive (AIMD) concurrency.
+
+Every upstream host gets a Source with two parts:
+
+    breaker   after FAILURE_THRESHOLD consecutive throttles / timeouts / 5xx
+              the circuit opens and calls fail fast with CircuitOpenError for
+              OPEN_SECONDS (doubled on every trip in a row, up to
+              MAX_OPEN_SECONDS). Then one probe call is let through: success
+              closes the circuit, failure opens it again. Outcomes of calls
+              that were already in flight when the circuit opened change
+              neither the state nor the limit.
+    limiter   the number of calls in flight is capped by a limit that grows
+              by about one per window of healthy responses (additive
+              increase) and is halved on every failure (multiplicative
+              decrease), between 1 and the host's maximum.
+
+Fetchers wrap each call:
+
+    source = get_source(url)
+    probe = source.before()          # or: probe = await source.before_async()
+    try:
+        response = ...
+    except Exception as e:
+        source.after(exc=e, probe=probe)
+        raise
+    source.after(status=response.status_code, probe=probe)
+
+Request pacing (requests per second) stays with rate_limit; this module
+decides whether and how many calls may run at all.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import rate_limit
+
+# ========== CONFIG ==========
+# host -> (initial concurrency, max concurrency)
+HOST_CONCURRENCY: Dict[str, Tuple[float, int]] = {
+    rate_limit.YAHOO_HOST: (4, 16),
+    rate_limit.NSE_HOST: (4, 8),
+    rate_limit.SCREENER_HOST: (2, 4),
+}
+DEFAULT_CONCURRENCY = (2, 4)
+MIN_CONCURRENCY = 1
+DECREASE_FACTOR = 0.5
+
+FAILURE_THRESHOLD = 5      # consecutive failures that open the circuit
+OPEN_SECONDS = 30.0        # first open period
+MAX_OPEN_SECONDS = 600.0
+FAILURE_STATUSES = (403, 429, 500, 502, 503, 504)
+ASYNC_POLL = 0.05          # seconds between slot checks in before_async
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit is open."""
+
+
+def is_failure(status: Optional[int] = None, exc: Optional[Exception] = None) -> bool:
+    """True for outcomes that mean the source is overloaded or throttling us."""
+    if exc is not None:
+        if isinstance(exc, CircuitOpenError):
+            return False
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or "timed out" in str(exc).lower():
+            return True
+        if rate_limit.is_throttle_error(exc):
+            return True
+        status = getattr(getattr(exc, "response", None), "status_code", None) or getattr(exc, "status", None)
+    return status in FAILURE_STATUSES
+
+
+class Source:
+    """Circuit breaker plus AIMD concurrency limit of one upstream host."""
+
+    def __init__(self, name: str, initial: float, maximum: int):
+        self.name = name
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.in_flight = 0
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._cond = threading.Condition()
+
+    # ---------- breaker ----------
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 when calls are allowed)."""
+        with self._cond:
+            if self.state == OPEN:
+                return max(0.0, self.open_until - time.monotonic())
+            return 0.0
+
+    def _admit(self) -> Optional[bool]:
+        """
+        False: call may start. True: call may start as the half-open probe.
+        None: wait for a slot. Raises while the circuit is open.
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now < self.open_until:
+                raise CircuitOpenError(f"{self.name} circuit open for another {self.open_until - now:.0f}s")
+            self.state, self._probing = HALF_OPEN, False
+        if self.state == HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe in flight")
+            self._probing = True
+            self.in_flight += 1
+            return True
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return False
+        return None
+
+    # ---------- call hooks ----------
+    def before(self) -> bool:
+        """
+        Blocks until a slot is free; raises CircuitOpenError while the circuit is open.
+
+        Returns:
+            Whether this call is the half-open probe; pass it on to after().
+        """
+        with self._cond:
+            while True:
+                probe = self._admit()
+                if probe is not None:
+                    return probe
+                self._cond.wait()
+
+    async def before_async(self) -> bool:
+        """before() without blocking the event loop."""
+        while True:
+            with self._cond:
+                probe = self._admit()
+                if probe is not None:
+                    return probe
+            await asyncio.sleep(ASYNC_POLL)
+
+    def after(self, status: Optional[int] = None, exc: Optional[Exception] = None,
+              probe: bool = False) -> None:
+        """
+        Releases the slot and feeds the outcome into the breaker and the limit.
+
+        While the circuit is not closed only the probe's outcome counts;
+        calls still in flight from before the trip just give back their slot.
+        """
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            if probe:
+                self._probing = False
+            if self.state == CLOSED or (probe and self.state == HALF_OPEN):
+                if is_failure(status, exc):
+                    self.limit = max(MIN_CONCURRENCY, self.limit * DECREASE_FACTOR)
+                    self.failures += 1
+                    if self.state == HALF_OPEN or self.failures >= FAILURE_THRESHOLD:
+                        self._trip()
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.failures = 0
+                    if self.state == HALF_OPEN:
+                        self.state, self.trips = CLOSED, 0
+                        print(f"✅ {self.name} circuit closed")
+            self._cond.notify_all()
+
+    def _trip(self) -> None:
+        pause = min(MAX_OPEN_SECONDS, OPEN_SECONDS * 2 ** self.trips)
+        self.state, self.open_until = OPEN, time.monotonic() + pause
+        self.trips += 1
+        self.failures = 0
+        print(f"⛔ {self.name} circuit open for {pause:.0f}s (concurrency now {int(self.limit)})")
+
+    def call(self, fn: Callable, status_of: Callable = lambda result: None):
+        """Runs fn() between before() and after(); `status_of` extracts an HTTP status from the result."""
+        probe = self.before()
+        try:
+            result = fn()
+        except Exception as e:
+            self.after(exc=e, probe=probe)
+            raise
+        self.after(status=status_of(result), probe=probe)
+        return result
+
+
+_sources: Dict[str, Source] = {}
+_registry_lock = threading.Lock()
+
+
+def get_source(url_or_host: str) -> Source:
+    """The shared Source of a host (a full URL is accepted too)."""
+    host = urlparse(url_or_host).netloc or url_or_host
+    with _registry_lock:
+        if host not in _sources:
+            _sources[host] = Source(host, *HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY))
+        return _sources[host]
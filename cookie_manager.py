@@ -0,0 +1,198 @@
+"""
+Cookie lifecycle for the sites the fetchers log into (Screener.in, NSE).
+
+Cookies are saved with their expiry in <site>_cookie.json and only handed
+out while they are valid. Responses can be checked with `is_logged_out`;
+a logged-out or invalid session invalidates the saved cookies so the next
+`get_cookies` refreshes them. Fetchers that must not block on a refresh use
+`refresh_in_background` and pick the new cookies up with `load` later:
+
+    screener  Chrome is opened on a persistent profile (.chrome_profile), so
+              an earlier login is reused, and the browser's cookies are polled
+              until `sessionid` appears instead of sleeping a fixed minute.
+    nse       the home page is loaded with requests to collect NSE's cookies.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+# ========== CONFIG ==========
+COOKIE_FILES = {
+    "screener": "screener_cookie.json",
+    "nse": "nse_cookie.json",
+}
+SCREENER_LOGIN_URL = "https://www.screener.in/login/"
+NSE_HOME_URL = "https://www.nseindia.com"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+PROFILE_DIR = ".chrome_profile"  # persistent browser profile, keeps the Screener login
+LOGIN_TIMEOUT = 300              # seconds to wait for a manual login
+POLL_INTERVAL = 1.0              # seconds between cookie checks
+DEFAULT_LIFETIME = {             # assumed lifetime when a cookie has no expiry
+    "screener": 14 * 24 * 3600,
+    "nse": 30 * 60,
+}
+EXPIRY_MARGIN = 60               # treat cookies as expired this many seconds early
+
+
+# ---------- storage ----------
+def save(site: str, cookies: Dict[str, str], expires: Optional[float] = None) -> None:
+    """Saves cookies with their expiry (epoch seconds)."""
+    if expires is None:
+        expires = time.time() + DEFAULT_LIFETIME[site]
+    data = {"cookies": cookies, "expires": expires, "saved_at": time.time()}
+    # Keep the flat form older scripts read ({"sessionid": "..."})
+    data.update({k: v for k, v in cookies.items() if k == "sessionid"})
+    _write_json(COOKIE_FILES[site], data)
+
+
+def _write_json(path: str, data: dict) -> None:
+    """Replaces a cookie file atomically, so readers never see a half-written one."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load(site: str) -> Optional[Dict[str, str]]:
+    """Saved cookies of a site, or None when missing, invalidated or expired."""
+    path = COOKIE_FILES[site]
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("invalid"):
+        return None
+    if "cookies" not in data:
+        # File written before expiries were tracked
+        cookies = {k: v for k, v in data.items() if isinstance(v, str)}
+        expires = os.path.getmtime(path) + DEFAULT_LIFETIME[site]
+    else:
+        cookies, expires = data["cookies"], data.get("expires")
+    if not cookies or (expires is not None and expires - EXPIRY_MARGIN < time.time()):
+        return None
+    return cookies
+
+
+def invalidate(site: str) -> None:
+    """Marks the saved cookies of a site as unusable (e.g. after a logged-out response)."""
+    path = COOKIE_FILES[site]
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data["invalid"] = True
+    _write_json(path, data)
+
+
+# ---------- detection ----------
+def is_logged_out(site: str, response) -> bool:
+    """True when a response shows the session is not (or no longer) valid."""
+    status = getattr(response, "status_code", None) or getattr(response, "status", 0)
+    if site == "nse":
+        return status in (401, 403)
+    if status in (401, 403):
+        return True
+    url = str(getattr(response, "url", ""))
+    if "/login/" in url:
+        return True  # redirected to the login page
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type:
+        return False
+    text = response.text
+    # Logged-in pages link to /logout/, anonymous ones only to /login/
+    return "/login/" in text and "/logout/" not in text
+
+
+# ---------- refresh ----------
+def refresh_screener(profile_dir: str = PROFILE_DIR, timeout: float = LOGIN_TIMEOUT,
+                     poll_interval: float = POLL_INTERVAL) -> Optional[Dict[str, str]]:
+    """
+    Gets a Screener.in sessionid from Chrome with a persistent profile.
+
+    Returns as soon as the cookie shows up: immediately when the profile is
+    still logged in, otherwise once the login in the opened window is done.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    try:
+        print("🔑 Opening Screener.in login page...")
+        driver.get(SCREENER_LOGIN_URL)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for cookie in driver.get_cookies():
+                if cookie["name"] == "sessionid":
+                    save("screener", {"sessionid": cookie["value"]}, cookie.get("expiry"))
+                    print("✅ Screener session cookie saved")
+                    return {"sessionid": cookie["value"]}
+            time.sleep(poll_interval)
+        print(f"❌ No Screener login within {timeout:.0f} seconds.")
+        return None
+    finally:
+        driver.quit()
+
+
+def refresh_nse() -> Optional[Dict[str, str]]:
+    """Collects NSE's cookies by loading the home page."""
+    try:
+        with requests.Session() as session:
+            response = session.get(NSE_HOME_URL, headers=HEADERS, timeout=10)
+            response.raise_for_status()
+            cookies = {c.name: c.value for c in session.cookies}
+            expiries = [c.expires for c in session.cookies if c.expires]
+    except requests.RequestException as e:
+        print(f"⚠️ NSE cookie refresh failed: {e}")
+        return None
+    if not cookies:
+        return None
+    save("nse", cookies, min(expiries) if expiries else None)
+    return cookies
+
+
+REFRESHERS = {"screener": refresh_screener, "nse": refresh_nse}
+
+_background: Dict[str, threading.Thread] = {}
+_background_lock = threading.Lock()
+
+
+def refresh_in_background(site: str) -> None:
+    """Starts a refresh of a site's cookies on a daemon thread, unless one is already running."""
+    with _background_lock:
+        thread = _background.get(site)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=REFRESHERS[site], name=f"{site}-cookie-refresh", daemon=True)
+        _background[site] = thread
+        thread.start()
+
+
+def get_cookies(site: str, refresh: bool = True) -> Dict[str, str]:
+    """Valid cookies of a site, refreshed when missing or expired (empty if that fails)."""
+    cookies = load(site)
+    if cookies is None and refresh:
+        cookies = REFRESHERS[site]()
+    return cookies or {}
@@ -0,0 +1,110 @@
+"""
+Concurrent NSE + Screener.in fundamentals fetch.
+
+For every symbol the NSE quote and the Screener.in company page are fetched
+at the same time, and many symbols are in flight at once: each host is paced
+by its shared rate_limit bucket and capped by its own concurrency limit.
+Merged rows are handed out (and appended to the output CSV) as soon as both
+halves of a symbol are in, so a symbol costs max(NSE, Screener) rather than
+the sum of the two.
+
+    rows = fetch_fundamentals(["INFY", "TCS"], "out.csv", cookies=nse_cookie)
+"""
+import asyncio
+import csv
+import functools
+from typing import Dict, Iterable, List, Optional
+
+import http_cache
+import nse_client
+import screener_parser
+import screener_session
+
+# ========== CONFIG ==========
+SCREENER_URL = "https://www.screener.in/company/{symbol}/"
+SCREENER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+SCREENER_CONCURRENCY = 4   # Screener pages in flight at the same time
+TIMEOUT = 15               # seconds per Screener request
+
+FIELDNAMES = ["Symbol", "P/E", "EPS (TTM)"] + list(screener_parser.EMPTY_RESULT)
+
+
+async def fetch_screener(screener: screener_session.ScreenerSession, semaphore: asyncio.Semaphore,
+                         symbol: str, headers: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Screener.in fields of one symbol, served from the HTTP cache when fresh.
+
+    Pages are fetched by the pooled ScreenerSession on a worker thread, so
+    they get its retries with jittered backoff, cookie rotation and latency
+    stats.
+    """
+    url = SCREENER_URL.format(symbol=symbol)
+    try:
+        cached = http_cache.lookup(url, "screener_page")
+        if cached is None:
+            fetch = functools.partial(http_cache.get, url, "screener_page", session=screener,
+                                      headers=headers or SCREENER_HEADERS, timeout=TIMEOUT)
+            async with semaphore:
+                cached = await asyncio.get_running_loop().run_in_executor(None, fetch)
+            cached.raise_for_status()
+        return screener_parser.parse_company_page(cached.content)
+    except Exception as e:
+        print(f"❌ Screener fetch failed for {symbol}: {e}")
+        return dict(screener_parser.EMPTY_RESULT)
+
+
+async def fetch_symbol(client: nse_client.NSEClient, screener: screener_session.ScreenerSession,
+                       semaphore: asyncio.Semaphore, symbol: str,
+                       screener_headers: Optional[Dict[str, str]] = None) -> dict:
+    """NSE and Screener.in fields of one symbol, fetched concurrently and merged."""
+    quote, fields = await asyncio.gather(client.fetch_quote(symbol),
+                                         fetch_screener(screener, semaphore, symbol, screener_headers))
+    return {**nse_client.parse_quote(symbol, quote), **fields}
+
+
+async def run_pipeline(symbols: Iterable[str], out_path: Optional[str] = None,
+                       cookies: Optional[Dict[str, str]] = None,
+                       screener_headers: Optional[Dict[str, str]] = None,
+                       screener: Optional[screener_session.ScreenerSession] = None,
+                       nse_concurrency: int = nse_client.CONCURRENCY,
+                       screener_concurrency: int = SCREENER_CONCURRENCY) -> List[dict]:
+    """
+    Fetches all symbols and streams merged rows to `out_path` as they complete.
+
+    Screener pages go through `screener`, the process-wide ScreenerSession
+    when omitted.
+
+    Returns:
+        The merged rows, in completion order.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    rows: List[dict] = []
+    out = open(out_path, "w", newline="", encoding="utf-8") if out_path else None
+    try:
+        writer = csv.DictWriter(out, fieldnames=FIELDNAMES, extrasaction="ignore") if out else None
+        if writer:
+            writer.writeheader()
+        semaphore = asyncio.Semaphore(screener_concurrency)
+        screener = screener or screener_session.default_session()
+        async with nse_client.NSEClient(concurrency=nse_concurrency, cookies=cookies) as client:
+            tasks = [asyncio.ensure_future(fetch_symbol(client, screener, semaphore, s, screener_headers))
+                     for s in symbols]
+            for done in asyncio.as_completed(tasks):
+                row = await done
+                rows.append(row)
+                if writer:
+                    writer.writerow(row)
+                    out.flush()
+                print(f"📈 {row['Symbol']} done ({len(rows)}/{len(symbols)})")
+    finally:
+        if out:
+            out.close()
+    return rows
+
+
+def fetch_fundamentals(symbols: Iterable[str], out_path: Optional[str] = None, **kwargs) -> List[dict]:
+    """Blocking wrapper around run_pipeline."""
+    return asyncio.run(run_pipeline(symbols, out_path, **kwargs))
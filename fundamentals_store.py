@@ -0,0 +1,197 @@
+"""
+Versioned store of fetched fundamentals (SQLite).
+
+Every script that fetches fundamentals records its result rows here, one
+value per (source, symbol, field). Sources are kept apart, as the same field
+name can mean different things in different sources (NSE's "P/E" is not
+Yahoo's). A value is stored as a new version only when it differs from the
+current one of its source; an unchanged value just moves its
+version's `last_seen` date forward. That keeps the table small and makes
+both point-in-time and change queries index lookups:
+
+    store = FundamentalsStore()
+    store.record_frame(df, source="yahoo_info")      # df has a "Symbol" column
+    store.as_of("2025-03-31", source="yahoo_info", fields=["P/E"])  # symbol x field snapshot
+    store.changed_since("2025-01-01")                # new versions since a date
+    store.fresh_symbols("yahoo_info", max_age_days=7)  # no need to refetch these
+"""
+import math
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+# ========== CONFIG ==========
+DB_PATH = "fundamentals.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol      TEXT NOT NULL,
+    field       TEXT NOT NULL,
+    valid_from  TEXT NOT NULL,  -- fetch date the value was first seen
+    last_seen   TEXT NOT NULL,  -- latest fetch date that returned it
+    source      TEXT NOT NULL,
+    value_num   REAL,
+    value_text  TEXT,
+    PRIMARY KEY (source, symbol, field, valid_from)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_fundamentals_symbol ON fundamentals (symbol, field, valid_from);
+CREATE INDEX IF NOT EXISTS idx_fundamentals_field ON fundamentals (field, valid_from);
+CREATE INDEX IF NOT EXISTS idx_fundamentals_valid_from ON fundamentals (valid_from);
+CREATE INDEX IF NOT EXISTS idx_fundamentals_seen ON fundamentals (source, last_seen);
+"""
+
+
+def _day(value) -> str:
+    if value is None:
+        return date.today().isoformat()
+    return pd.Timestamp(value).date().isoformat()
+
+
+def _split_value(value):
+    """(value_num, value_text) for a fetched value; both None for missing values."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None, None
+    try:
+        return float(value), None
+    except (TypeError, ValueError):
+        return None, str(value)
+
+
+class FundamentalsStore:
+    """SQLite-backed, versioned (symbol, field) -> value store."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self) -> None:
+        """Rebuilds a table created before `source` was part of the primary key."""
+        key = [r[1] for r in sorted(
+            (r for r in self.conn.execute("PRAGMA table_info(fundamentals)") if r[5]), key=lambda r: r[5])]
+        if not key or key[0] == "source":
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE fundamentals RENAME TO fundamentals_old")
+            for (index,) in self.conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'fundamentals_old' "
+                    "AND sql IS NOT NULL").fetchall():
+                self.conn.execute(f"DROP INDEX {index}")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            self.conn.execute("INSERT OR REPLACE INTO fundamentals SELECT * FROM fundamentals_old")
+            self.conn.execute("DROP TABLE fundamentals_old")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "FundamentalsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- writes ----------
+    def record(self, symbol: str, fields: Dict[str, object], source: str, fetched_at=None) -> int:
+        """
+        Records the fields of one symbol fetched on `fetched_at` (today by default).
+
+        Returns:
+            The number of fields whose value changed (new versions written).
+        """
+        day = _day(fetched_at)
+        changed = 0
+        with self.conn:
+            for field, value in fields.items():
+                value_num, value_text = _split_value(value)
+                current = self.conn.execute(
+                    "SELECT valid_from, value_num, value_text FROM fundamentals "
+                    "WHERE source = ? AND symbol = ? AND field = ? AND valid_from <= ? "
+                    "ORDER BY valid_from DESC LIMIT 1", (source, symbol, field, day)).fetchone()
+                if current is not None and (current[1], current[2]) == (value_num, value_text):
+                    self.conn.execute(
+                        "UPDATE fundamentals SET last_seen = MAX(last_seen, ?) "
+                        "WHERE source = ? AND symbol = ? AND field = ? AND valid_from = ?",
+                        (day, source, symbol, field, current[0]))
+                    continue
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (symbol, field, day, day, source, value_num, value_text))
+                changed += 1
+        return changed
+
+    def record_frame(self, df: pd.DataFrame, source: str, symbol_column: str = "Symbol",
+                     fetched_at=None) -> int:
+        """Records every row of a result frame; the other columns are the fields."""
+        changed = 0
+        for row in df.to_dict("records"):
+            symbol = row.pop(symbol_column)
+            changed += self.record(str(symbol), row, source, fetched_at)
+        return changed
+
+    # ---------- reads ----------
+    def _frame(self, query: str, params: Iterable) -> pd.DataFrame:
+        df = pd.read_sql_query(query, self.conn, params=list(params))
+        df["value"] = df["value_num"].astype(object).where(df["value_num"].notna(), df["value_text"])
+        return df.drop(columns=["value_num", "value_text"])
+
+    @staticmethod
+    def _filter(column: str, values: Optional[Iterable[str]], clauses: List[str], params: List) -> None:
+        if values is not None:
+            values = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+    def as_of(self, when=None, source: Optional[str] = None, symbols: Optional[Iterable[str]] = None,
+              fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Snapshot of the values known on date `when` (today by default).
+
+        Returns:
+            DataFrame indexed by symbol with one column per field of
+            `source`, or one column per (source, field) when no source is
+            given.
+        """
+        clauses, params = ["valid_from <= ?"], [_day(when)]
+        self._filter("source", None if source is None else [source], clauses, params)
+        self._filter("symbol", symbols, clauses, params)
+        self._filter("field", fields, clauses, params)
+        where = " AND ".join(clauses)
+        df = self._frame(
+            f"SELECT f.source, f.symbol, f.field, f.value_num, f.value_text FROM fundamentals f "
+            f"JOIN (SELECT source, symbol, field, MAX(valid_from) AS valid_from FROM fundamentals "
+            f"      WHERE {where} GROUP BY source, symbol, field) latest "
+            f"USING (source, symbol, field, valid_from)", params)
+        if df.empty:
+            return pd.DataFrame(index=pd.Index([], name="symbol"))
+        columns = "field" if source is not None else ["source", "field"]
+        return df.pivot(index="symbol", columns=columns, values="value")
+
+    def history(self, symbol: str, field: str, source: str) -> pd.Series:
+        """All versions of one field of a source, indexed by the date each was first seen."""
+        df = self._frame(
+            "SELECT valid_from, value_num, value_text FROM fundamentals "
+            "WHERE source = ? AND symbol = ? AND field = ? ORDER BY valid_from", (source, symbol, field))
+        return pd.Series(df["value"].values, index=pd.to_datetime(df["valid_from"]), name=field)
+
+    def changed_since(self, since, source: Optional[str] = None,
+                      fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """New values first seen after `since`, one row per (source, symbol, field, date)."""
+        clauses, params = ["valid_from > ?"], [_day(since)]
+        self._filter("source", None if source is None else [source], clauses, params)
+        self._filter("field", fields, clauses, params)
+        return self._frame(
+            "SELECT symbol, field, valid_from, source, value_num, value_text FROM fundamentals "
+            f"WHERE {' AND '.join(clauses)} ORDER BY valid_from, symbol, field", params)
+
+    def fresh_symbols(self, source: str, max_age_days: int) -> Set[str]:
+        """Symbols fetched from `source` within the last `max_age_days` days."""
+        cutoff = (datetime.now().date() - timedelta(days=max_age_days)).isoformat()
+        rows = self.conn.execute(
+            "SELECT DISTINCT symbol FROM fundamentals WHERE source = ? AND last_seen >= ?",
+            (source, cutoff)).fetchall()
+        return {r[0] for r in rows}
@@ -0,0 +1,300 @@
+"""
+On-disk HTTP response cache shared by every fetcher.
+
+Bodies are stored zlib-compressed and content-addressed (by the SHA-256 of
+the body, so identical payloads are kept once) under .http_cache/blobs/.
+A small JSON index entry per URL records which blob it points to, when it
+was fetched and the ETag / Last-Modified validators. Entries are served
+without any network I/O while younger than their source's TTL; after that
+the request is revalidated with If-None-Match / If-Modified-Since and a
+304 just refreshes the entry.
+
+Payloads that do not come from a plain HTTP call (yfinance `info` dicts and
+statements, records parsed out of a page) go through `cached_json` /
+`cached_frame` with the same TTLs. Empty payloads are not cached, so a
+failed fetch is tried again on the next run.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zlib
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import requests
+
+import circuit_breaker
+import rate_limit
+
+# ========== CONFIG ==========
+CACHE_DIR = ".http_cache"
+MINUTE, DAY = 60, 24 * 3600
+
+# source -> seconds an entry is served without revalidation
+SOURCE_TTL: Dict[str, float] = {
+    "nse_quote": 5 * MINUTE,
+    "nse_equity_list": 0,          # always revalidated; symbol_master gates it to once a day
+    "screener_page": DAY,          # price-dependent ratios (PEG, intrinsic value)
+    "screener_shareholding": 90 * DAY,  # parsed shareholding history, changes quarterly
+    "yahoo_info": DAY,
+    "yahoo_statements": 30 * DAY,
+}
+DEFAULT_TTL = DAY
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache entry."""
+
+    def __init__(self, url: str, content: bytes, status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None, from_cache: bool = True):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+
+# ---------- storage ----------
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _index_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, "index", key[:2], key + ".json")
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, "blobs", digest[:2], digest + ".z")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A unique temp file per writer: threads of one process may store the same blob at once
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _load_entry(url: str) -> Optional[dict]:
+    path = _index_path(_url_key(url))
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_blob(entry: dict) -> Optional[bytes]:
+    try:
+        with open(_blob_path(entry["blob"]), "rb") as f:
+            return zlib.decompress(f.read())
+    except (OSError, zlib.error):
+        return None
+
+
+def _save_entry(url: str, entry: dict) -> None:
+    _write_atomic(_index_path(_url_key(url)), json.dumps(entry).encode("utf-8"))
+
+
+def _is_fresh(entry: dict, source: str) -> bool:
+    return time.time() - entry["fetched_at"] < SOURCE_TTL.get(source, DEFAULT_TTL)
+
+
+# ---------- public API ----------
+def lookup(url: str, source: str) -> Optional[CachedResponse]:
+    """The cached response for `url` if it is still within its source's TTL."""
+    entry = _load_entry(url)
+    if entry is None or not _is_fresh(entry, source):
+        return None
+    content = _read_blob(entry)
+    if content is None:
+        return None
+    return CachedResponse(url, content, entry.get("status", 200), entry.get("headers"))
+
+
+def store(url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+    """Stores a 200 response body and its validators."""
+    headers = headers or {}
+    digest = hashlib.sha256(content).hexdigest()
+    if not os.path.exists(_blob_path(digest)):
+        _write_atomic(_blob_path(digest), zlib.compress(content, 6))
+    _save_entry(url, {
+        "url": url,
+        "blob": digest,
+        "fetched_at": time.time(),
+        "status": 200,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "headers": {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+    })
+
+
+def conditional_headers(url: str) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for a stale entry, if it has validators."""
+    entry = _load_entry(url)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def revalidated(url: str) -> Optional[CachedResponse]:
+    """Marks a stale entry fresh again after a 304 and returns it."""
+    entry = _load_entry(url)
+    if entry is None:
+        return None
+    content = _read_blob(entry)
+    if content is None:
+        return None
+    entry["fetched_at"] = time.time()
+    _save_entry(url, entry)
+    return CachedResponse(url, content, entry.get("status", 200), entry.get("headers"))
+
+
+def _send(url: str, session, headers: Dict[str, str], **kwargs):
+    """One GET, paced by the rate limiter and guarded by the host's circuit breaker."""
+    source = circuit_breaker.get_source(url)
+    probe = source.before()
+    try:
+        if getattr(session, "rate_limited", False):
+            response = session.get(url, headers=headers, **kwargs)
+        else:
+            rate_limit.acquire(url)
+            response = (session or requests).get(url, headers=headers, **kwargs)
+            rate_limit.report_response(url, response)
+    except Exception as e:
+        source.after(exc=e, probe=probe)
+        raise
+    # A logged-out page says nothing about the host's health
+    source.after(status=None if _logged_out(session, response) else response.status_code, probe=probe)
+    return response
+
+
+def _logged_out(session, response) -> bool:
+    return getattr(session, "is_logged_out", lambda r: False)(response)
+
+
+def get(url: str, source: str, session=None, headers: Optional[Dict[str, str]] = None,
+        **kwargs):
+    """
+    GET through the cache.
+
+    Args:
+        url: URL to fetch.
+        source: Key into SOURCE_TTL ("nse_quote", "screener_page", ...).
+        session: requests.Session to use; the requests module when omitted.
+            Sessions with a true `rate_limited` attribute pace themselves,
+            and an `is_logged_out(response)` method marks responses that
+            only show an expired login.
+        headers: Request headers; validators are added for stale entries.
+        **kwargs: Passed on to session.get (cookies, timeout, ...).
+
+    Returns:
+        A CachedResponse for cache hits, 304s and new 200s, otherwise the
+        live response so the caller's raise_for_status() sees the error.
+        Logged-out 200s are returned but not stored.
+    """
+    cached = lookup(url, source)
+    if cached is not None:
+        return cached
+
+    request_headers = dict(headers or {})
+    response = _send(url, session, {**request_headers, **conditional_headers(url)}, **kwargs)
+    if response.status_code == 304:
+        cached = revalidated(url)
+        if cached is not None:
+            return cached
+        # The entry the validators came from is gone: ask for the full body
+        response = _send(url, session, request_headers, **kwargs)
+
+    if response.status_code == 200:
+        # Pages served without a valid login are handed out but never cached
+        if not _logged_out(session, response):
+            store(url, response.content, response.headers)
+        return CachedResponse(url, response.content, 200, dict(response.headers), from_cache=False)
+    return response
+
+
+def _fetch_limited(fetch: Callable, host: Optional[str]):
+    if host is None:
+        return fetch()
+    source = circuit_breaker.get_source(host)
+    probe = source.before()
+    rate_limit.acquire(host)
+    try:
+        value = fetch()
+    except Exception as e:
+        rate_limit.report_outcome(host, e)
+        source.after(exc=e, probe=probe)
+        raise
+    rate_limit.report_outcome(host)
+    source.after(probe=probe)
+    return value
+
+
+def cached_json(source: str, key: str, fetch: Callable[[], object], host: Optional[str] = None):
+    """
+    Caches the JSON-serialisable result of `fetch()` (e.g. yfinance's
+    `Ticker.info`) under a pseudo URL built from the source and key. On a
+    miss the call is paced by the rate limiter of `host`, if given.
+    """
+    url = f"cache://{source}/{key}"
+    cached = lookup(url, source)
+    if cached is not None:
+        return cached.json()
+    value = _fetch_limited(fetch, host)
+    if not _is_empty(value):
+        store(url, json.dumps(value, default=str).encode("utf-8"), {"Content-Type": "application/json"})
+    return value
+
+
+def _is_empty(value) -> bool:
+    """None, an empty container, or a dict without a single value (yfinance's answer for unknown tickers)."""
+    if isinstance(value, dict):
+        return all(v is None for v in value.values())
+    return value is None or (isinstance(value, (list, tuple, str)) and not value)
+
+
+def cached_frame(source: str, key: str, fetch: Callable[[], pd.DataFrame],
+                 host: Optional[str] = None) -> pd.DataFrame:
+    """Like cached_json for DataFrames (e.g. yfinance financial statements)."""
+    url = f"cache://{source}/{key}"
+    cached = lookup(url, source)
+    if cached is not None:
+        df = pd.read_json(io.StringIO(cached.text), orient="split")
+        try:
+            df.columns = pd.to_datetime(df.columns)  # statement periods
+        except (ValueError, TypeError):
+            pass
+        return df
+    df = _fetch_limited(fetch, host)
+    if df is None or df.empty:
+        return df
+    store(url, df.to_json(orient="split", date_format="iso").encode("utf-8"),
+          {"Content-Type": "application/json"})
+    return df
@@ -0,0 +1,169 @@
+"""
+Pooled asyncio client for the NSE quote-equity API.
+
+One aiohttp session keeps its TLS connections alive across requests, the
+NSE cookies are bootstrapped once per session from the home page, and a
+semaphore bounds how many quotes are in flight at a time.
+"""
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+import circuit_breaker
+import cookie_manager
+import http_cache
+import rate_limit
+
+# ========== CONFIG ==========
+NSE_HOME_URL = "https://www.nseindia.com"
+NSE_QUOTE_URL = "https://www.nseindia.com/api/quote-equity?symbol="
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "application/json, text/plain, */*",
+    "Referer": "https://www.nseindia.com/",
+}
+CONCURRENCY = 8   # quotes in flight at the same time
+TIMEOUT = 10      # seconds per request
+
+
+class NSEClient:
+    """
+    Async NSE quote client with a persistent connection pool.
+
+    Usage:
+        async with NSEClient() as client:
+            quotes = await client.fetch_quotes(["INFY", "TCS"])
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY, timeout: float = TIMEOUT,
+                 cookies: Optional[Dict[str, str]] = None):
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.cookies = cookies or {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._bootstrap_lock = asyncio.Lock()
+        self._generation = 0  # bumped on every bootstrap
+
+    async def __aenter__(self) -> "NSEClient":
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(headers=HEADERS, cookies=self.cookies,
+                                             connector=connector, timeout=self.timeout)
+        await self.bootstrap()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.session.close()
+
+    async def bootstrap(self, seen_generation: Optional[int] = None) -> None:
+        """
+        Loads the home page so the session holds NSE's cookies.
+
+        When several requests hit an expired cookie together, only the first
+        one to get here refreshes it; the others see a newer generation. The
+        cookies collected are saved for the next run.
+        """
+        async with self._bootstrap_lock:
+            if seen_generation is not None and seen_generation != self._generation:
+                return
+            self._generation += 1
+            try:
+                async with self.session.get(NSE_HOME_URL) as response:
+                    await response.read()
+            except Exception as e:
+                print(f"⚠️ NSE cookie bootstrap failed: {e}")
+                return
+            # Save the new cookies so the next run does not start with expired ones
+            cookies = {c.key: c.value for c in self.session.cookie_jar}
+            if cookies:
+                cookie_manager.save("nse", cookies)
+
+    async def fetch_quote(self, symbol: str) -> Optional[dict]:
+        """
+        Fetches the quote-equity JSON of one symbol.
+
+        A 401/403 usually means the cookies expired; the session is
+        bootstrapped again and the request retried once. So is a 304 whose
+        cache entry has gone missing, without validators.
+        """
+        url = NSE_QUOTE_URL + symbol
+        cached = http_cache.lookup(url, "nse_quote")
+        if cached is not None:
+            return cached.json()
+
+        source = circuit_breaker.get_source(url)
+        conditional = True
+        async with self._semaphore:
+            for attempt in range(2):
+                generation = self._generation
+                try:
+                    # Fails fast while NSE's circuit is open; the number of quotes in
+                    # flight follows the source's adaptive limit
+                    probe = await source.before_async()
+                    try:
+                        await rate_limit.acquire_async(url)
+                        headers = http_cache.conditional_headers(url) if conditional else {}
+                        response = await self.session.get(url, headers=headers)
+                    except Exception as e:
+                        source.after(exc=e, probe=probe)
+                        raise
+                    # An expired cookie is not NSE throttling us: it neither counts
+                    # against the breaker nor slows the bucket down
+                    logged_out = cookie_manager.is_logged_out("nse", response) and attempt == 0
+                    source.after(status=None if logged_out else response.status, probe=probe)
+                    async with response:
+                        if logged_out:
+                            cookie_manager.invalidate("nse")
+                            await self.bootstrap(generation)
+                            continue
+                        rate_limit.report_response(url, response)
+                        if response.status == 304:
+                            cached = http_cache.revalidated(url)
+                            if cached is not None:
+                                return cached.json()
+                            # The cache entry behind the validators is gone: fetch the full body
+                            conditional = False
+                            continue
+                        response.raise_for_status()
+                        body = await response.read()
+                        http_cache.store(url, body, response.headers)
+                        return json.loads(body)
+                except Exception as e:
+                    print(f"❌ NSE fetch failed for {symbol}: {e}")
+                    return None
+        return None
+
+    async def fetch_quotes(self, symbols: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Fetches many symbols concurrently; failed symbols map to None."""
+        symbols = list(dict.fromkeys(symbols))
+        quotes = await asyncio.gather(*(self.fetch_quote(s) for s in symbols))
+        return dict(zip(symbols, quotes))
+
+
+def parse_quote(symbol: str, data: Optional[dict]) -> dict:
+    """Extracts the fields the fundamentals scripts use from a quote JSON."""
+    info = (data or {}).get("priceInfo", {})
+    return {
+        "Symbol": symbol,
+        "P/E": info.get("pE", None),
+        "EPS (TTM)": info.get("eps", None),
+    }
+
+
+def fetch_quotes(symbols: Iterable[str], concurrency: int = CONCURRENCY,
+                 cookies: Optional[Dict[str, str]] = None) -> Dict[str, Optional[dict]]:
+    """Blocking wrapper: fetches the quote JSON of every symbol over one pooled session."""
+    async def run():
+        async with NSEClient(concurrency=concurrency, cookies=cookies) as client:
+            return await client.fetch_quotes(symbols)
+    return asyncio.run(run())
+
+
+def fetch_quote_rows(symbols: List[str], concurrency: int = CONCURRENCY,
+                     cookies: Optional[Dict[str, str]] = None) -> List[dict]:
+    """P/E and EPS rows for many symbols, in the order of `symbols`."""
+    quotes = fetch_quotes(symbols, concurrency, cookies)
+    return [parse_quote(s, quotes.get(s)) for s in symbols]
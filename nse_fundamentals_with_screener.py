@@ -1,78 +1,110 @@
 # File: nse_fundamentals_with_screener.py
 # Description: Fetch advanced fundamentals and ownership (FII/DII/Promoter) for NSE stocks
 
-import requests
 import yfinance as yf
 import pandas as pd
 
-# -------------------------------
-# 🔐 Add your Screener cookie here
-# -------------------------------
-SCREENER_COOKIE = "d765gh3g2mihc4aztrx4mq8peo4uz6im"  # Replace with your sessionid
+import cookie_manager
+import fundamentals_store
+import http_cache
+import rate_limit
+import ratio_engine
+import screener_parser
+import screener_session
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
-    "Cookie": f"sessionid={SCREENER_COOKIE}"
 }
 
-def get_ownership_data(symbol):
+# Pooled keep-alive session with retries; rotates across the configured
+# sessionid cookies (SCREENER_SESSIONIDS or the saved login, refreshed by
+# cookie_manager when it is missing or expired)
+SESSION = screener_session.ScreenerSession(
+    screener_session.load_session_ids()
+    or [sid for sid in [cookie_manager.get_cookies("screener").get("sessionid")] if sid])
+
+# holder class in Screener's shareholding table -> output column
+OWNERSHIP_COLUMNS = {
+    "Promoters": "Promoter (%)",
+    "FIIs": "FII (%)",
+    "DIIs": "DII (%)",
+    "Public": "Public (%)",
+}
+
+def fetch_shareholding(symbol):
     """
-    Fetches shareholding pattern data from Screener.in
+    Parsed quarterly shareholding of one symbol as a JSON-able dict
+    (DataFrame "split" layout), None when the page has no table
     """
-    try:
-        url = f"https://www.screener.in/company/{symbol}/consolidated/"
-        r = requests.get(url, headers=HEADERS, timeout=15)
-        r.raise_for_status()
+    url = f"https://www.screener.in/company/{symbol}/consolidated/"
+    r = http_cache.get(url, "screener_page", session=SESSION, headers=HEADERS, timeout=15)
+    r.raise_for_status()
+    history = screener_parser.parse_shareholding(r.content)
+    if history.empty:
+        return None
+    return history.astype(object).where(history.notna(), None).to_dict(orient="split")
 
-        data = {}
-        lines = r.text.splitlines()
-        for i, line in enumerate(lines):
-            if "Promoters" in line:
-                data["Promoter (%)"] = lines[i + 1].strip().split()[0].replace("%", "")
-            if "Foreign Institutions" in line or "FII" in line:
-                data["FII (%)"] = lines[i + 1].strip().split()[0].replace("%", "")
-            if "Domestic Institutions" in line or "DII" in line:
-                data["DII (%)"] = lines[i + 1].strip().split()[0].replace("%", "")
-            if "Public" in line and "Shareholding" not in line:
-                data["Public (%)"] = lines[i + 1].strip().split()[0].replace("%", "")
-        return data
+def get_ownership_history(symbol):
+    """
+    Fetches the quarterly shareholding pattern from Screener.in
+    (one row per quarter, percentages as floats)
+    """
+    try:
+        # The parsed history is cached for a quarter, the page itself only for a day
+        record = http_cache.cached_json("screener_shareholding", symbol, lambda: fetch_shareholding(symbol))
+        if record is None:
+            raise ValueError("no shareholding table on the page")
+        history = pd.DataFrame(record["data"], index=pd.Index(record["index"], name="Quarter"),
+                               columns=record["columns"], dtype="float64")
+        return history.reindex(columns=list(OWNERSHIP_COLUMNS)).rename(columns=OWNERSHIP_COLUMNS)
     except Exception as e:
         print(f"⚠️ Error fetching ownership for {symbol}: {e}")
+        return pd.DataFrame(columns=list(OWNERSHIP_COLUMNS.values()), index=pd.Index([], name="Quarter"),
+                            dtype="float64")
+
+def get_ownership_data(symbol, history=None):
+    """
+    Latest-quarter shareholding pattern from Screener.in
+    """
+    if history is None:
+        history = get_ownership_history(symbol)
+    if history.empty:
         return {}
+    return {"Quarter": history.index[-1], **history.iloc[-1].to_dict()}
 
 def get_fundamental_data(symbol):
     """
-    Fetches key fundamentals from Yahoo Finance
+    Fetches the raw key fundamentals from Yahoo Finance
+    (ratios are computed for all symbols at once by ratio_engine)
     """
     ticker = yf.Ticker(symbol + ".NS")
-    info = ticker.info
-    pe = info.get("trailingPE")
-    growth = info.get("earningsGrowth")
-    eps = info.get("trailingEps")
-    price = info.get("currentPrice")
-
-    peg = round(pe / growth, 2) if pe and growth and growth != 0 else None
-    intrinsic = round(eps * (8.5 + 2 * ((growth or 0.1) * 100)), 2) if eps else None
-
+    info = http_cache.cached_json("yahoo_info", symbol + ".NS", lambda: ticker.info, rate_limit.YAHOO_HOST)
     return {
         "Company": info.get("longName"),
         "Sector": info.get("sector"),
-        "P/E": pe,
-        "Earnings Growth": growth,
-        "PEG": peg,
-        "Intrinsic Value": intrinsic,
-        "Current Price": price,
+        **ratio_engine.raw_fields(info),
     }
 
+# Output columns taken from ratio_engine
+FUNDAMENTAL_COLUMNS = {
+    "P/E": "P/E",
+    "Earnings Growth (%)": "Earnings Growth (%)",
+    "PEG": "PEG",
+    "Graham Value": "Intrinsic Value",
+    "Current Price": "Current Price",
+}
+
 # -------------------------------
 # 🔍 Symbols to analyze
 # -------------------------------
 symbols = ["INFY", "RELIANCE", "TCS"]
 
 results = []
+histories = {}
 for sym in symbols:
     fundamentals = get_fundamental_data(sym)
-    ownership = get_ownership_data(sym)
+    histories[sym] = get_ownership_history(sym)
+    ownership = get_ownership_data(sym, histories[sym])
     results.append({
         "Symbol": sym,
         **fundamentals,
@@ -82,8 +114,22 @@ for sym in symbols:
 # -------------------------------
 # 💾 Output
 # -------------------------------
-df = pd.DataFrame(results)
+raw = pd.DataFrame(results)
+ratios = ratio_engine.compute_ratios(raw, default_growth=0.1)[list(FUNDAMENTAL_COLUMNS)]
+ids = ["Symbol", "Company", "Sector"]
+ownership_columns = raw.columns.difference(ids + ratio_engine.RAW_FIELDS, sort=False)
+df = pd.concat([raw[ids], ratios.rename(columns=FUNDAMENTAL_COLUMNS), raw[ownership_columns]], axis=1)
 print("\n📊 NSE Fundamental + Ownership Analysis\n")
 print(df.to_string(index=False))
 df.to_csv("nse_fundamentals_with_ownership.csv", index=False)
 print("\n💾 Saved to nse_fundamentals_with_ownership.csv")
+
+# Every quarter's shareholding, one row per symbol and quarter
+history = pd.concat(histories, names=["Symbol"]).reset_index()
+history.to_csv("nse_ownership_history.csv", index=False)
+print("💾 Saved to nse_ownership_history.csv")
+print(f"⏱️ Screener requests: {SESSION.stats()}")
+
+# Keep a dated version of every field
+with fundamentals_store.FundamentalsStore() as store:
+    store.record_frame(raw, source="yahoo_screener")
@@ -0,0 +1,151 @@
+"""
+Shared per-host token-bucket rate limiter for every fetcher.
+
+Each upstream host gets one bucket, configured in requests per second with
+a burst capacity. Fetchers call `acquire(host)` (or `await
+acquire_async(host)`) before a request and `report(host, status)` after it:
+a 429/403 halves the bucket's rate and honours Retry-After, and every
+successful response adds a little of the rate back, so the fetchers settle
+at what the upstream actually allows instead of a fixed sleep.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# ========== CONFIG ==========
+YAHOO_HOST = "query2.finance.yahoo.com"   # used for all yfinance calls
+NSE_HOST = "www.nseindia.com"
+SCREENER_HOST = "www.screener.in"
+
+# host -> (requests per second, burst capacity)
+HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    YAHOO_HOST: (4.0, 8),
+    NSE_HOST: (3.0, 5),
+    SCREENER_HOST: (1.0, 3),
+}
+DEFAULT_LIMIT = (2.0, 4)
+
+THROTTLE_STATUSES = (403, 429)
+BACKOFF_FACTOR = 0.5      # rate multiplier on a throttling response
+RECOVERY_FRACTION = 0.05  # share of the configured rate regained per success
+MIN_RATE_FRACTION = 0.05  # the rate never drops below this share of the configured one
+
+
+class TokenBucket:
+    """Thread-safe token bucket with adaptive rate."""
+
+    def __init__(self, rate: float, burst: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """Takes a token if one is available; otherwise returns the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Waits, without blocking the event loop, until a request may be sent."""
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """Backs off after a 429/403: halves the rate and pauses for Retry-After."""
+        with self._lock:
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * BACKOFF_FACTOR)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            # One request may go right after the pause, the rest at the reduced rate
+            self.tokens = 1
+            self.updated = self.blocked_until
+
+    def succeeded(self) -> None:
+        """Additively recovers the rate after a healthy response."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def _host(url_or_host: str) -> str:
+    return urlparse(url_or_host).netloc or url_or_host
+
+
+def get_bucket(url_or_host: str) -> TokenBucket:
+    """The shared bucket of a host (a full URL is accepted too)."""
+    host = _host(url_or_host)
+    with _registry_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        return _buckets[host]
+
+
+def acquire(url_or_host: str) -> None:
+    get_bucket(url_or_host).acquire()
+
+
+async def acquire_async(url_or_host: str) -> None:
+    await get_bucket(url_or_host).acquire_async()
+
+
+def report(url_or_host: str, status: int, retry_after: Optional[str] = None) -> None:
+    """Feeds a response status back into the host's bucket."""
+    bucket = get_bucket(url_or_host)
+    if status in THROTTLE_STATUSES:
+        try:
+            seconds = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            seconds = None  # HTTP-date form, fall back to the default pause
+        bucket.throttled(seconds)
+    elif status < 400:
+        bucket.succeeded()
+
+
+def report_response(url_or_host: str, response) -> None:
+    """report() for a requests/aiohttp response object."""
+    status = getattr(response, "status_code", None) or getattr(response, "status", 0)
+    report(url_or_host, status, response.headers.get("Retry-After"))
+
+
+def is_throttle_error(exc: Exception) -> bool:
+    """True for exceptions that mean the upstream is rate limiting us (e.g. yfinance's YFRateLimitError)."""
+    status = getattr(getattr(exc, "response", None), "status_code", None) or getattr(exc, "status", None)
+    return type(exc).__name__ == "YFRateLimitError" or status == 429 or "Too Many Requests" in str(exc)
+
+
+def report_outcome(url_or_host: str, exc: Optional[Exception] = None) -> None:
+    """
+    Feedback for clients that hide the HTTP status (yfinance): success when
+    `exc` is None, throttled when it is a rate-limit error.
+    """
+    if exc is None:
+        get_bucket(url_or_host).succeeded()
+    elif is_throttle_error(exc):
+        get_bucket(url_or_host).throttled()
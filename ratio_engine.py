@@ -0,0 +1,187 @@
+"""
+Derived fundamentals ratios for many symbols at once.
+
+Fetchers keep the raw Yahoo `info` fields (see RAW_FIELDS) and every derived
+ratio is computed here as column operations over a DataFrame with one row
+per symbol, so all scripts share one formula per ratio and a formula change
+is a recompute over stored raw fields rather than a refetch.
+
+Null handling is the same for every ratio: a missing or non-finite input
+gives NaN, and ratios that are meaningless for non-positive inputs (PEG for
+negative growth, Graham value for negative EPS) are NaN as well.
+
+`statement_ratios` does the same for ratios computed from the stored
+financial statements (see statements_store), e.g. PEG on multi-year EPS CAGR.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Yahoo `info` keys the ratios are computed from
+RAW_FIELDS = [
+    "trailingPE", "priceToBook", "trailingEps", "pegRatio", "earningsGrowth",
+    "earningsQuarterlyGrowth", "returnOnEquity", "returnOnAssets", "dividendYield",
+    "netIncomeToCommon", "totalRevenue", "profitMargins", "debtToEquity",
+    "priceToSalesTrailing12Months", "marketCap", "currentPrice", "bookValue",
+    "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "beta",
+]
+
+GRAHAM_BASE_PE = 8.5      # P/E of a no-growth company
+GRAHAM_GROWTH_FACTOR = 2  # multiplier of the growth rate in percent
+
+
+def raw_fields(info: dict) -> dict:
+    """The RAW_FIELDS of one Yahoo `info` dict (missing keys as None)."""
+    return {field: info.get(field) for field in RAW_FIELDS}
+
+
+def company_fields(info: dict) -> dict:
+    """The descriptive columns of one Yahoo `info` dict, the same in every script
+    so rows stored under the "yahoo_info" source agree with each other."""
+    return {
+        "Company": info.get("longName") or info.get("shortName"),
+        "Sector": info.get("sector"),
+        "Industry": info.get("industry"),
+    }
+
+
+def _column(raw: pd.DataFrame, field: str) -> pd.Series:
+    if field not in raw.columns:
+        return pd.Series(np.nan, index=raw.index, dtype="float64")
+    values = pd.to_numeric(raw[field], errors="coerce").astype("float64")
+    return values.where(np.isfinite(values))
+
+
+def compute_ratios(raw: pd.DataFrame, default_growth: Optional[float] = None) -> pd.DataFrame:
+    """
+    Computes all derived ratios.
+
+    Args:
+        raw: One row per symbol with (a subset of) the RAW_FIELDS columns.
+        default_growth: Earnings growth (fraction) assumed where Yahoo has
+            none, for the Graham value; None leaves those values NaN.
+
+    Returns:
+        A float DataFrame with the same index as `raw`.
+    """
+    col = lambda field: _column(raw, field)
+
+    pe, eps = col("trailingPE"), col("trailingEps")
+    # Annual earnings growth, falling back to the latest quarter's year-on-year growth
+    growth = col("earningsGrowth").fillna(col("earningsQuarterlyGrowth"))
+    growth_pct = growth * 100
+
+    peg = col("pegRatio").where(lambda s: s > 0)
+    peg = peg.fillna((pe / growth_pct).where((pe > 0) & (growth_pct > 0)))
+
+    graham_growth_pct = growth_pct if default_growth is None else growth_pct.fillna(default_growth * 100)
+    graham = (eps * (GRAHAM_BASE_PE + GRAHAM_GROWTH_FACTOR * graham_growth_pct)).where(eps > 0)
+
+    revenue = col("totalRevenue")
+    net_margin = (col("netIncomeToCommon") / revenue.where(revenue != 0)) * 100
+    net_margin = net_margin.fillna(col("profitMargins") * 100)
+
+    return pd.DataFrame({
+        "P/E": pe,
+        "P/B": col("priceToBook"),
+        "EPS (TTM)": eps,
+        "Earnings Growth (%)": growth_pct,
+        "PEG": peg,
+        "Graham Value": graham,
+        "ROE (%)": col("returnOnEquity") * 100,
+        "ROA (%)": col("returnOnAssets") * 100,
+        "Dividend Yield (%)": col("dividendYield") * 100,
+        "Net Margin (%)": net_margin,
+        "Debt/Equity": col("debtToEquity"),
+        "Price/Sales": col("priceToSalesTrailing12Months"),
+        "Market Cap": col("marketCap"),
+        "Current Price": col("currentPrice"),
+        "Book Value": col("bookValue"),
+        "52W High": col("fiftyTwoWeekHigh"),
+        "52W Low": col("fiftyTwoWeekLow"),
+        "Beta": col("beta"),
+    }, index=raw.index)
+
+
+def with_ratios(raw: pd.DataFrame, default_growth: Optional[float] = None) -> pd.DataFrame:
+    """`raw` with its RAW_FIELDS columns replaced by the computed ratios."""
+    other = raw.drop(columns=[c for c in RAW_FIELDS if c in raw.columns])
+    return pd.concat([other, compute_ratios(raw, default_growth)], axis=1)
+
+
+def _latest(panel: pd.DataFrame) -> pd.Series:
+    """Latest non-null value per row of a symbol x period panel."""
+    if panel.empty:
+        return pd.Series(dtype="float64")
+    return panel.sort_index(axis=1).ffill(axis=1).iloc[:, -1]
+
+
+def eps_cagr(eps: pd.DataFrame, years: int = 3) -> pd.DataFrame:
+    """
+    Compound annual EPS growth over (up to) the last `years` periods.
+
+    Args:
+        eps: Symbol x period-end panel of EPS.
+        years: Periods to look back; fewer are used when a symbol has less
+            history. The growth is annualised over the actual time between
+            the two period ends.
+
+    Returns:
+        DataFrame indexed by symbol with "EPS CAGR (%)" and "CAGR Years".
+        Growth is NaN unless both EPS values are positive.
+    """
+    if eps.empty:
+        return pd.DataFrame(columns=["EPS CAGR (%)", "CAGR Years"], dtype="float64")
+    eps = eps.sort_index(axis=1, ascending=False)  # newest first
+    values = eps.to_numpy(dtype="float64")
+    ends = eps.columns.to_numpy(dtype="datetime64[D]")
+    valid = ~np.isnan(values)
+    # Push each symbol's missing periods to the end of its row
+    order = np.argsort(~valid, axis=1, kind="stable")
+    values = np.take_along_axis(values, order, axis=1)
+    ends = ends[order]
+
+    rows = np.arange(len(eps))
+    k = np.clip(np.minimum(years, valid.sum(axis=1) - 1), 0, None)
+    latest, base = values[:, 0], values[rows, k]
+    span = (ends[:, 0] - ends[rows, k]).astype("float64") / 365.25
+    ok = (k >= 1) & (latest > 0) & (base > 0) & (span > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(ok, (latest / base) ** (1 / np.where(ok, span, 1)) - 1, np.nan)
+    return pd.DataFrame({"EPS CAGR (%)": cagr * 100, "CAGR Years": np.where(ok, span, np.nan)},
+                        index=eps.index)
+
+
+def statement_ratios(panels: Dict[str, pd.DataFrame], pe: Optional[pd.Series] = None,
+                     years: int = 3) -> pd.DataFrame:
+    """
+    Ratios from stored financial statements for all symbols at once.
+
+    Args:
+        panels: Symbol x period panels named like statements_store.LINE_ITEMS
+            ("eps", "revenue", "current_assets", "current_liabilities",
+            "total_assets"); missing panels give NaN ratios.
+        pe: P/E per symbol for the PEG; PEG is NaN without it.
+        years: EPS CAGR look-back in periods.
+
+    Returns:
+        DataFrame indexed by symbol with "EPS CAGR (%)", "CAGR Years",
+        "PEG (CAGR)", "Current Ratio" and "Asset Turnover".
+    """
+    empty = pd.DataFrame()
+    get = lambda name: panels.get(name, empty)
+    growth = eps_cagr(get("eps"), years)
+
+    current_ratio = _latest(get("current_assets") / get("current_liabilities").where(lambda p: p != 0))
+    # Revenue over the average of opening and closing total assets (closing only for the oldest period)
+    assets = get("total_assets").sort_index(axis=1)
+    average_assets = ((assets + assets.shift(1, axis=1)) / 2).fillna(assets)
+    asset_turnover = _latest(get("revenue") / average_assets.where(lambda p: p != 0))
+
+    result = pd.concat([growth, current_ratio.rename("Current Ratio"),
+                        asset_turnover.rename("Asset Turnover")], axis=1)
+    pe = (pd.Series(np.nan, index=result.index) if pe is None else pe.reindex(result.index)).astype("float64")
+    growth_pct = result["EPS CAGR (%)"]
+    result.insert(2, "PEG (CAGR)", (pe / growth_pct).where((pe > 0) & (growth_pct > 0)))
+    return result
@@ -0,0 +1,171 @@
+"""
+Targeted extraction of the fields we use from Screener.in company pages.
+
+Pages are parsed once with lxml (C-backed) and every field is pulled with a
+precompiled XPath instead of walking a BeautifulSoup tree per field:
+
+    top ratios   <ul id="top-ratios"> <li> <span class="name"> / <span class="value">
+    shareholding <section id="shareholding"> <table> rows whose first cell
+                 names the holder class (Promoters, FIIs, ...)
+
+Intrinsic Value and other user-added ratios appear in the top ratios list.
+
+`parse_shareholding` only parses the quarterly shareholding table: the
+fragment is cut out of the raw page first, so the rest of the page is never
+turned into a tree.
+"""
+import re
+from typing import Dict, Optional
+
+import pandas as pd
+from lxml import etree, html
+
+# ========== SELECTORS ==========
+_TOP_RATIOS = etree.XPath("//ul[@id='top-ratios']/li")
+_RATIO_NAME = etree.XPath("string(.//span[contains(concat(' ', normalize-space(@class), ' '), ' name ')])")
+_RATIO_VALUE = etree.XPath("string(.//span[contains(concat(' ', normalize-space(@class), ' '), ' value ')])")
+# Older page layout / fallback: any ratio-style list item
+_RATIO_ITEMS = etree.XPath("//li[contains(concat(' ', normalize-space(@class), ' '), ' flex-space-between ')]")
+_SHAREHOLDING_ROWS = etree.XPath(
+    "(//div[@id='quarterly-shp'] | //section[@id='shareholding'])[1]//table//tr[td]")
+_TABLE_HEADERS = etree.XPath("//thead//th")
+_TABLE_ROWS = etree.XPath("//tbody/tr[td] | //table/tr[td]")
+_ROW_CELLS = etree.XPath("./td")
+_CELL_TEXT = etree.XPath("string(.)")
+
+_NUMBER = re.compile(r"-?[\d,]*\.?\d+")
+
+# markers that open the shareholding block, in order of preference
+_SHAREHOLDING_MARKERS = ('id="quarterly-shp"', "id='quarterly-shp'", 'id="shareholding"')
+
+# holder classes as labelled in the shareholding table
+HOLDERS = ("Promoters", "FIIs", "DIIs", "Government", "Public")
+
+EMPTY_RESULT = {
+    "PEG Ratio": None,
+    "Debt/Equity": None,
+    "Promoter Holding (%)": None,
+    "FII Holding (%)": None,
+    "Intrinsic Value": None,
+}
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """'₹ 1,234.5 Cr.' -> 1234.5, '12.3%' -> 12.3; None when there is no number."""
+    if not text:
+        return None
+    match = _NUMBER.search(text)
+    if match is None:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _document(page):
+    if isinstance(page, bytes):
+        # Screener serves UTF-8; lxml would assume Latin-1 for bytes without a meta charset
+        page = page.decode("utf-8", errors="replace")
+    return html.fromstring(page) if isinstance(page, str) else page
+
+
+def parse_ratios(page) -> Dict[str, str]:
+    """All top ratios as {name: value text}."""
+    doc = _document(page)
+    items = _TOP_RATIOS(doc) or _RATIO_ITEMS(doc)
+    ratios = {}
+    for item in items:
+        name = _clean(_RATIO_NAME(item))
+        if name and name not in ratios:
+            ratios[name] = _clean(_RATIO_VALUE(item))
+    return ratios
+
+
+def parse_latest_holdings(page) -> Dict[str, str]:
+    """Latest-quarter holding per holder class as {label: '12.34%'}."""
+    holdings = {}
+    for row in _SHAREHOLDING_ROWS(_document(page)):
+        cells = _ROW_CELLS(row)
+        if len(cells) < 2:
+            continue
+        label = _clean(_CELL_TEXT(cells[0])).rstrip("+ ").strip()
+        if label in HOLDERS and label not in holdings:
+            # Quarters run oldest to newest, left to right
+            holdings[label] = _clean(_CELL_TEXT(cells[-1]))
+    return holdings
+
+
+def _find_ratio(ratios: Dict[str, str], *needles: str) -> Optional[str]:
+    for name, value in ratios.items():
+        if any(n.lower() in name.lower() for n in needles):
+            return value
+    return None
+
+
+def parse_company_page(page) -> Dict[str, Optional[str]]:
+    """
+    The Screener fields of the fundamentals pipeline, extracted in one parse.
+
+    Args:
+        page: Page HTML (str/bytes) or an already parsed lxml document.
+    """
+    doc = _document(page)
+    ratios = parse_ratios(doc)
+    holdings = parse_latest_holdings(doc)
+    return {
+        "PEG Ratio": _find_ratio(ratios, "PEG"),
+        "Debt/Equity": _find_ratio(ratios, "Debt to equity"),
+        "Promoter Holding (%)": holdings.get("Promoters"),
+        "FII Holding (%)": holdings.get("FIIs"),
+        "Intrinsic Value": _find_ratio(ratios, "Intrinsic Value"),
+    }
+
+
+def _shareholding_fragment(page: str) -> Optional[str]:
+    """The first <table>...</table> after the shareholding marker, as raw HTML."""
+    for marker in _SHAREHOLDING_MARKERS:
+        start = page.find(marker)
+        if start == -1:
+            continue
+        table = page.find("<table", start)
+        end = page.find("</table>", table)
+        if table != -1 and end != -1:
+            return page[table:end + len("</table>")]
+    return None
+
+
+def parse_shareholding(page) -> pd.DataFrame:
+    """
+    Quarterly shareholding history from a Screener.in company page.
+
+    Args:
+        page: Page HTML (str or bytes).
+
+    Returns:
+        Float DataFrame indexed by quarter ("Sep 2024", oldest first) with one
+        column per holder class in HOLDERS that the page lists, in percent.
+        Empty when the page has no shareholding table.
+    """
+    if isinstance(page, bytes):
+        page = page.decode("utf-8", errors="replace")
+    fragment = _shareholding_fragment(page)
+    if fragment is None:
+        return pd.DataFrame(columns=list(HOLDERS), index=pd.Index([], name="Quarter"), dtype="float64")
+
+    table = html.fromstring(fragment)
+    quarters = [_clean(_CELL_TEXT(th)) for th in _TABLE_HEADERS(table)][1:]
+    columns = {}
+    for row in _TABLE_ROWS(table):
+        cells = _ROW_CELLS(row)
+        label = _clean(_CELL_TEXT(cells[0])).rstrip("+ ").strip()
+        if label in HOLDERS and label not in columns:
+            columns[label] = [parse_number(_CELL_TEXT(c)) for c in cells[1:]]
+
+    n = min([len(quarters)] + [len(v) for v in columns.values()])
+    return pd.DataFrame({k: v[:n] for k, v in columns.items()},
+                        index=pd.Index(quarters[:n], name="Quarter"), dtype="float64")
@@ -0,0 +1,213 @@
+"""
+Pooled HTTP session for Screener.in.
+
+One requests.Session with a keep-alive connection pool is shared by every
+Screener.in fetch. Connection errors and 5xx responses are retried by
+urllib3 with jittered exponential backoff. Several login session cookies can
+be configured: when Screener throttles one (429/403) it is rested for a
+while and the request is sent again with the next one. Every request's
+latency is recorded so slow-downs show up in `stats()`.
+
+Cookies are read from the SCREENER_SESSIONIDS environment variable
+(comma-separated) or from cookie_manager (screener_cookie.json, written by
+get_screener_cookie.py). A response that shows the login is gone takes
+that cookie out of the rotation; when none are left a fresh login is
+started in the background and picked up once cookie_manager has saved it,
+so a crawl never waits for the browser.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import cookie_manager
+import rate_limit
+
+# ========== CONFIG ==========
+COOKIE_ENV = "SCREENER_SESSIONIDS"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+POOL_SIZE = 8
+RETRIES = 3
+BACKOFF_FACTOR = 0.5      # 0.5s, 1s, 2s ... between retries
+BACKOFF_JITTER = 0.5      # up to this many seconds added to each backoff
+RETRY_STATUSES = (500, 502, 503, 504)
+COOKIE_REST = 300         # seconds a throttled cookie is left alone
+LATENCY_WINDOW = 1000     # latencies kept for stats()
+
+
+def make_retry(retries: int = RETRIES) -> Retry:
+    """urllib3 retry policy; backoff jitter needs urllib3 2, older versions retry without it."""
+    options = dict(total=retries, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES,
+                   allowed_methods=frozenset({"GET", "HEAD"}), respect_retry_after_header=True,
+                   raise_on_status=False)
+    try:
+        return Retry(backoff_jitter=BACKOFF_JITTER, **options)
+    except TypeError:
+        return Retry(**options)
+
+
+def load_session_ids() -> List[str]:
+    """Configured Screener sessionid cookies, environment first."""
+    env = os.environ.get(COOKIE_ENV)
+    if env:
+        return [s.strip() for s in env.split(",") if s.strip()]
+    cookies = cookie_manager.load("screener") or {}
+    return [cookies["sessionid"]] if cookies.get("sessionid") else []
+
+
+class ScreenerSession:
+    """Keep-alive Screener.in session with retries, cookie rotation and latency stats."""
+
+    rate_limited = True  # get() paces itself; http_cache.get must not acquire again
+
+    def __init__(self, session_ids: Optional[List[str]] = None, pool_size: int = POOL_SIZE,
+                 retries: int = RETRIES, auto_refresh: bool = True):
+        self.session_ids = list(session_ids if session_ids is not None else load_session_ids())
+        self.auto_refresh = auto_refresh  # ask cookie_manager for a new login when all are gone
+        self._rested_until: Dict[str, float] = {}
+        self._dropped: Set[str] = set()  # logged-out cookies, never used again
+        self._next = 0
+        self._lock = threading.Lock()
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.errors = 0
+
+        retry = make_retry(retries)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # ---------- cookies ----------
+    def _pick_cookie(self) -> Optional[str]:
+        """Next cookie that is not resting (round robin); the least rested one if all are."""
+        with self._lock:
+            if not self.session_ids:
+                return None
+            now = time.monotonic()
+            n = len(self.session_ids)
+            for i in range(n):
+                sid = self.session_ids[(self._next + i) % n]
+                if self._rested_until.get(sid, 0) <= now:
+                    self._next = (self._next + i + 1) % n
+                    return sid
+            return min(self.session_ids, key=lambda s: self._rested_until.get(s, 0))
+
+    def rest_cookie(self, sid: str, seconds: float = COOKIE_REST) -> None:
+        with self._lock:
+            self._rested_until[sid] = time.monotonic() + seconds
+
+    def adopt_saved_cookie(self) -> bool:
+        """Adds the cookie saved by cookie_manager to the rotation if it is valid and new."""
+        sid = (cookie_manager.load("screener") or {}).get("sessionid")
+        with self._lock:
+            if not sid or sid in self.session_ids or sid in self._dropped:
+                return False
+            self.session_ids.append(sid)
+            return True
+
+    def drop_cookie(self, sid: str) -> bool:
+        """
+        Takes a logged-out cookie out of the rotation.
+
+        Returns:
+            True when another cookie is available to retry with. When the
+            last one is gone a new login is started in the background and
+            the request fails fast instead of waiting for it.
+        """
+        with self._lock:
+            self._dropped.add(sid)
+            if sid in self.session_ids:
+                self.session_ids.remove(sid)
+            if self.session_ids:
+                return True
+        if (cookie_manager.load("screener") or {}).get("sessionid") == sid:
+            cookie_manager.invalidate("screener")
+        if self.adopt_saved_cookie():
+            return True
+        if self.auto_refresh:
+            cookie_manager.refresh_in_background("screener")
+        return False
+
+    # ---------- requests ----------
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """
+        GET with the pooled session. A throttled response is retried with each
+        other configured cookie once, a logged-out one with a replacement
+        cookie, before it is returned to the caller.
+        """
+        headers = dict(headers or {})
+        headers.pop("Cookie", None)  # the rotation decides which login is used
+        if not self.session_ids and self.auto_refresh:
+            self.adopt_saved_cookie()  # a background login may have finished
+        attempts = max(1, len(self.session_ids)) + 1
+        for attempt in range(attempts):
+            sid = self._pick_cookie()
+            cookies = {"sessionid": sid} if sid else None
+            rate_limit.acquire(url)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, cookies=cookies, **kwargs)
+            except requests.RequestException:
+                self.errors += 1
+                raise
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+            rate_limit.report_response(url, response)
+            if sid is None:
+                return response
+            if response.status_code not in rate_limit.THROTTLE_STATUSES:
+                if not self.is_logged_out(response):
+                    return response
+                print("⚠️ Screener session cookie is logged out, dropping it")
+                if not self.drop_cookie(sid):
+                    return response
+                continue
+            self.rest_cookie(sid)
+            if attempt < attempts - 1:
+                print(f"⚠️ Screener throttled a session cookie, rotating ({attempt + 1}/{attempts})")
+        return response
+
+    @staticmethod
+    def is_logged_out(response) -> bool:
+        """True for a page served without a valid login (throttled responses are not)."""
+        return (response.status_code not in rate_limit.THROTTLE_STATUSES
+                and cookie_manager.is_logged_out("screener", response))
+
+    def stats(self) -> Dict[str, float]:
+        """Request count, error count and latency mean / p50 / p95 in seconds."""
+        values = sorted(self.latencies)
+        if not values:
+            return {"requests": 0, "errors": self.errors}
+        pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "mean": sum(values) / len(values),
+            "p50": pick(0.50),
+            "p95": pick(0.95),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default: Optional[ScreenerSession] = None
+_default_lock = threading.Lock()
+
+
+def default_session() -> ScreenerSession:
+    """The process-wide Screener session, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ScreenerSession()
+        return _default
@@ -0,0 +1,212 @@
+"""
+Local store of annual and quarterly financial statements (SQLite).
+
+Statements are kept in long format, one row per (symbol, frequency,
+statement, line item, period), in the `statements` table of the
+fundamentals database. A symbol's statements are only fetched again once a
+new filing can be out: when the period after the latest stored one has
+ended and the filing lag has passed. While a due filing has not appeared
+yet, Yahoo is asked again at most every RECHECK_DAYS days.
+
+    store = StatementsStore()
+    store.update(["INFY.NS", "TCS.NS"])                  # fetches only what is due
+    eps = store.panel(["Diluted EPS", "Basic EPS"])      # symbol x period
+    ratio_engine.statement_ratios(store.panels(), pe)    # CAGR PEG etc.
+"""
+import sqlite3
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+import fundamentals_store
+import rate_limit
+
+# ========== CONFIG ==========
+DB_PATH = fundamentals_store.DB_PATH
+
+# frequency -> (months per period, days after period end the filing is due)
+FREQUENCIES = {
+    "annual": (12, 60),
+    "quarterly": (3, 45),
+}
+RECHECK_DAYS = 7
+
+# panel name -> Yahoo line item names, in order of preference
+LINE_ITEMS = {
+    "eps": ["Diluted EPS", "Basic EPS"],
+    "revenue": ["Total Revenue", "Operating Revenue"],
+    "current_assets": ["Current Assets", "Total Current Assets"],
+    "current_liabilities": ["Current Liabilities", "Total Current Liabilities"],
+    "total_assets": ["Total Assets"],
+}
+
+# statement -> yfinance Ticker attribute, per frequency
+STATEMENT_ATTRIBUTES = {
+    "annual": {"income": "financials", "balance": "balance_sheet", "cashflow": "cashflow"},
+    "quarterly": {"income": "quarterly_financials", "balance": "quarterly_balance_sheet",
+                  "cashflow": "quarterly_cashflow"},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    symbol     TEXT NOT NULL,
+    frequency  TEXT NOT NULL,
+    statement  TEXT NOT NULL,
+    line_item  TEXT NOT NULL,
+    period     TEXT NOT NULL,  -- period end date
+    value      REAL,
+    PRIMARY KEY (symbol, frequency, statement, line_item, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_statements_item ON statements (frequency, line_item, period);
+CREATE TABLE IF NOT EXISTS statement_checks (
+    symbol      TEXT NOT NULL,
+    frequency   TEXT NOT NULL,
+    checked_at  TEXT NOT NULL,
+    PRIMARY KEY (symbol, frequency)
+) WITHOUT ROWID;
+"""
+
+
+def to_long(symbol: str, frequency: str, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Turns yfinance statement frames (line item x period) into long rows."""
+    parts = []
+    for statement, df in frames.items():
+        if df is None or df.empty:
+            continue
+        long = df.rename_axis(index="line_item", columns="period").stack().rename("value").reset_index()
+        long["statement"] = statement
+        parts.append(long)
+    if not parts:
+        return pd.DataFrame(columns=["symbol", "frequency", "statement", "line_item", "period", "value"])
+    rows = pd.concat(parts, ignore_index=True)
+    rows["period"] = pd.to_datetime(rows["period"]).dt.strftime("%Y-%m-%d")
+    rows["value"] = pd.to_numeric(rows["value"], errors="coerce")
+    rows.insert(0, "symbol", symbol)
+    rows.insert(1, "frequency", frequency)
+    return rows[["symbol", "frequency", "statement", "line_item", "period", "value"]].dropna(subset=["value"])
+
+
+def fetch_statements(symbol: str, frequency: str = "annual") -> Dict[str, pd.DataFrame]:
+    """The income, balance and cash flow statements of one symbol from Yahoo."""
+    ticker = yf.Ticker(symbol)
+    frames = {}
+    for statement, attribute in STATEMENT_ATTRIBUTES[frequency].items():
+        rate_limit.acquire(rate_limit.YAHOO_HOST)
+        try:
+            frames[statement] = getattr(ticker, attribute)
+        except Exception as e:
+            rate_limit.report_outcome(rate_limit.YAHOO_HOST, e)
+            raise
+        rate_limit.report_outcome(rate_limit.YAHOO_HOST)
+    return frames
+
+
+class StatementsStore:
+    """Long-format statements table with filing-aware refresh."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "StatementsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- refresh ----------
+    def latest_period(self, symbol: str, frequency: str = "annual") -> Optional[pd.Timestamp]:
+        row = self.conn.execute("SELECT MAX(period) FROM statements WHERE symbol = ? AND frequency = ?",
+                                (symbol, frequency)).fetchone()
+        return pd.Timestamp(row[0]) if row[0] else None
+
+    def needs_refresh(self, symbol: str, frequency: str = "annual", today: Optional[date] = None) -> bool:
+        """True when a filing newer than the stored ones should be out and was not checked for lately."""
+        today = today or date.today()
+        row = self.conn.execute("SELECT checked_at FROM statement_checks WHERE symbol = ? AND frequency = ?",
+                                (symbol, frequency)).fetchone()
+        if row is not None and date.fromisoformat(row[0]) > today - timedelta(days=RECHECK_DAYS):
+            return False
+        latest = self.latest_period(symbol, frequency)
+        if latest is None:
+            return True
+        months, lag_days = FREQUENCIES[frequency]
+        next_due = latest + pd.DateOffset(months=months) + pd.Timedelta(days=lag_days)
+        return pd.Timestamp(today) >= next_due
+
+    def save(self, rows: pd.DataFrame, symbol: str, frequency: str, checked_at: Optional[date] = None) -> int:
+        """Upserts long rows and records the check date."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?, ?)",
+                rows[["symbol", "frequency", "statement", "line_item", "period", "value"]]
+                .itertuples(index=False, name=None))
+            self.conn.execute("INSERT OR REPLACE INTO statement_checks VALUES (?, ?, ?)",
+                              (symbol, frequency, (checked_at or date.today()).isoformat()))
+        return len(rows)
+
+    def update(self, symbols: Iterable[str], frequencies: Iterable[str] = ("annual",),
+               fetcher: Callable[[str, str], Dict[str, pd.DataFrame]] = fetch_statements) -> Dict[str, int]:
+        """
+        Fetches the statements of the symbols that have a filing due.
+
+        Returns:
+            A dict of symbol -> rows written (symbols that were not due are left out).
+        """
+        written: Dict[str, int] = {}
+        for symbol in dict.fromkeys(symbols):
+            for frequency in frequencies:
+                if not self.needs_refresh(symbol, frequency):
+                    continue
+                try:
+                    rows = to_long(symbol, frequency, fetcher(symbol, frequency))
+                except Exception as e:
+                    print(f"⚠️ Statements fetch failed for {symbol} ({frequency}): {e}")
+                    continue
+                written[symbol] = written.get(symbol, 0) + self.save(rows, symbol, frequency)
+        return written
+
+    # ---------- reads ----------
+    def read(self, line_items: Iterable[str], frequency: str = "annual",
+             symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Long rows of the given line items."""
+        line_items = list(line_items)
+        query = (f"SELECT symbol, line_item, period, value FROM statements WHERE frequency = ? "
+                 f"AND line_item IN ({', '.join('?' * len(line_items))})")
+        params: List = [frequency] + line_items
+        if symbols is not None:
+            symbols = list(symbols)
+            query += f" AND symbol IN ({', '.join('?' * len(symbols))})"
+            params += symbols
+        df = pd.read_sql_query(query, self.conn, params=params)
+        df["period"] = pd.to_datetime(df["period"])
+        return df
+
+    def panel(self, line_items: Iterable[str], frequency: str = "annual",
+              symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Symbol x period panel of one line item.
+
+        Args:
+            line_items: Names of the line item, in order of preference (Yahoo
+                renamed several items over time, e.g. "Total Current Assets"
+                -> "Current Assets"); the first one present per cell is used.
+        """
+        line_items = list(line_items)
+        df = self.read(line_items, frequency, symbols)
+        if df.empty:
+            return pd.DataFrame()
+        df["rank"] = df["line_item"].map({item: i for i, item in enumerate(line_items)})
+        df = df.sort_values("rank").drop_duplicates(["symbol", "period"])
+        return df.pivot(index="symbol", columns="period", values="value").sort_index(axis=1)
+
+    def panels(self, symbols: Optional[Iterable[str]] = None,
+               frequency: str = "annual") -> Dict[str, pd.DataFrame]:
+        """The LINE_ITEMS panels that ratio_engine.statement_ratios works on."""
+        return {name: self.panel(items, frequency, symbols) for name, items in LINE_ITEMS.items()}
@@ -0,0 +1,128 @@
+"""
+Local symbol master built from NSE's EQUITY_L.csv.
+
+The master is refreshed at most once a day and kept in
+.symbol_master/symbol_master.csv. Each refresh is diffed against the
+previous master and the listings / delistings are appended to
+.symbol_master/changes.csv. Lookups by symbol or ISIN are dict lookups.
+
+    master = load_symbol_master()
+    master.symbols(suffix=".NS")        # EQ series, Yahoo tickers
+    master.get("INFY")["ISIN"]
+    master.by_isin("INE009A01021")["Symbol"]
+"""
+import io
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+import http_cache
+
+# ========== CONFIG ==========
+EQUITY_LIST_URL = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
+MASTER_DIR = ".symbol_master"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+# EQUITY_L.csv column -> master column
+COLUMNS = {
+    "SYMBOL": "Symbol",
+    "NAME OF COMPANY": "Company",
+    "SERIES": "Series",
+    "DATE OF LISTING": "Listing Date",
+    "ISIN NUMBER": "ISIN",
+    "FACE VALUE": "Face Value",
+}
+CHANGE_COLUMNS = ["Date", "Change", "Symbol", "ISIN", "Company"]
+
+
+class SymbolMaster:
+    """Symbol master table with O(1) lookups by symbol and ISIN."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        records = self.frame.to_dict("records")
+        self._by_symbol: Dict[str, dict] = {r["Symbol"]: r for r in records}
+        self._by_isin: Dict[str, dict] = {r["ISIN"]: r for r in records}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def get(self, symbol: str) -> Optional[dict]:
+        return self._by_symbol.get(symbol)
+
+    def by_isin(self, isin: str) -> Optional[dict]:
+        return self._by_isin.get(isin)
+
+    def symbols(self, series: Optional[str] = "EQ", suffix: str = "") -> List[str]:
+        """Symbols of one series (all series when None), e.g. suffix=".NS" for Yahoo."""
+        frame = self.frame if series is None else self.frame[self.frame["Series"] == series]
+        return [s + suffix for s in frame["Symbol"]]
+
+
+def parse_equity_list(text: str) -> pd.DataFrame:
+    """Parses EQUITY_L.csv into the master's columns and dtypes."""
+    df = pd.read_csv(io.StringIO(text), dtype=str, skipinitialspace=True)
+    df.columns = [c.strip().upper() for c in df.columns]
+    missing = [c for c in COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Unexpected columns in NSE CSV, missing {missing}: {df.columns.tolist()}")
+
+    df = df[list(COLUMNS)].rename(columns=COLUMNS)
+    for col in ("Symbol", "Company", "Series", "ISIN"):
+        df[col] = df[col].str.strip()
+    df["Listing Date"] = pd.to_datetime(df["Listing Date"], format="%d-%b-%Y", errors="coerce")
+    df["Face Value"] = pd.to_numeric(df["Face Value"], errors="coerce")
+    return df.drop_duplicates("Symbol")
+
+
+def diff_masters(old: pd.DataFrame, new: pd.DataFrame, on: Optional[date] = None) -> pd.DataFrame:
+    """Listings and delistings between two masters as rows of CHANGE_COLUMNS."""
+    on = on or date.today()
+    old_symbols, new_symbols = set(old["Symbol"]), set(new["Symbol"])
+    added = new[new["Symbol"].isin(new_symbols - old_symbols)].assign(Change="listed")
+    removed = old[old["Symbol"].isin(old_symbols - new_symbols)].assign(Change="delisted")
+    changes = pd.concat([added, removed], ignore_index=True).assign(Date=on.isoformat())
+    return changes.reindex(columns=CHANGE_COLUMNS)
+
+
+def _read_master(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"Symbol": str, "ISIN": str, "Series": str},
+                       parse_dates=["Listing Date"], keep_default_na=False, na_values=[""])
+
+
+def load_symbol_master(master_dir: str = MASTER_DIR, force: bool = False) -> SymbolMaster:
+    """
+    The symbol master, downloading EQUITY_L.csv at most once a day.
+
+    Args:
+        master_dir: Directory holding the master and its change log.
+        force: Refresh even if the master was already refreshed today.
+    """
+    path = os.path.join(master_dir, "symbol_master.csv")
+    changes_path = os.path.join(master_dir, "changes.csv")
+    if not force and os.path.exists(path) and \
+            datetime.fromtimestamp(os.path.getmtime(path)).date() == date.today():
+        return SymbolMaster(_read_master(path))
+
+    # The source has no cache TTL: the daily gate above decides, and the request
+    # is only revalidated (ETag/Last-Modified), so the CSV is never a day behind
+    response = http_cache.get(EQUITY_LIST_URL, "nse_equity_list", headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    master = parse_equity_list(response.text)
+
+    os.makedirs(master_dir, exist_ok=True)
+    if os.path.exists(path):
+        changes = diff_masters(_read_master(path), master)
+        if not changes.empty:
+            changes.to_csv(changes_path, mode="a", index=False, header=not os.path.exists(changes_path))
+            print(f"🔄 Symbol master: {(changes['Change'] == 'listed').sum()} listed, "
+                  f"{(changes['Change'] == 'delisted').sum()} delisted since the last refresh")
+    tmp = path + ".tmp"
+    master.to_csv(tmp, index=False, date_format="%Y-%m-%d")
+    os.replace(tmp, path)
+    return SymbolMaster(master)
@@ -1,8 +1,5 @@
 #Stock/equity information from NSE
-import requests
+import nse_client
 
-headers = {
-    'User-Agent': 'Mozilla/5.0'
-}
-response = requests.get("https://www.nseindia.com/api/quote-equity?symbol=TCS", headers=headers)
-print(response.json())
+quotes = nse_client.fetch_quotes(["TCS"])
+print(quotes["TCS"])
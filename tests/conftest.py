@@ -0,0 +1,13 @@
+"""
+The modules under test are scripts run from their own folder, not an
+installed package, so both script folders are put on sys.path here.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+for folder in (ROOT, os.path.join(ROOT, "Mark Minervini Stock Screener")):
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import zipfile
+
+import pandas as pd
+import pytest
+
+import bhavcopy
+import price_store
+from conftest import FIXTURES
+
+OLD = "cm28JUN2024bhav.csv"
+UDIFF = "BhavCopy_NSE_CM_0_0_0_20240701_F_0000.csv"
+
+
+@pytest.fixture
+def bhav_dir(tmp_path):
+    """The fixture bhavcopies zipped the way NSE publishes them."""
+    folder = tmp_path / "zips"
+    folder.mkdir()
+    for name in (OLD, UDIFF):
+        with zipfile.ZipFile(folder / (name + ".zip"), "w") as archive:
+            archive.write(os.path.join(FIXTURES, name), name)
+    return str(folder)
+
+
+def yahoo_bars(dates, close):
+    """Bars shaped like a yfinance download: float prices, int64 volume."""
+    index = pd.DatetimeIndex(pd.to_datetime(dates), name="Date")
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": [1000] * len(dates)}, index=index)
+
+
+def test_file_date_both_layouts():
+    assert bhavcopy.file_date(OLD + ".zip") == pd.Timestamp("2024-06-28")
+    assert bhavcopy.file_date(UDIFF + ".zip") == pd.Timestamp("2024-07-01")
+    assert bhavcopy.file_date("notes.csv") is None
+
+
+def test_read_old_and_udiff_layouts():
+    old = bhavcopy.read_bhavcopy(os.path.join(FIXTURES, OLD))
+    udiff = bhavcopy.read_bhavcopy(os.path.join(FIXTURES, UDIFF))
+    for df, day in ((old, "2024-06-28"), (udiff, "2024-07-01")):
+        assert list(df.columns) == ["Date", "Symbol"] + bhavcopy.FIELDS
+        assert sorted(df["Symbol"]) == ["INFY", "TCS", "XYZ"]
+        assert (df["Date"] == pd.Timestamp(day)).all()
+    # The N1 bond row of TCS is not in the wanted series
+    assert old.set_index("Symbol").loc["TCS", "Close"] == pytest.approx(3937.90)
+    assert udiff.set_index("Symbol").loc["INFY", "Volume"] == 6234567
+
+
+def test_read_rejects_other_csv(tmp_path):
+    path = tmp_path / "other.csv"
+    path.write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError):
+        bhavcopy.read_bhavcopy(str(path))
+
+
+def test_ingest_is_incremental(tmp_path, bhav_dir):
+    store = bhavcopy.BhavcopyStore(str(tmp_path / "bhav"))
+    assert store.ingest(bhav_dir) == [pd.Timestamp("2024-06-28"), pd.Timestamp("2024-07-01")]
+    assert store.ingest(bhav_dir) == []
+
+    panels = store.panels(symbols=["INFY", "TCS"])
+    assert list(panels["Close"].columns) == ["INFY", "TCS"]
+    assert panels["Close"].loc["2024-07-01", "TCS"] == pytest.approx(3972.65)
+
+
+def test_append_to_matches_yahoo_parts(tmp_path, bhav_dir):
+    prices = price_store.PriceStore(str(tmp_path / "prices"), compact_after=1)
+    prices.append("INFY.NS", yahoo_bars(["2024-06-26", "2024-06-27"], [1500.0, 1521.75]))
+
+    bhav = bhavcopy.BhavcopyStore(str(tmp_path / "bhav"))
+    bhav.ingest(bhav_dir)
+    appended = bhav.append_to(prices, suffix=".NS", symbols=["INFY.NS"])
+    assert appended == {"INFY.NS": 2}
+
+    # compact_after=1 merged the Yahoo and bhavcopy parts into one file
+    assert len(prices._parts("INFY.NS")) == 1
+    df = prices.read("INFY.NS")
+    assert str(df["Volume"].dtype) == "int64"
+    assert list(df["Close"]) == pytest.approx([1500.0, 1521.75, 1536.25, 1558.40])
+
+    panels = prices.tail_panels(["INFY.NS"], ["High", "Low", "Volume"], 3)
+    assert list(panels["Volume"]["INFY.NS"]) == [1000, 5123456, 6234567]
+
+
+def test_append_to_without_symbols(tmp_path, bhav_dir):
+    prices = price_store.PriceStore(str(tmp_path / "prices"))
+    bhav = bhavcopy.BhavcopyStore(str(tmp_path / "bhav"))
+    bhav.ingest(bhav_dir)
+    assert bhav.append_to(prices, suffix=".NS", symbols=[]) == {}
+    assert prices.symbols() == []
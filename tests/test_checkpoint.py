@@ -0,0 +1,36 @@
+import checkpoint
+
+
+def test_resume_skips_logged_keys(tmp_path):
+    path = str(tmp_path / "crawl.checkpoint.jsonl")
+    log = checkpoint.CheckpointLog(path)
+    log.append_batch([("INFY.NS", {"P/E": 25.0}), ("TCS.NS", None)])
+
+    resumed = checkpoint.CheckpointLog(path)
+    assert resumed.done() == {"INFY.NS", "TCS.NS"}
+    assert resumed.done(include_failed=False) == {"INFY.NS"}
+    assert resumed.failed() == ["TCS.NS"]
+    assert resumed.records() == [{"P/E": 25.0}]
+
+
+def test_later_lines_win(tmp_path):
+    path = str(tmp_path / "crawl.checkpoint.jsonl")
+    checkpoint.CheckpointLog(path).append_batch([("TCS.NS", None)])
+    checkpoint.CheckpointLog(path).append_batch([("TCS.NS", {"P/E": 30.0})])
+    log = checkpoint.CheckpointLog(path)
+    assert log.failed() == [] and log.records() == [{"P/E": 30.0}]
+
+
+def test_torn_last_line_is_ignored_and_not_glued_to(tmp_path):
+    path = tmp_path / "crawl.checkpoint.jsonl"
+    checkpoint.CheckpointLog(str(path)).append_batch([("INFY.NS", {"P/E": 25.0})])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "TCS.NS", "sta')  # crash mid-write
+
+    log = checkpoint.CheckpointLog(str(path))
+    assert log.done() == {"INFY.NS"}
+    log.append_batch([("TCS.NS", {"P/E": 30.0})])
+
+    resumed = checkpoint.CheckpointLog(str(path))
+    assert resumed.done() == {"INFY.NS", "TCS.NS"}
+    assert resumed.records() == [{"P/E": 25.0}, {"P/E": 30.0}]
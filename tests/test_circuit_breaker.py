@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitOpenError
+
+
+@pytest.fixture
+def source():
+    return circuit_breaker.Source("example.com", initial=8, maximum=8)
+
+
+def fail(source, times=1):
+    for _ in range(times):
+        source.after(status=503, probe=source.before())
+
+
+def expire(source):
+    """Ends the open period without waiting for it."""
+    source.open_until = 0.0
+
+
+def test_is_failure():
+    assert circuit_breaker.is_failure(status=429)
+    assert circuit_breaker.is_failure(status=503)
+    assert not circuit_breaker.is_failure(status=200)
+    assert not circuit_breaker.is_failure(status=404)
+    assert circuit_breaker.is_failure(exc=TimeoutError())
+    assert not circuit_breaker.is_failure(exc=CircuitOpenError())
+
+
+def test_opens_after_consecutive_failures(source):
+    fail(source, circuit_breaker.FAILURE_THRESHOLD - 1)
+    assert source.state == CLOSED
+    source.after(status=200, probe=source.before())
+    assert source.failures == 0
+
+    fail(source, circuit_breaker.FAILURE_THRESHOLD)
+    assert source.state == OPEN
+    assert source.retry_in() > 0
+    with pytest.raises(CircuitOpenError):
+        source.before()
+
+
+def test_aimd_limit(source):
+    fail(source)
+    assert source.limit == 4
+    source.after(status=200, probe=source.before())
+    assert source.limit == pytest.approx(4.25)
+    fail(source, 3)
+    assert source.limit == circuit_breaker.MIN_CONCURRENCY
+
+
+def test_in_flight_failures_do_not_trip_again(source):
+    # A burst: the threshold's worth of failures plus more requests still in flight
+    probes = [source.before() for _ in range(8)]
+    for probe in probes[:circuit_breaker.FAILURE_THRESHOLD]:
+        source.after(status=503, probe=probe)
+    assert (source.state, source.trips) == (OPEN, 1)
+    open_until, limit = source.open_until, source.limit
+
+    for probe in probes[circuit_breaker.FAILURE_THRESHOLD:]:
+        source.after(status=503, probe=probe)
+    assert (source.trips, source.open_until, source.limit) == (1, open_until, limit)
+    assert source.in_flight == 0
+
+
+def test_half_open_lets_one_probe_through():
+    # Room for the stale call's slot while the failures halve the limit
+    source = circuit_breaker.Source("example.com", initial=64, maximum=64)
+    stale = source.before()
+    fail(source, circuit_breaker.FAILURE_THRESHOLD)
+    expire(source)
+
+    probe = source.before()
+    assert probe is True and source.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        source.before()
+
+    # A leftover success from before the trip neither closes the circuit
+    # nor lets a second probe through
+    source.after(status=200, probe=stale)
+    assert source.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        source.before()
+
+    source.after(status=200, probe=probe)
+    assert (source.state, source.trips) == (CLOSED, 0)
+    assert source.before() is False
+
+
+def test_failed_probe_doubles_the_open_period(source):
+    fail(source, circuit_breaker.FAILURE_THRESHOLD)
+    first = source.retry_in()
+    expire(source)
+    fail(source)
+    assert source.state == OPEN and source.trips == 2
+    assert source.retry_in() > first * 1.5
+
+
+def test_concurrency_limit_blocks_async_callers():
+    source = circuit_breaker.Source("example.com", initial=1, maximum=1)
+
+    async def run():
+        first = await source.before_async()
+        waiter = asyncio.ensure_future(source.before_async())
+        await asyncio.sleep(circuit_breaker.ASYNC_POLL * 3)
+        assert not waiter.done()
+        source.after(status=200, probe=first)
+        await asyncio.wait_for(waiter, 1)
+        source.after(status=200, probe=waiter.result())
+
+    asyncio.run(run())
+    assert source.in_flight == 0
+
+
+def test_call_reports_exceptions(source):
+    with pytest.raises(TimeoutError):
+        source.call(lambda: (_ for _ in ()).throw(TimeoutError()))
+    assert source.failures == 1 and source.in_flight == 0
+    assert source.call(lambda: 42) == 42
+    assert source.failures == 0
@@ -0,0 +1,71 @@
+import json
+import time
+
+import pytest
+
+import cookie_manager
+
+
+@pytest.fixture(autouse=True)
+def cookie_files(tmp_path, monkeypatch):
+    files = {"screener": str(tmp_path / "screener_cookie.json"), "nse": str(tmp_path / "nse_cookie.json")}
+    monkeypatch.setattr(cookie_manager, "COOKIE_FILES", files)
+    return files
+
+
+def test_save_and_load():
+    cookie_manager.save("screener", {"sessionid": "abc"})
+    assert cookie_manager.load("screener") == {"sessionid": "abc"}
+
+
+def test_expired_cookies_are_not_loaded():
+    cookie_manager.save("nse", {"nsit": "x"}, expires=time.time() + cookie_manager.EXPIRY_MARGIN / 2)
+    assert cookie_manager.load("nse") is None
+
+
+def test_invalidate(cookie_files, tmp_path):
+    cookie_manager.save("screener", {"sessionid": "abc"})
+    cookie_manager.invalidate("screener")
+    assert cookie_manager.load("screener") is None
+    with open(cookie_files["screener"]) as f:
+        assert json.load(f)["invalid"] is True
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_flat_files_from_before_expiries(cookie_files):
+    with open(cookie_files["screener"], "w") as f:
+        json.dump({"sessionid": "old"}, f)
+    assert cookie_manager.load("screener") == {"sessionid": "old"}
+
+
+def test_get_cookies_refreshes_when_missing(monkeypatch):
+    monkeypatch.setitem(cookie_manager.REFRESHERS, "nse", lambda: {"nsit": "fresh"})
+    assert cookie_manager.get_cookies("nse") == {"nsit": "fresh"}
+    assert cookie_manager.get_cookies("nse", refresh=False) == {}
+
+
+def test_refresh_in_background_runs_once(monkeypatch):
+    import threading
+    release, calls = threading.Event(), []
+    monkeypatch.setitem(cookie_manager.REFRESHERS, "screener", lambda: calls.append(1) or release.wait(5))
+    cookie_manager.refresh_in_background("screener")
+    cookie_manager.refresh_in_background("screener")
+    release.set()
+    cookie_manager._background["screener"].join(5)
+    assert calls == [1]
+
+
+class Response:
+    def __init__(self, status_code=200, text="", url="https://www.screener.in/company/INFY/"):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.headers = {"Content-Type": "text/html"}
+
+
+def test_is_logged_out():
+    assert cookie_manager.is_logged_out("nse", Response(403))
+    assert not cookie_manager.is_logged_out("nse", Response(200))
+    assert cookie_manager.is_logged_out("screener", Response(200, "<a href='/login/'>"))
+    assert not cookie_manager.is_logged_out("screener", Response(200, "<a href='/logout/'>"))
+    assert cookie_manager.is_logged_out("screener", Response(200, "", "https://www.screener.in/login/"))
@@ -0,0 +1,88 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import fundamentals_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    with fundamentals_store.FundamentalsStore(str(tmp_path / "fundamentals.db")) as s:
+        yield s
+
+
+def test_unchanged_values_are_not_versioned(store):
+    assert store.record("INFY", {"P/E": 25.0, "Sector": "IT"}, "yahoo_info", "2025-01-01") == 2
+    assert store.record("INFY", {"P/E": 25.0, "Sector": "IT"}, "yahoo_info", "2025-01-02") == 0
+    assert store.record("INFY", {"P/E": 27.5, "Sector": "IT"}, "yahoo_info", "2025-01-03") == 1
+
+    history = store.history("INFY", "P/E", "yahoo_info")
+    assert list(history.index.strftime("%Y-%m-%d")) == ["2025-01-01", "2025-01-03"]
+    assert list(history) == [25.0, 27.5]
+
+
+def test_as_of_is_point_in_time(store):
+    store.record("INFY", {"P/E": 25.0}, "yahoo_info", "2025-01-01")
+    store.record("INFY", {"P/E": 27.5}, "yahoo_info", "2025-02-01")
+    assert store.as_of("2025-01-15", source="yahoo_info").loc["INFY", "P/E"] == 25.0
+    assert store.as_of("2025-02-01", source="yahoo_info").loc["INFY", "P/E"] == 27.5
+    assert store.as_of("2024-12-31", source="yahoo_info").empty
+
+
+def test_sources_do_not_overwrite_each_other(store):
+    for day in ("2025-01-01", "2025-01-02", "2025-01-03"):
+        assert store.record("INFY", {"P/E": 25.0}, "yahoo_info", day) == (day == "2025-01-01")
+        assert store.record("INFY", {"P/E": 31.0}, "nse_screener", day) == (day == "2025-01-01")
+
+    assert store.as_of(source="yahoo_info").loc["INFY", "P/E"] == 25.0
+    assert store.as_of(source="nse_screener").loc["INFY", "P/E"] == 31.0
+    both = store.as_of()
+    assert both.loc["INFY", ("nse_screener", "P/E")] == 31.0
+    assert both.loc["INFY", ("yahoo_info", "P/E")] == 25.0
+
+
+def test_changed_since(store):
+    store.record("INFY", {"P/E": 25.0, "P/B": 7.0}, "yahoo_info", "2025-01-01")
+    store.record("INFY", {"P/E": 27.5, "P/B": 7.0}, "yahoo_info", "2025-02-01")
+    changed = store.changed_since("2025-01-01")
+    assert list(changed["field"]) == ["P/E"]
+    assert changed["value"].iloc[0] == 27.5
+
+
+def test_fresh_symbols(store):
+    today = date.today()
+    store.record("INFY", {"P/E": 25.0}, "yahoo_info", today - timedelta(days=2))
+    store.record("TCS", {"P/E": 30.0}, "yahoo_info", today - timedelta(days=10))
+    store.record("WIPRO", {"P/E": 20.0}, "nse_screener", today)
+    assert store.fresh_symbols("yahoo_info", max_age_days=7) == {"INFY"}
+
+
+def test_missing_values_round_trip(store):
+    store.record("INFY", {"PEG": None, "Name": "Infosys"}, "yahoo_info", "2025-01-01")
+    snapshot = store.as_of("2025-01-01", source="yahoo_info")
+    assert snapshot.loc["INFY", "Name"] == "Infosys"
+    assert snapshot["PEG"].isna().all()
+
+
+def test_migrates_tables_keyed_without_source(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE fundamentals (
+            symbol TEXT NOT NULL, field TEXT NOT NULL, valid_from TEXT NOT NULL,
+            last_seen TEXT NOT NULL, source TEXT NOT NULL, value_num REAL, value_text TEXT,
+            PRIMARY KEY (symbol, field, valid_from)) WITHOUT ROWID;
+        CREATE INDEX idx_fundamentals_field ON fundamentals (field, valid_from);
+        INSERT INTO fundamentals VALUES ('INFY', 'P/E', '2025-01-01', '2025-01-05', 'yahoo_info', 25.0, NULL);
+    """)
+    conn.commit()
+    conn.close()
+
+    with fundamentals_store.FundamentalsStore(path) as store:
+        assert store.as_of("2025-01-05", source="yahoo_info").loc["INFY", "P/E"] == 25.0
+        assert store.record("INFY", {"P/E": 31.0}, "nse_screener", "2025-01-06") == 1
+        assert store.as_of(source="yahoo_info").loc["INFY", "P/E"] == 25.0
+    # Opening a migrated store again leaves it as it is
+    with fundamentals_store.FundamentalsStore(path) as store:
+        assert len(store.changed_since("2024-12-31")) == 2
@@ -0,0 +1,160 @@
+import time
+
+import pytest
+
+import circuit_breaker
+import http_cache
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b"", headers=None, url=""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+
+class FakeSession:
+    """Serves queued responses and records the headers of every request."""
+
+    rate_limited = True  # keep the shared rate limiter out of the tests
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+URL = "https://example.com/page"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setitem(circuit_breaker._sources, "example.com",
+                        circuit_breaker.Source("example.com", 4, 4))
+    return tmp_path
+
+
+def age(url, seconds):
+    """Moves an entry's fetch time back by `seconds`."""
+    entry = http_cache._load_entry(url)
+    entry["fetched_at"] = time.time() - seconds
+    http_cache._save_entry(url, entry)
+
+
+def test_fresh_entries_are_served_without_a_request():
+    session = FakeSession(FakeResponse(200, b"hello", {"ETag": '"v1"'}))
+    first = http_cache.get(URL, "nse_quote", session=session)
+    assert (first.content, first.from_cache) == (b"hello", False)
+    second = http_cache.get(URL, "nse_quote", session=session)
+    assert (second.content, second.from_cache) == (b"hello", True)
+    assert len(session.requests) == 1
+
+
+def test_stale_entries_are_revalidated():
+    session = FakeSession(FakeResponse(200, b"hello", {"ETag": '"v1"', "Last-Modified": "Mon"}),
+                          FakeResponse(304))
+    http_cache.get(URL, "nse_quote", session=session)
+    age(URL, http_cache.SOURCE_TTL["nse_quote"] + 1)
+    assert http_cache.lookup(URL, "nse_quote") is None
+
+    response = http_cache.get(URL, "nse_quote", session=session)
+    assert response.content == b"hello"
+    assert session.requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+    # The 304 made the entry fresh again
+    assert http_cache.lookup(URL, "nse_quote") is not None
+
+
+def test_identical_bodies_share_a_blob(cache_dir):
+    http_cache.store(URL, b"same")
+    http_cache.store(URL + "?b", b"same")
+    blobs = list((cache_dir / "cache" / "blobs").rglob("*.z"))
+    assert len(blobs) == 1
+
+
+def test_errors_are_returned_and_not_cached():
+    session = FakeSession(FakeResponse(500, b"oops"))
+    response = http_cache.get(URL, "nse_quote", session=session)
+    assert response.status_code == 500
+    assert http_cache.lookup(URL, "nse_quote") is None
+
+
+def test_logged_out_pages_do_not_count_against_the_breaker():
+    class LoginSession(FakeSession):
+        @staticmethod
+        def is_logged_out(response):
+            return response.status_code == 403
+
+    session = LoginSession(*[FakeResponse(403) for _ in range(circuit_breaker.FAILURE_THRESHOLD)])
+    for _ in range(circuit_breaker.FAILURE_THRESHOLD):
+        http_cache.get(URL, "screener_page", session=session)
+    source = circuit_breaker.get_source(URL)
+    assert (source.state, source.failures, source.limit) == (circuit_breaker.CLOSED, 0, 4)
+
+
+def test_cached_json():
+    calls = []
+    fetch = lambda: calls.append(1) or {"trailingPE": 25.0}
+    assert http_cache.cached_json("yahoo_info", "INFY.NS", fetch) == {"trailingPE": 25.0}
+    assert http_cache.cached_json("yahoo_info", "INFY.NS", fetch) == {"trailingPE": 25.0}
+    assert len(calls) == 1
+
+
+def test_concurrent_stores_of_the_same_body(cache_dir):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def store(i):
+        # Blob files are only written when missing, so force the race on them
+        http_cache._write_atomic(http_cache._blob_path("ab" * 32), b"x" * 100_000)
+        http_cache.store(f"{URL}?{i}", b'{"trailingPegRatio": null}')
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(store, range(200)))
+    assert not list((cache_dir / "cache").rglob("*.tmp"))
+    assert http_cache.lookup(URL + "?7", "yahoo_info").json() == {"trailingPegRatio": None}
+
+
+def test_304_for_a_lost_entry_falls_back_to_a_full_get(cache_dir):
+    session = FakeSession(FakeResponse(200, b"hello", {"ETag": '"v1"'}),
+                          FakeResponse(304), FakeResponse(200, b"hello again", {"ETag": '"v2"'}))
+    http_cache.get(URL, "nse_quote", session=session)
+    age(URL, http_cache.SOURCE_TTL["nse_quote"] + 1)
+    for blob in (cache_dir / "cache" / "blobs").rglob("*.z"):
+        blob.unlink()
+
+    response = http_cache.get(URL, "nse_quote", session=session)
+    assert (response.status_code, response.content) == (200, b"hello again")
+    assert session.requests[1] == {"If-None-Match": '"v1"'}
+    assert session.requests[2] == {}
+    assert http_cache.lookup(URL, "nse_quote").content == b"hello again"
+
+
+@pytest.mark.parametrize("payload", [None, {}, {"trailingPegRatio": None}, []])
+def test_empty_payloads_are_not_cached(payload):
+    calls = []
+    fetch = lambda: calls.append(1) or payload
+    http_cache.cached_json("yahoo_info", "DEAD.NS", fetch)
+    http_cache.cached_json("yahoo_info", "DEAD.NS", fetch)
+    assert len(calls) == 2
+
+
+def test_empty_frames_are_not_cached():
+    import pandas as pd
+    calls = []
+    fetch = lambda: calls.append(1) or pd.DataFrame()
+    http_cache.cached_frame("yahoo_statements", "DEAD.NS", fetch)
+    http_cache.cached_frame("yahoo_statements", "DEAD.NS", fetch)
+    assert len(calls) == 2
+
+
+def test_screener_pages_expire_within_a_day():
+    assert http_cache.SOURCE_TTL["screener_page"] <= http_cache.DAY
+    assert http_cache.SOURCE_TTL["screener_shareholding"] > http_cache.SOURCE_TTL["screener_page"]
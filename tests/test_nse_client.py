@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+import circuit_breaker
+import cookie_manager
+import http_cache
+import nse_client
+import rate_limit
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+
+    async def read(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """aiohttp stand-in serving quote responses from a queue."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def get(self, url, headers=None):
+        self.requests.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cookie_manager, "COOKIE_FILES", {"nse": str(tmp_path / "nse_cookie.json"),
+                                                         "screener": str(tmp_path / "screener_cookie.json")})
+    async def no_wait(url):
+        return None
+    monkeypatch.setattr(rate_limit, "acquire_async", no_wait)
+    monkeypatch.setattr(rate_limit, "report_response", lambda url, response: None)
+    monkeypatch.setitem(circuit_breaker._sources, rate_limit.NSE_HOST,
+                        circuit_breaker.Source(rate_limit.NSE_HOST, 8, 8))
+
+
+def fetch(session, symbols, bootstraps):
+    async def run():
+        client = nse_client.NSEClient()
+        client.session = session
+
+        async def bootstrap(seen_generation=None):
+            bootstraps.append(seen_generation)
+            client._generation += 1
+        client.bootstrap = bootstrap
+        return await client.fetch_quotes(symbols)
+    return asyncio.run(run())
+
+
+def test_expired_cookie_is_bootstrapped_without_tripping_the_breaker():
+    symbols = [f"S{i}" for i in range(circuit_breaker.FAILURE_THRESHOLD + 2)]
+    bootstraps = []
+
+    class ExpiringSession(FakeSession):
+        """403 until the session has been bootstrapped again."""
+        async def get(self, url, headers=None):
+            self.requests.append((url, dict(headers or {})))
+            return FakeResponse(200, {"priceInfo": {"pE": 20}}) if bootstraps else FakeResponse(403)
+
+    session = ExpiringSession()
+    quotes = fetch(session, symbols, bootstraps)
+    assert all(q == {"priceInfo": {"pE": 20}} for q in quotes.values())
+    assert bootstraps
+    source = circuit_breaker.get_source(rate_limit.NSE_HOST)
+    assert (source.state, source.failures) == (circuit_breaker.CLOSED, 0)
+
+
+def test_304_for_a_lost_entry_refetches_without_validators():
+    url = nse_client.NSE_QUOTE_URL + "INFY"
+    http_cache._save_entry(url, {"url": url, "blob": "0" * 64, "fetched_at": 0, "etag": '"v1"'})
+    session = FakeSession(FakeResponse(304), FakeResponse(200, {"priceInfo": {"pE": 25}}))
+    quotes = fetch(session, ["INFY"], [])
+    assert quotes["INFY"] == {"priceInfo": {"pE": 25}}
+    assert session.requests[0][1] == {"If-None-Match": '"v1"'}
+    assert session.requests[1][1] == {}
@@ -0,0 +1,18 @@
+import pandas as pd
+
+import parallel_screen
+import trend_template
+from price_store import PriceStore
+
+
+def _broken_shard(*args):
+    raise RuntimeError("worker died")
+
+
+def test_all_shards_failing_still_gives_the_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel_screen, "_refresh_shard", _broken_shard)
+    latest, errors = parallel_screen.refresh_parallel(PriceStore(str(tmp_path)), {}, ["INFY", "TCS"], workers=2)
+    assert latest.empty
+    assert list(latest.columns) == ["price", "sma_fast", "sma_mid", "sma_slow", "sma_slow_prev", "low_52", "high_52"]
+    assert sorted(e["Stock"] for e in errors) == ["INFY", "TCS"]
+    assert trend_template.trend_template(latest, pd.Series(dtype=float)).empty
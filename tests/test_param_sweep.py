@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import param_sweep
+
+GRID = {"sma_fast": [5], "sma_mid": [10], "sma_slow": [20], "slope_lookback": [5],
+        "week52_bars": [30, 60], "rs_min": [0]}
+
+
+def close_panel():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2023-01-02", periods=400)
+    steps = rng.normal(0.001, 0.02, size=(len(index), 4))
+    return pd.DataFrame(100 * np.exp(steps.cumsum(axis=0)), index=index, columns=["A", "B", "C", "D"])
+
+
+def test_week52_bars_grid_values_use_their_own_window():
+    close = close_panel()
+    cache = param_sweep.precompute(close, param_sweep.expand_grid(GRID), horizons=[5])
+    assert np.allclose(cache["low_52_30"], close.rolling(30, min_periods=1).min().to_numpy())
+    assert not np.allclose(cache["low_52_30"], cache["low_52_60"])
+
+
+def test_workers_match_serial_run():
+    close = close_panel()
+    serial = param_sweep.run_sweep(close, GRID, workers=1, horizons=[5], rank_horizon=5, min_score=6)
+    parallel = param_sweep.run_sweep(close, GRID, workers=2, horizons=[5], rank_horizon=5, min_score=6)
+    assert len(serial) == 2
+    pd.testing.assert_frame_equal(serial, parallel)
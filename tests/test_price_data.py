@@ -0,0 +1,28 @@
+import pandas as pd
+
+import price_data
+
+
+def test_known_symbols_are_not_retried(monkeypatch):
+    requests = []
+
+    def download(batch, **kwargs):
+        requests.append(list(batch))
+        return pd.DataFrame()  # a weekend: nothing for anyone
+
+    monkeypatch.setattr(price_data.yf, "download", download)
+    monkeypatch.setattr(price_data.time, "sleep", lambda seconds: None)
+    frames, failed = price_data.download_prices(["INFY", "NEWCO"], "2025-01-11", "2025-01-13",
+                                                retries=2, known=["INFY"])
+    assert frames == {}
+    assert sorted(failed) == ["INFY", "NEWCO"]
+    assert requests == [["INFY", "NEWCO"], ["NEWCO"], ["NEWCO"]]
+
+
+def test_split_download_ticker_layout():
+    index = pd.to_datetime(["2025-01-10"])
+    columns = pd.MultiIndex.from_product([["INFY", "TCS"], ["Close", "Volume"]])
+    data = pd.DataFrame([[1.0, 10, None, None]], index=index, columns=columns)
+    frames = price_data.split_download(data, ["INFY", "TCS"])
+    assert list(frames) == ["INFY"]
+    assert list(frames["INFY"].columns) == ["Close", "Volume"]
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+import price_store
+
+
+def bars(dates, close, volume=1000):
+    index = pd.DatetimeIndex(pd.to_datetime(dates), name="Date")
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": [volume] * len(dates)}, index=index)
+
+
+class Downloader:
+    """Serves slices of a fixed history the way price_data.download_prices does."""
+
+    def __init__(self, history):
+        self.history = history  # symbol -> frame
+        self.calls = []
+
+    def __call__(self, symbols, start, end, known=()):
+        self.calls.append((list(symbols), pd.Timestamp(start), pd.Timestamp(end)))
+        self.known = list(known)
+        frames, missing = {}, []
+        for symbol in symbols:
+            df = self.history.get(symbol, pd.DataFrame())
+            df = df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))] if not df.empty else df
+            if df.empty:
+                missing.append(symbol)
+            else:
+                frames[symbol] = df
+        return frames, missing
+
+
+DAYS = ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09", "2025-01-10"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return price_store.PriceStore(str(tmp_path / "prices"))
+
+
+def test_append_only_writes_new_bars(store):
+    assert store.append("INFY", bars(DAYS[:3], [1.0, 2.0, 3.0])) == 3
+    assert store.append("INFY", bars(DAYS[:4], [1.0, 2.0, 3.0, 4.0])) == 1
+    assert store.last_date("INFY") == pd.Timestamp(DAYS[3])
+    assert list(store.read("INFY")["Close"]) == [1.0, 2.0, 3.0, 4.0]
+    assert list(store.read_since("INFY", DAYS[1])["Close"]) == [3.0, 4.0]
+    assert list(store.tail("INFY", 2)["Close"]) == [3.0, 4.0]
+
+
+def test_compaction_keeps_every_bar(tmp_path):
+    store = price_store.PriceStore(str(tmp_path / "prices"), compact_after=2)
+    for i, day in enumerate(DAYS):
+        store.append("INFY", bars([day], [float(i)]))
+    assert len(store._parts("INFY")) <= 2
+    assert list(store.read("INFY")["Close"]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    panels = store.tail_panels(["INFY"], ["Close", "Volume"], 3)
+    assert list(panels["Close"]["INFY"]) == [2.0, 3.0, 4.0]
+
+
+def test_update_downloads_only_the_tail(store):
+    history = {"INFY": bars(DAYS, [1.0, 2.0, 3.0, 4.0, 5.0]), "TCS": bars(DAYS, [9.0] * 5)}
+    download = Downloader(history)
+    appended, failed, rewritten = store.update(["INFY", "TCS", "DEAD"], DAYS[0], DAYS[3], download)
+    assert (appended, failed, rewritten) == ({"INFY": 3, "TCS": 3}, ["DEAD"], [])
+
+    appended, failed, rewritten = store.update(["INFY", "TCS"], DAYS[0], "2025-01-11", download)
+    assert (appended, failed, rewritten) == ({"INFY": 2, "TCS": 2}, [], [])
+    # Both symbols start at the same overlap date, so one batched download
+    assert download.calls[-1] == (["INFY", "TCS"], pd.Timestamp(DAYS[1]), pd.Timestamp("2025-01-11"))
+    assert download.known == ["INFY", "TCS"]
+    assert list(store.read("INFY")["Close"]) == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_up_to_date_symbols_are_skipped(store):
+    download = Downloader({"INFY": bars(DAYS, [1.0] * 5)})
+    store.update(["INFY"], DAYS[0], "2025-01-11", download)
+    calls = len(download.calls)
+    assert store.update(["INFY"], DAYS[0], DAYS[4], download) == ({}, [], [])
+    assert len(download.calls) == calls
+
+
+def test_partial_last_bar_is_replaced(store):
+    # Stored during the session of the 8th: a forming bar
+    store.append("INFY", bars(DAYS[:2], [1.0, 2.0]))
+    store.append("INFY", bars([DAYS[2]], [2.5], volume=300))
+    final = bars(DAYS[:4], [1.0, 2.0, 3.0, 4.0])
+    appended, failed, rewritten = store.update(["INFY"], DAYS[0], "2025-01-10", Downloader({"INFY": final}))
+    assert rewritten == ["INFY"]
+    df = store.read("INFY")
+    assert list(df["Close"]) == [1.0, 2.0, 3.0, 4.0]
+    assert list(df["Volume"]) == [1000] * 4
+
+
+def test_readjusted_history_is_rewritten(store):
+    store.append("INFY", bars(DAYS[:3], [10.0, 20.0, 30.0]))
+    # A 2:1 split: the source now reports every earlier bar halved
+    adjusted = bars(DAYS, [5.0, 10.0, 15.0, 16.0, 17.0])
+    download = Downloader({"INFY": adjusted})
+    appended, failed, rewritten = store.update(["INFY"], DAYS[0], "2025-01-11", download)
+    assert rewritten == ["INFY"] and appended == {"INFY": 5}
+    assert download.calls[-1][0:2] == (["INFY"], pd.Timestamp(DAYS[0]))
+    assert list(store.read("INFY")["Close"]) == [5.0, 10.0, 15.0, 16.0, 17.0]
+
+
+def test_truncate(store):
+    store.append("INFY", bars(DAYS[:3], [1.0, 2.0, 3.0]))
+    store.append("INFY", bars(DAYS[3:], [4.0, 5.0]))
+    store.truncate("INFY", DAYS[2])
+    assert list(store.read("INFY")["Close"]) == [1.0, 2.0]
+    assert store.last_date("INFY") == pd.Timestamp(DAYS[1])
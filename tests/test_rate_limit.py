@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+import rate_limit
+
+
+class HTTPError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+class YFRateLimitError(Exception):
+    pass
+
+
+def test_is_throttle_error():
+    assert rate_limit.is_throttle_error(YFRateLimitError("slow down"))
+    assert rate_limit.is_throttle_error(HTTPError("client error", 429))
+    assert rate_limit.is_throttle_error(Exception("429 Client Error: Too Many Requests"))
+    # A 429 somewhere in the message is not a throttle
+    assert not rate_limit.is_throttle_error(Exception("No data for 5429.T at 1429.50"))
+    assert not rate_limit.is_throttle_error(HTTPError("not found", 404))
+
+
+def test_throttle_halves_the_rate_and_success_recovers_it():
+    bucket = rate_limit.TokenBucket(rate=4.0, burst=2)
+    bucket.throttled(retry_after=0)
+    assert bucket.rate == 2.0
+    bucket.succeeded()
+    assert bucket.rate == pytest.approx(2.0 + 4.0 * rate_limit.RECOVERY_FRACTION)
+    for _ in range(100):
+        bucket.succeeded()
+    assert bucket.rate == 4.0
+
+
+def test_burst_then_paced():
+    bucket = rate_limit.TokenBucket(rate=1000.0, burst=3)
+    assert [bucket._try_take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._try_take() > 0
+
+
+def test_retry_after_blocks_the_bucket():
+    bucket = rate_limit.TokenBucket(rate=1000.0, burst=3)
+    bucket.throttled(retry_after=30)
+    assert bucket._try_take() == pytest.approx(30, abs=1)
+    rate_limit.report("example.org", 429, "not-a-number")  # HTTP-date form is tolerated
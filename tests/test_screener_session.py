@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import circuit_breaker
+import fundamentals_pipeline
+import http_cache
+import rate_limit
+import screener_session
+
+LOGGED_IN = (b"<html><a href='/logout/'>Logout</a><ul id='top-ratios'>"
+             b"<li><span class='name'>PEG Ratio</span><span class='value'>1.8</span></li></ul></html>")
+ANONYMOUS = b"<html><a href='/login/'>Login</a></html>"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=LOGGED_IN, url="https://www.screener.in/company/INFY/"):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.headers = {"Content-Type": "text/html"}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+
+class FakeRequests:
+    """Stands in for the pooled requests.Session; records the cookie of every request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.cookies = []
+
+    def get(self, url, headers=None, cookies=None, **kwargs):
+        self.cookies.append((cookies or {}).get("sessionid"))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(screener_session.cookie_manager, "COOKIE_FILES",
+                        {"screener": str(tmp_path / "screener_cookie.json"), "nse": str(tmp_path / "nse_cookie.json")})
+    monkeypatch.setattr(rate_limit, "acquire", lambda url: None)
+    monkeypatch.setattr(rate_limit, "report_response", lambda url, response: None)
+    monkeypatch.setitem(circuit_breaker._sources, rate_limit.SCREENER_HOST,
+                        circuit_breaker.Source(rate_limit.SCREENER_HOST, 4, 4))
+
+
+def session_with(ids, *responses):
+    session = screener_session.ScreenerSession(ids, auto_refresh=False)
+    session.session = FakeRequests(*responses)
+    return session
+
+
+def test_throttled_cookie_is_rotated():
+    session = session_with(["a", "b"], FakeResponse(429), FakeResponse(200))
+    response = session.get("https://www.screener.in/company/INFY/")
+    assert response.status_code == 200
+    assert session.session.cookies == ["a", "b"]
+    # The throttled cookie rests, so the next request starts with the other one
+    session.session.responses.append(FakeResponse(200))
+    session.get("https://www.screener.in/company/TCS/")
+    assert session.session.cookies[-1] == "b"
+
+
+def test_logged_out_cookie_is_dropped():
+    session = session_with(["a", "b"], FakeResponse(200, ANONYMOUS), FakeResponse(200))
+    assert session.get("https://www.screener.in/company/INFY/").content == LOGGED_IN
+    assert session.session_ids == ["b"]
+
+
+def test_stats():
+    session = session_with(["a"], FakeResponse(200), FakeResponse(200))
+    session.get("https://www.screener.in/company/INFY/")
+    session.get("https://www.screener.in/company/TCS/")
+    stats = session.stats()
+    assert (stats["requests"], stats["errors"]) == (2, 0)
+    assert stats["p95"] >= stats["p50"] >= 0
+
+
+def test_retry_policy():
+    retry = screener_session.make_retry(2)
+    assert retry.total == 2
+    assert 503 in retry.status_forcelist
+
+
+def test_pipeline_fetches_screener_pages_through_the_session():
+    session = session_with(["a"], FakeResponse(200))
+
+    async def run():
+        return await fundamentals_pipeline.fetch_screener(session, asyncio.Semaphore(1), "INFY")
+
+    assert asyncio.run(run())["PEG Ratio"] == "1.8"
+    assert session.session.cookies == ["a"]
+    # Served from the HTTP cache the second time
+    assert asyncio.run(run())["PEG Ratio"] == "1.8"
+    assert len(session.session.cookies) == 1
+
+
+def test_last_logged_out_cookie_refreshes_in_background(monkeypatch):
+    started = []
+    monkeypatch.setattr(screener_session.cookie_manager, "load", lambda site: None)
+    monkeypatch.setattr(screener_session.cookie_manager, "refresh_in_background", started.append)
+    session = session_with(["a"], FakeResponse(200, ANONYMOUS))
+    session.auto_refresh = True
+    response = session.get("https://www.screener.in/company/INFY/")
+    # The request fails fast with the logged-out page instead of waiting for a login
+    assert response.content == ANONYMOUS
+    assert started == ["screener"] and session.session_ids == []
+
+    # Once the background login has saved a cookie, the next request uses it
+    monkeypatch.setattr(screener_session.cookie_manager, "load", lambda site: {"sessionid": "new"})
+    session.session.responses.append(FakeResponse(200))
+    assert session.get("https://www.screener.in/company/TCS/").content == LOGGED_IN
+    assert session.session.cookies[-1] == "new"
+
+
+def test_logged_out_pages_are_not_cached():
+    session = session_with(["a"], FakeResponse(200, ANONYMOUS), FakeResponse(200))
+    url = "https://www.screener.in/company/INFY/"
+    assert http_cache.get(url, "screener_page", session=session).content == ANONYMOUS
+    assert http_cache.lookup(url, "screener_page") is None
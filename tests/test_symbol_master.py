@@ -0,0 +1,69 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import http_cache
+import symbol_master
+
+EQUITY_L = """SYMBOL,NAME OF COMPANY, SERIES, DATE OF LISTING, PAID UP VALUE, MARKET LOT, ISIN NUMBER, FACE VALUE
+INFY,Infosys Limited,EQ,08-FEB-1995,5,1,INE009A01021,5
+TCS,Tata Consultancy Services Limited,EQ,25-AUG-2004,1,1,INE467B01029,1
+XYZ,XYZ Limited,BE,01-JAN-2020,10,1,INE000X01010,10
+"""
+
+
+class Response:
+    def __init__(self, text):
+        self.status_code = 200
+        self.content = text.encode()
+        self.headers = {}
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    """Serves EQUITY_L.csv from a list; records every download."""
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(http_cache.rate_limit, "acquire", lambda url: None)
+    monkeypatch.setattr(http_cache.rate_limit, "report_response", lambda url, r: None)
+    texts, calls = [EQUITY_L], []
+
+    def get(url, headers=None, **kwargs):
+        calls.append(url)
+        return Response(texts[-1])
+    monkeypatch.setattr(http_cache.requests, "get", get)
+    return texts, calls
+
+
+def test_lookups(served, tmp_path):
+    master = symbol_master.load_symbol_master(str(tmp_path / "master"))
+    assert master.symbols(suffix=".NS") == ["INFY.NS", "TCS.NS"]
+    assert master.get("INFY")["ISIN"] == "INE009A01021"
+    assert master.by_isin("INE467B01029")["Symbol"] == "TCS"
+    assert "XYZ" in master and len(master) == 3
+
+
+def test_refreshed_once_a_day(served, tmp_path):
+    texts, calls = served
+    folder = str(tmp_path / "master")
+    symbol_master.load_symbol_master(folder)
+    symbol_master.load_symbol_master(folder)
+    assert len(calls) == 1
+
+
+def test_next_day_refresh_is_not_served_from_the_http_cache(served, tmp_path):
+    texts, calls = served
+    folder = str(tmp_path / "master")
+    symbol_master.load_symbol_master(folder)
+    # Yesterday's master; the CSV has a new listing and a delisting since
+    yesterday = time.time() - 24 * 3600
+    os.utime(os.path.join(folder, "symbol_master.csv"), (yesterday, yesterday))
+    texts.append(EQUITY_L.replace("TCS,Tata Consultancy Services Limited,EQ,25-AUG-2004,1,1,INE467B01029,1",
+                                  "NEWCO,New Company Limited,EQ,01-OCT-2026,10,1,INE999Z01011,10"))
+
+    master = symbol_master.load_symbol_master(folder)
+    assert len(calls) == 2
+    assert "NEWCO" in master and "TCS" not in master
+    changes = pd.read_csv(os.path.join(folder, "changes.csv"))
+    assert sorted(zip(changes["Change"], changes["Symbol"])) == [("delisted", "TCS"), ("listed", "NEWCO")]
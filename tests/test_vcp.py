@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+import vcp
+
+PARAMS = vcp.VCPParams(segments=3, segment_bars=4, min_contractions=2, max_final_depth=0.10)
+
+
+def base_panels(gap=False):
+    """A textbook base: 30%, 15% and 5% pullbacks on drying-up volume.
+
+    With `gap`, a bar without volume and with a bad low is inserted in the
+    middle pullback; it must be dropped from every field.
+    """
+    high = [np.nan] + [100.0] * 12
+    low = [np.nan] + [70.0] * 4 + [85.0] * 4 + [95.0] * 4
+    volume = [np.nan] + [1000.0] * 8 + [300.0] * 4
+    if gap:
+        high.insert(7, 100.0)
+        low.insert(7, 10.0)
+        volume.insert(7, np.nan)
+    index = pd.bdate_range("2025-01-01", periods=len(high))
+    frame = lambda values: pd.DataFrame({"A": values}, index=index)
+    return {"High": frame(high), "Low": frame(low), "Volume": frame(volume)}
+
+
+def test_detects_contracting_base():
+    row = vcp.detect_vcp(base_panels(), PARAMS).loc["A"]
+    assert bool(row["VCP"]) and row["Contractions"] == 3 and row["Pivot"] == 100.0
+
+
+def test_bar_missing_one_field_is_dropped_from_all():
+    pd.testing.assert_frame_equal(vcp.detect_vcp(base_panels(gap=True), PARAMS),
+                                  vcp.detect_vcp(base_panels(), PARAMS))